@@ -0,0 +1,115 @@
+"""
+Throughput and latency of the user-facing API under many concurrent clients.
+
+Start the API against a Postgres with at least one user, then run from the backend directory:
+
+    python -m benchmarks.api_concurrency --email a@b.com --password password1 --clients 200 --duration 20
+    python -m benchmarks.api_concurrency --token <jwt> --path /aquariums/ --path /users/me/ --path /catalog/disease/
+
+Every client loops over the paths on its own keep-alive connection. Database round trips
+dominate these routes, so run it against a database with realistic network latency (or a
+hosted one) to see the difference between blocking and async database calls. Requires httpx.
+"""
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+import httpx
+
+DEFAULT_PATHS = ["/aquariums/", "/users/me/", "/catalog/inhabitants/", "/catalog/disease/"]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def login(base_url: str, email: str, password: str) -> str:
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        response = await client.post("/auth/login/", data={"username": email, "password": password})
+        response.raise_for_status()
+        return response.json()["access_token"]
+
+
+async def run_client(
+        base_url: str,
+        token: str,
+        paths: list[str],
+        offset: int,
+        deadline: float,
+        latencies: list[float],
+        statuses: Counter
+):
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, timeout=60) as client:
+        # Clients start at different paths so every route is under load at the same time.
+        index = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.get(paths[index % len(paths)])
+                statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            finally:
+                index += 1
+            latencies.append(time.perf_counter() - started)
+
+
+async def run(args) -> tuple[float, list[float], Counter]:
+    token = args.token or await login(args.base_url, args.email, args.password)
+    paths = args.path or DEFAULT_PATHS
+
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    if args.warmup:
+        warmup_deadline = time.perf_counter() + args.warmup
+        await asyncio.gather(*[
+            run_client(args.base_url, token, paths, i, warmup_deadline, [], Counter())
+            for i in range(args.clients)
+        ])
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    await asyncio.gather(*[
+        run_client(args.base_url, token, paths, i, deadline, latencies, statuses)
+        for i in range(args.clients)
+    ])
+    return time.perf_counter() - started, latencies, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--token")
+    parser.add_argument("--email")
+    parser.add_argument("--password")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--path", action="append", help="GET path to request, repeatable")
+    args = parser.parse_args()
+    if not args.token and not (args.email and args.password):
+        parser.error("either --token or --email and --password are required")
+
+    elapsed, latencies, statuses = asyncio.run(run(args))
+    latencies.sort()
+
+    print(f"clients:     {args.clients}")
+    print(f"requests:    {len(latencies)} in {elapsed:.1f}s")
+    print(f"throughput:  {len(latencies) / elapsed if elapsed else 0:,.0f} req/s")
+    print(
+        f"latency:     p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+        f"p95 {percentile(latencies, 0.95) * 1000:.0f} ms, "
+        f"p99 {percentile(latencies, 0.99) * 1000:.0f} ms, "
+        f"max {(latencies[-1] if latencies else 0) * 1000:.0f} ms"
+    )
+    print(f"statuses:    {dict(statuses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Throughput and peak Python memory of the streaming sensor export.
+
+Run from the backend directory against a database with sensor history:
+
+    python -m benchmarks.export_stream --user-id 1 --format ndjson
+    python -m benchmarks.export_stream --user-id 1 --format csv --chunk-rows 10000
+"""
+import argparse
+import time
+import tracemalloc
+
+import src.models_registry
+from src.database import engine
+from src.monitoring.export import sensor_export_statement, stream_sensor_export
+
+
+def consume(stmt, fmt: str, chunk_rows: int) -> tuple[int, int]:
+    rows = 0
+    size = 0
+    for chunk in stream_sensor_export(stmt, fmt, chunk_rows=chunk_rows):
+        rows += chunk.count("\n")
+        size += len(chunk)
+    return rows, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--aquarium-id", type=int)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--chunk-rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    engine.echo = False
+    stmt = sensor_export_statement(user_id=args.user_id, aquarium_id=args.aquarium_id)
+
+    started = time.perf_counter()
+    rows, size = consume(stmt, args.format, args.chunk_rows)
+    elapsed = time.perf_counter() - started
+
+    # Second pass under tracemalloc: tracing slows allocation-heavy code several times over.
+    tracemalloc.start()
+    consume(stmt, args.format, args.chunk_rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    if args.format == "csv":
+        rows -= 1
+
+    print(f"rows:        {rows}")
+    print(f"elapsed:     {elapsed:.2f}s")
+    print(f"throughput:  {rows / elapsed if elapsed else 0:,.0f} rows/s, {size / elapsed / 2**20 if elapsed else 0:.1f} MiB/s")
+    print(f"peak memory: {peak / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""
+Simulates a fleet of ESP32 devices posting telemetry to a running API instance.
+
+Start the API against a local Postgres (INGEST_MODE=sync or buffered), seed the
+virtual devices once, then run the fleet from the backend directory:
+
+    python -m benchmarks.fleet_simulator --devices 200 --seed-devices --duration 0
+    python -m benchmarks.fleet_simulator --devices 200 --interval 1 --duration 60
+    python -m benchmarks.fleet_simulator --devices 200 --interval 1 --duration 60 --mode batch --batch-size 100
+
+MQTT mode publishes to a local broker (mosquitto -p 1883) that the gateway subscribes to,
+either embedded in the API (MQTT_ENABLED=true) or `python -m src.monitoring.mqtt_gateway`:
+
+    python -m benchmarks.fleet_simulator --devices 2000 --interval 1 --duration 60 --mode mqtt --server-pid <pid>
+
+--server-pid samples the CPU time of the API/gateway process, so the modes can be compared
+by readings stored per CPU-second. Seeded devices get a per-device rate limit that matches
+--interval, so the limiter does not skew the comparison. Requires the benchmarks extra
+(poetry install --extras benchmarks).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+import httpx
+
+DEFAULT_PREFIX = "sim_dev_"
+
+
+class VirtualDevice:
+    def __init__(self, api_key: str, rng: random.Random):
+        self.api_key = api_key
+        self.rng = rng
+        # Counting up from the start time keeps repeated runs clear of the server's seq marks.
+        self.seq = int(time.time()) * 10
+
+        self.temperature = rng.uniform(24.0, 26.0)
+        self.ph_base = rng.uniform(6.6, 7.6)
+        self.tds = rng.uniform(120, 250)
+        self.tds_growth = rng.uniform(0.05, 0.3)
+        self.room_phase = rng.uniform(0, 2 * math.pi)
+
+    def reading(self) -> dict:
+        rng = self.rng
+        self.seq += 1
+
+        # heater keeps the water around 25°C, the rest is a slow random walk
+        self.temperature += rng.gauss(0, 0.03) + (25.0 - self.temperature) * 0.01
+        self.tds += self.tds_growth + rng.gauss(0, 0.5)
+        if self.tds > 600 and rng.random() < 0.01:
+            self.tds *= 0.7
+
+        hour = time.time() / 3600
+        return {
+            "api_key": self.api_key,
+            "seq": self.seq,
+            "device_ts": datetime.now().isoformat(timespec="seconds"),
+            "measurements": {
+                "temperature": round(self.temperature, 2),
+                "ph": round(self.ph_base + rng.gauss(0, 0.05), 2),
+                "tds": round(self.tds, 1),
+                "turbidity": round(max(0.0, rng.gauss(3.8, 0.1)), 2),
+                "water_level": 0 if rng.random() < 0.001 else 1,
+                "room_temperature": round(22 + 2 * math.sin(2 * math.pi * hour / 24 + self.room_phase), 2),
+                "room_humidity": round(min(100.0, max(0.0, rng.gauss(45, 3))), 2),
+            },
+        }
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.statuses: Counter = Counter()
+        self.readings_sent = 0
+        self.readings_ok = 0
+        self.errors = 0
+
+    def record(self, started: float, status, readings: int, ok_readings: int):
+        self.latencies.append((time.perf_counter() - started) * 1000)
+        self.statuses[status] += 1
+        self.readings_sent += readings
+        self.readings_ok += ok_readings
+        if not ok_readings:
+            self.errors += 1
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def post_single(client: httpx.AsyncClient, stats: Stats, reading: dict):
+    started = time.perf_counter()
+    try:
+        response = await client.post("/measurements/sensor", json=reading)
+        ok = response.status_code in (200, 202)
+        stats.record(started, response.status_code, 1, int(ok))
+    except httpx.HTTPError as e:
+        stats.record(started, type(e).__name__, 1, 0)
+
+
+async def post_batch(client: httpx.AsyncClient, stats: Stats, readings: list[dict]):
+    started = time.perf_counter()
+    try:
+        response = await client.post("/measurements/sensor/batch", json={"readings": readings})
+        accepted = response.json().get("accepted", 0) if response.status_code == 200 else 0
+        stats.record(started, response.status_code, len(readings), accepted)
+    except httpx.HTTPError as e:
+        stats.record(started, type(e).__name__, len(readings), 0)
+
+
+class MqttFleet:
+    # A handful of broker connections shared by the fleet; the gateway only sees the broker,
+    # so this doesn't change the server side of the comparison.
+    def __init__(self, host: str, port: int, connections: int, topic_prefix: str, qos: int, stats: Stats):
+        import paho.mqtt.client as mqtt
+
+        self.topic_prefix = topic_prefix
+        self.qos = qos
+        self.stats = stats
+        self._loop = asyncio.get_running_loop()
+        self._pending: dict[tuple[int, int], float] = {}
+        self._lock = threading.RLock()
+
+        self._clients = []
+        for i in range(connections):
+            client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=f"fleet-sim-{os.getpid()}-{i}")
+            client.on_publish = self._on_publish
+            client.max_inflight_messages_set(1000)
+            client.connect(host, port)
+            client.loop_start()
+            self._clients.append(client)
+
+    def publish(self, device_id: int, reading: dict):
+        client = self._clients[device_id % len(self._clients)]
+        topic = f"{self.topic_prefix}/{device_id}/telemetry"
+        started = time.perf_counter()
+
+        if self.qos == 0:
+            info = client.publish(topic, json.dumps(reading), qos=0)
+            self.stats.record(started, "sent" if info.rc == 0 else f"rc{info.rc}", 1, int(info.rc == 0))
+            return
+
+        # PUBACK can arrive before publish() returns, the lock keeps the mid registered first.
+        with self._lock:
+            info = client.publish(topic, json.dumps(reading), qos=self.qos)
+            if info.rc == 0:
+                self._pending[(id(client), info.mid)] = started
+                return
+        self.stats.record(started, f"rc{info.rc}", 1, 0)
+
+    async def close(self, timeout: float):
+        deadline = time.perf_counter() + timeout
+        while self._pending and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        for client in self._clients:
+            client.disconnect()
+            client.loop_stop()
+        with self._lock:
+            for started in self._pending.values():
+                self.stats.record(started, "no puback", 1, 0)
+            self._pending.clear()
+
+    def _on_publish(self, client, userdata, mid, reason_code, properties):
+        with self._lock:
+            started = self._pending.pop((id(client), mid), None)
+        if started is not None:
+            ok = not reason_code.is_failure
+            self._loop.call_soon_threadsafe(self.stats.record, started, "puback" if ok else str(reason_code), 1, int(ok))
+
+
+async def run_device(device: VirtualDevice, interval: float, deadline: float, send):
+    # spread the first readings so the fleet doesn't fire in lockstep
+    await asyncio.sleep(device.rng.uniform(0, interval))
+    next_at = time.perf_counter()
+    while next_at < deadline:
+        await send(device.reading())
+        next_at += interval
+        await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+
+
+async def run_gateway(queue: asyncio.Queue, batch_size: int, flush_seconds: float, post, done: asyncio.Event):
+    while not (done.is_set() and queue.empty()):
+        batch = []
+        try:
+            batch.append(await asyncio.wait_for(queue.get(), timeout=flush_seconds))
+        except asyncio.TimeoutError:
+            continue
+        flush_at = time.perf_counter() + flush_seconds
+        while len(batch) < batch_size:
+            timeout = flush_at - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=timeout))
+            except asyncio.TimeoutError:
+                break
+        await post(batch)
+
+
+async def simulate(args) -> tuple[Stats, float]:
+    rng = random.Random(args.seed)
+    devices = [VirtualDevice(f"{args.prefix}{i}", random.Random(rng.random())) for i in range(args.devices)]
+    stats = Stats()
+
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        started = time.perf_counter()
+        deadline = started + args.duration
+
+        if args.mode == "single":
+            async def send(reading):
+                await post_single(client, stats, reading)
+
+            await asyncio.gather(*(run_device(device, args.interval, deadline, send) for device in devices))
+        elif args.mode == "mqtt":
+            device_ids = load_device_ids(args.prefix)
+            if any(device.api_key not in device_ids for device in devices):
+                raise SystemExit("MQTT topics need device ids, run with --seed-devices first")
+            fleet = MqttFleet(args.mqtt_host, args.mqtt_port, min(args.connections, len(devices)),
+                              args.topic_prefix, args.qos, stats)
+
+            async def send(reading):
+                fleet.publish(device_ids[reading["api_key"]], reading)
+
+            await asyncio.gather(*(run_device(device, args.interval, deadline, send) for device in devices))
+            await fleet.close(args.timeout)
+        else:
+            queue: asyncio.Queue = asyncio.Queue()
+            done = asyncio.Event()
+
+            async def send(reading):
+                await queue.put(reading)
+
+            async def post(batch):
+                await post_batch(client, stats, batch)
+
+            gateways = [
+                asyncio.create_task(run_gateway(queue, args.batch_size, args.flush_ms / 1000, post, done))
+                for _ in range(args.gateways)
+            ]
+            await asyncio.gather(*(run_device(device, args.interval, deadline, send) for device in devices))
+            done.set()
+            await asyncio.gather(*gateways)
+
+        return stats, time.perf_counter() - started
+
+
+def seed_devices(prefix: str, count: int, interval: float):
+    import src.models_registry
+    from sqlalchemy.dialects.postgresql import insert
+    from src.database import SessionLocal, engine
+    from src.monitoring.models import Devices, DeviceStatus
+
+    engine.echo = False
+    per_minute = max(60 / interval * 2, 1)
+    rows = [
+        {
+            "api_key": f"{prefix}{i}",
+            "name": f"Simulated {i}",
+            "status": DeviceStatus.offline,
+            "power_watts": 0,
+            "config": {"rate_limit": {"per_minute": per_minute, "burst": max(per_minute / 6, 5)}},
+        }
+        for i in range(count)
+    ]
+
+    db = SessionLocal()
+    try:
+        stmt = insert(Devices)
+        db.execute(
+            stmt.on_conflict_do_update(index_elements=["api_key"], set_={"config": stmt.excluded.config}),
+            rows
+        )
+        db.commit()
+    finally:
+        db.close()
+    print(f"seeded {count} devices with prefix {prefix!r}")
+
+
+def load_device_ids(prefix: str) -> dict[str, int]:
+    import src.models_registry
+    from sqlalchemy import select
+    from src.database import SessionLocal, engine
+    from src.monitoring.models import Devices
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        return dict(db.execute(select(Devices.api_key, Devices.id).where(Devices.api_key.startswith(prefix))).all())
+    finally:
+        db.close()
+
+
+def count_stored(prefix: str, since: datetime) -> int:
+    import src.models_registry
+    from sqlalchemy import func, select
+    from src.database import SessionLocal, engine
+    from src.monitoring.models import Devices, Sensor_Measurements
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        return db.scalar(
+            select(func.count())
+            .select_from(Sensor_Measurements)
+            .join(Devices, Devices.id == Sensor_Measurements.device_id)
+            .where(Devices.api_key.startswith(prefix), Sensor_Measurements.timestamp >= since)
+        )
+    finally:
+        db.close()
+
+
+def process_cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as file:
+        fields = file.read().rsplit(")", 1)[1].split()
+    # utime and stime, fields 14 and 15 of proc(5)
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def remove_devices(prefix: str):
+    import src.models_registry
+    from sqlalchemy import delete
+    from src.database import SessionLocal, engine
+    from src.monitoring.models import Devices
+
+    engine.echo = False
+    db = SessionLocal()
+    try:
+        removed = db.execute(delete(Devices).where(Devices.api_key.startswith(prefix))).rowcount
+        db.commit()
+    finally:
+        db.close()
+    print(f"removed {removed} devices with prefix {prefix!r}")
+
+
+def report(args, stats: Stats, elapsed: float, stored: Optional[int] = None, server_cpu: Optional[float] = None):
+    requests = sum(stats.statuses.values())
+    print(f"mode:         {args.mode}" + (f" x{args.batch_size}" if args.mode == "batch" else "")
+          + (f" qos {args.qos}" if args.mode == "mqtt" else ""))
+    print(f"devices:      {args.devices} every {args.interval}s for {elapsed:.1f}s")
+    print(f"requests:     {requests} ({requests / elapsed if elapsed else 0:,.1f}/s)")
+    print(f"readings:     {stats.readings_ok}/{stats.readings_sent} accepted "
+          f"({stats.readings_ok / elapsed if elapsed else 0:,.1f}/s)")
+    print(f"error rate:   {stats.errors / requests * 100 if requests else 0:.2f}%")
+    print(f"latency ms:   p50 {percentile(stats.latencies, 0.50):.1f}  p95 {percentile(stats.latencies, 0.95):.1f}  "
+          f"p99 {percentile(stats.latencies, 0.99):.1f}  max {max(stats.latencies, default=0):.1f}")
+    print(f"statuses:     {dict(stats.statuses)}")
+    if stored is not None:
+        print(f"stored:       {stored} ({stored / elapsed if elapsed else 0:,.1f}/s)")
+    if server_cpu is not None:
+        readings = stored if stored is not None else stats.readings_ok
+        print(f"server cpu:   {server_cpu:.2f}s ({server_cpu / elapsed * 100 if elapsed else 0:.1f}% of a core), "
+              f"{readings / server_cpu if server_cpu else 0:,.0f} readings per cpu-second")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Virtual ESP32 fleet for ingest load tests")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between readings of one device")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--mode", choices=["single", "batch", "mqtt"], default="single")
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--flush-ms", type=float, default=200)
+    parser.add_argument("--gateways", type=int, default=4, help="concurrent batch senders in batch mode")
+    parser.add_argument("--connections", type=int, default=100, help="HTTP connections or MQTT clients")
+    parser.add_argument("--mqtt-host", default="127.0.0.1")
+    parser.add_argument("--mqtt-port", type=int, default=1883)
+    parser.add_argument("--topic-prefix", default="aquacore/devices")
+    parser.add_argument("--qos", type=int, choices=[0, 1], default=1)
+    parser.add_argument("--drain", type=float, default=5.0, help="seconds to wait for the gateway before counting")
+    parser.add_argument("--server-pid", type=int, help="API/gateway process to sample CPU time from")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--seed-devices", action="store_true", help="create the virtual devices in the database")
+    parser.add_argument("--remove-devices", action="store_true", help="delete the virtual devices and their data")
+    args = parser.parse_args()
+
+    if args.seed_devices:
+        seed_devices(args.prefix, args.devices, args.interval)
+
+    if args.duration > 0:
+        started_at = datetime.now()
+        cpu_before = process_cpu_seconds(args.server_pid) if args.server_pid else None
+        stats, elapsed = asyncio.run(simulate(args))
+
+        stored = None
+        if args.mode == "mqtt":
+            # Broker acks say nothing about storage, wait for the gateway to drain and count rows.
+            time.sleep(args.drain)
+            stored = count_stored(args.prefix, started_at.replace(microsecond=0))
+        server_cpu = process_cpu_seconds(args.server_pid) - cpu_before if args.server_pid else None
+        report(args, stats, elapsed, stored=stored, server_cpu=server_cpu)
+
+    if args.remove_devices:
+        remove_devices(args.prefix)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Rows/second of the single-row `/measurements/sensor` path vs `/measurements/sensor/batch`.
+
+Run from the backend directory against a database that already has a device:
+
+    python -m benchmarks.ingest_batch --api-key aq_dev_12345 --rows 2000 --batch-size 500
+"""
+import argparse
+import random
+import time
+
+import src.models_registry
+from sqlalchemy import delete
+from src.database import SessionLocal, engine
+from src.monitoring.models import Devices, Sensor_Measurements
+from src.monitoring.device_cache import device_key_cache
+from src.monitoring.ingest import build_sensor_row, store_sensor_rows
+from src.monitoring.schemas import SensorIncoming
+from src.monitoring.service import ingest_sensor_batch
+
+
+def make_reading(api_key: str) -> dict:
+    return {
+        "api_key": api_key,
+        "measurements": {
+            "temperature": round(random.uniform(24, 27), 2),
+            "ph": round(random.uniform(6.8, 7.4), 2),
+            "tds": random.randint(150, 300),
+            "turbidity": round(random.uniform(0.5, 2.0), 2),
+            "water_level": 1,
+            "room_temperature": round(random.uniform(20, 24), 2),
+            "room_humidity": round(random.uniform(35, 60), 2),
+        },
+    }
+
+
+def bench_single(api_key: str, rows: int) -> float:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for _ in range(rows):
+            data = SensorIncoming.model_validate(make_reading(api_key))
+            device = device_key_cache.resolve(db, data.api_key)
+            store_sensor_rows(db, [build_sensor_row(device.device_id, data.measurements)])
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def bench_batch(api_key: str, rows: int, batch_size: int) -> float:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            readings = [make_reading(api_key) for _ in range(min(batch_size, rows - offset))]
+            ingest_sensor_batch(db, readings)
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def cleanup(api_key: str, since_id: int):
+    db = SessionLocal()
+    try:
+        device = db.query(Devices).filter(Devices.api_key == api_key).one()
+        db.execute(
+            delete(Sensor_Measurements)
+            .where(Sensor_Measurements.device_id == device.id)
+            .where(Sensor_Measurements.id > since_id)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def last_measurement_id() -> int:
+    db = SessionLocal()
+    try:
+        return db.query(Sensor_Measurements.id).order_by(Sensor_Measurements.id.desc()).limit(1).scalar() or 0
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--keep", action="store_true", help="keep the inserted rows instead of deleting them")
+    args = parser.parse_args()
+
+    engine.echo = False
+    since_id = last_measurement_id()
+
+    single = bench_single(args.api_key, args.rows)
+    batch = bench_batch(args.api_key, args.rows, args.batch_size)
+
+    print(f"single-row: {args.rows / single:10.1f} rows/s ({single:.2f}s)")
+    print(f"batch x{args.batch_size}: {args.rows / batch:10.1f} rows/s ({batch:.2f}s)")
+    print(f"speedup:    {single / batch:10.1f}x")
+
+    if not args.keep:
+        cleanup(args.api_key, since_id)
+
+
+if __name__ == "__main__":
+    main()
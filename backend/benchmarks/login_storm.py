@@ -0,0 +1,114 @@
+"""
+Sensor ingest latency while the API is flooded with logins.
+
+Start the API against a local Postgres with at least one user, seed the probe devices
+once, then run from the backend directory:
+
+    python -m benchmarks.fleet_simulator --devices 20 --seed-devices --duration 0
+    python -m benchmarks.login_storm --email a@b.com --password password1 --logins 50 --duration 20
+
+The probe devices post one reading per --interval for the whole run. The first half of
+the run is quiet, the second half adds --logins clients that log in back to back. Ingest
+latency is reported separately for both halves, along with login throughput and 503s
+from the password hashing queue. Requires httpx.
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.fleet_simulator import DEFAULT_PREFIX, VirtualDevice
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def describe(latencies: list[float]) -> str:
+    latencies = sorted(latencies)
+    return (
+        f"n {len(latencies)}, p50 {percentile(latencies, 0.5):.0f} ms, p95 {percentile(latencies, 0.95):.0f} ms, "
+        f"p99 {percentile(latencies, 0.99):.0f} ms, max {(latencies[-1] if latencies else 0):.0f} ms"
+    )
+
+
+async def run_device(client: httpx.AsyncClient, device: VirtualDevice, interval: float, storm_at: float,
+                     deadline: float, quiet: list[float], storm: list[float], statuses: Counter):
+    await asyncio.sleep(device.rng.uniform(0, interval))
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.post("/measurements/sensor", json=device.reading())
+            statuses[response.status_code] += 1
+            (storm if started >= storm_at else quiet).append((time.perf_counter() - started) * 1000)
+        except httpx.HTTPError as e:
+            statuses[type(e).__name__] += 1
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+
+async def run_login(base_url: str, email: str, password: str, storm_at: float, deadline: float,
+                    latencies: list[float], statuses: Counter):
+    await asyncio.sleep(max(0.0, storm_at - time.perf_counter()))
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await client.post("/auth/login/", data={"username": email, "password": password})
+                statuses[response.status_code] += 1
+                if response.status_code == 200:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                elif response.status_code == 503:
+                    await asyncio.sleep(float(response.headers.get("Retry-After", 1)))
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    devices = [VirtualDevice(f"{args.prefix}{i}", random.Random(rng.random())) for i in range(args.devices)]
+
+    quiet: list[float] = []
+    storm: list[float] = []
+    ingest_statuses: Counter = Counter()
+    login_latencies: list[float] = []
+    login_statuses: Counter = Counter()
+
+    started = time.perf_counter()
+    storm_at = started + args.duration / 2
+    deadline = started + args.duration
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        await asyncio.gather(
+            *(run_device(client, device, args.interval, storm_at, deadline, quiet, storm, ingest_statuses)
+              for device in devices),
+            *(run_login(args.base_url, args.email, args.password, storm_at, deadline, login_latencies, login_statuses)
+              for _ in range(args.logins)),
+        )
+
+    print(f"ingest quiet:   {describe(quiet)}")
+    print(f"ingest storm:   {describe(storm)}")
+    print(f"ingest status:  {dict(ingest_statuses)}")
+    print(f"logins:         {len(login_latencies) / (deadline - storm_at):.1f}/s, {describe(login_latencies)}")
+    print(f"login status:   {dict(login_statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between readings of one device")
+    parser.add_argument("--logins", type=int, default=50, help="concurrent login clients during the storm")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--prefix", default=DEFAULT_PREFIX)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
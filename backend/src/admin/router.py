@@ -1,5 +1,5 @@
-from typing import Annotated, List
-from fastapi import APIRouter, Depends
+from typing import Annotated, List, Optional
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from src.catalog.schemas import InhabitantsCreate, InhabitantsUpdate
@@ -8,8 +8,8 @@ from src.auth.service import get_current_user
 from src.catalog.service import  create_new_inhabitant_in_db, update_inhabitant_in_db, get_all_inhabitants
 from src.users.service import get_all_users, user_ban, get_user_by_id_for_admin, delete_user_by_id_for_admin
 from src.users.schemas import UserRead
-from src.admin.service import get_global_system_health
-from src.admin.schemas import SystemHealthResponse
+from src.admin.service import get_global_system_health, get_runtime_metrics, get_stale_devices
+from src.admin.schemas import SystemHealthResponse, StaleDeviceRead
 
 router = APIRouter(prefix="/admin", tags=["Admin 👑"])
 
@@ -17,12 +17,12 @@ db_dependency = Annotated[Session, Depends(get_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 
 @router.get("/users/", response_model=List[UserRead])
-async def get_users(db: db_dependency, user: user_dependency):
+def get_users(db: db_dependency, user: user_dependency):
     return get_all_users(db=db, user_id=user.get("user_id"))
 
 
 @router.get("/users/{user_id}", response_model=UserRead)
-async def read_user(db: db_dependency, user: user_dependency, user_id:int):
+def read_user(db: db_dependency, user: user_dependency, user_id:int):
     return get_user_by_id_for_admin(db=db, user_id=user.get("user_id"), search_user_id=user_id)
 
 
@@ -34,8 +34,23 @@ def admin_dashboard_stats(
     return get_global_system_health(db)
 
 
+@router.get("/metrics/")
+def admin_runtime_metrics(db: db_dependency, user: user_dependency):
+    return get_runtime_metrics(db=db, admin_id=user.get("user_id"))
+
+
+@router.get("/devices/stale/", response_model=List[StaleDeviceRead])
+def admin_stale_devices(
+    db: db_dependency,
+    user: user_dependency,
+    silence_seconds: Optional[float] = Query(None, gt=0),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    return get_stale_devices(db=db, admin_id=user.get("user_id"), silence_seconds=silence_seconds, limit=limit)
+
+
 @router.post("/catalog/inhabitants/", status_code=201)
-async def create_new_inhabitant(
+def create_new_inhabitant(
         db:db_dependency,
         inhabitant: InhabitantsCreate,
         user:user_dependency
@@ -48,7 +63,7 @@ async def create_new_inhabitant(
 
 
 @router.put("/catalog/inhabitants/{inhabitant_id}")
-async def update_inhabitant(
+def update_inhabitant(
     db:db_dependency,
     inhabitant_id:int,
     inhabitant: InhabitantsUpdate,
@@ -62,10 +77,10 @@ async def update_inhabitant(
 
 
 @router.patch("/users/{user_id}/ban")
-async def banned_user_by_id(db:db_dependency, user_id:int, user: user_dependency):
+def banned_user_by_id(db:db_dependency, user_id:int, user: user_dependency):
     return user_ban(db=db, user_id=user_id, admin_id=user.get("user_id"))
 
 
 @router.delete("/users/{user_id}/")
-async def delete_user(db:db_dependency, admin:user_dependency, user_id:int):
+def delete_user(db:db_dependency, admin:user_dependency, user_id:int):
     return delete_user_by_id_for_admin(db=db, admin_id=admin.get("user_id"), user_id=user_id)
\ No newline at end of file
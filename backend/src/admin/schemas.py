@@ -1,7 +1,18 @@
+from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel
+from src.monitoring.models import DeviceStatus
 
 class SystemHealthResponse(BaseModel):
     total_users: int
     active_aquariums: int
     most_popular_fish: str
-    message: str
\ No newline at end of file
+    message: str
+
+
+class StaleDeviceRead(BaseModel):
+    device_id: int
+    name: Optional[str]
+    aquarium_id: Optional[int]
+    status: DeviceStatus
+    last_seen: Optional[datetime]
@@ -1,5 +1,5 @@
 import os
-from typing import Annotated
+from typing import Annotated, Optional
 from sqlalchemy import func, desc
 from fastapi import Depends, HTTPException, status
 from starlette import status
@@ -8,6 +8,19 @@ from sqlalchemy.orm import Session
 from src.users.models import Users
 from src.aquariums.models import Aquariums, Aquarium_Inhabitants
 from src.catalog.models import Catalog_Inhabitants
+from src.monitoring.device_cache import device_key_cache
+from src.monitoring.ingest_buffer import ingest_buffer
+from src.monitoring.live import measurement_broker
+from src.monitoring.latest import latest_readings
+from src.monitoring.heartbeat import heartbeat_tracker
+from src.monitoring.sequence import sequence_tracker
+from src.monitoring.rate_limit import ingest_limiter
+from src.monitoring.anomalies import anomaly_detector
+from src.monitoring.alerts import alert_engine
+from src.monitoring.mqtt_gateway import mqtt_gateway
+from src.notifications.dispatcher import notification_dispatcher
+from src.devices.channel import device_config_channel
+from src.auth.passwords import password_hasher
 
 db_dependency = Annotated[Session, Depends(get_db)]
 
@@ -51,4 +64,30 @@ def get_global_system_health(db: Session) -> dict:
         "active_aquariums": active_aquariums,
         "most_popular_fish": most_popular,
         "message": "Система працює стабільно."
-    }
\ No newline at end of file
+    }
+
+
+def get_runtime_metrics(db: Session, admin_id: int) -> dict:
+    check_admin(db=db, admin_id=admin_id)
+
+    return {
+        "device_cache": device_key_cache.stats(),
+        "ingest_buffer": ingest_buffer.stats(),
+        "mqtt_gateway": mqtt_gateway.stats(),
+        "live_feed": measurement_broker.stats(),
+        "latest_readings": latest_readings.stats(),
+        "heartbeat": heartbeat_tracker.stats(),
+        "ingest_sequences": sequence_tracker.stats(),
+        "ingest_rate_limit": ingest_limiter.stats(),
+        "anomalies": anomaly_detector.stats(),
+        "alerts": alert_engine.stats(),
+        "notifications": notification_dispatcher.stats(),
+        "device_config": device_config_channel.stats(),
+        "passwords": password_hasher.stats(),
+    }
+
+
+def get_stale_devices(db: Session, admin_id: int, silence_seconds: Optional[float] = None, limit: int = 100) -> list[dict]:
+    check_admin(db=db, admin_id=admin_id)
+
+    return heartbeat_tracker.stale_devices(db, silence_seconds=silence_seconds, limit=limit)
@@ -1,40 +1,62 @@
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.catalog.models import Catalog_Inhabitants
 from src.aquariums.models import Aquarium_Inhabitants
-from src.database import get_db
+from src.database import get_db, get_async_db
 from src.auth.service import get_current_user
 from src.catalog.schemas import  AddInhabitantRequest, AddInhabitantResponse
-from src.aquariums.service import create_aquarium, get_aquarium, get_aquariums_by_user, update_aquarium, delete_aquarium, recalculate_aquarium_targets, calculate_stocking_level, predict_nitrogen_cycle_status, get_aquarium_by_id_db
-from src.aquariums.schemas import AquariumCreate, AquariumRead,  AquariumListResponse, AquariumUpdate
+from src.aquariums.service import get_aquarium, recalculate_aquarium_targets, calculate_stocking_level, predict_nitrogen_cycle_status, get_aquariums_dashboard
+from src.aquariums.schemas import AquariumCreate, AquariumRead,  AquariumListResponse, AquariumUpdate, AquariumDashboardResponse
 from src.aquariums.service import check_compatibility, update_device_smart_config
+from src.aquariums.service import create_aquarium_async, get_aquarium_by_id_db_async, get_aquariums_by_user_async, update_aquarium_async, delete_aquarium_async
 from src.monitoring.schemas import NitrogenStatusResponse
-from src.monitoring.service import analyze_parameter_trends
+from src.monitoring.service import analyze_parameter_trends, analyze_aquarium_trends
 
 
 router = APIRouter(prefix="/aquariums", tags=["Aquariums 🪼"])
 
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 
 
 @router.get("/", response_model=AquariumListResponse)
 async def get_all_my_aquariums(
+  db:async_db_dependency,
+  user:user_dependency
+):
+  return await get_aquariums_by_user_async(db=db, user_id=user.get("user_id"))
+
+
+@router.get("/dashboard", response_model=AquariumDashboardResponse)
+def get_my_aquariums_dashboard(
   db:db_dependency,
   user:user_dependency
 ):
-  return get_aquariums_by_user(db=db, user_id=user.get("user_id"))
+  return get_aquariums_dashboard(db=db, user_id=user.get("user_id"))
 
 
 @router.get("/{aquarium_id}", response_model=AquariumRead)
 async def get_aquarium_by_id(
-  db:db_dependency,
+  db:async_db_dependency,
   aquarium_id:int,
     user: user_dependency
 ):
-  return get_aquarium_by_id_db(db=db, aquarium_id=aquarium_id, user_id=user.get("user_id"))
+  return await get_aquarium_by_id_db_async(db=db, aquarium_id=aquarium_id, user_id=user.get("user_id"))
+
+
+@router.get("/{id}/analyze")
+def get_all_trends_analysis(
+        id: int,
+        db: db_dependency,
+        user: user_dependency,
+        n_points: int = Query(30, ge=2, le=1000),
+        hours: Optional[float] = Query(None, gt=0)
+):
+    return analyze_aquarium_trends(db, aquarium_id=id, user_id=user.get("user_id"), n_points=n_points, hours=hours)
 
 
 @router.get("/{id}/analyze/{parameter}")
@@ -70,11 +92,11 @@ def get_aquarium_cycle_status(
 
 @router.post("/", status_code=201)
 async def create_new_aquarium(
-  db:db_dependency,
+  db:async_db_dependency,
   aquarium:AquariumCreate,
   user:user_dependency
 ):
-  return create_aquarium(db=db, aquarium=aquarium, user_id=user.get("user_id"))
+  return await create_aquarium_async(db=db, aquarium=aquarium, user_id=user.get("user_id"))
 
 
 @router.post("/{id}/inhabitants", response_model=AddInhabitantResponse, status_code=201)
@@ -139,18 +161,18 @@ def add_inhabitant_to_aquarium(
 
 @router.put("/{aquarium_id}")
 async def update_my_aquarium(
-  db:db_dependency,
+  db:async_db_dependency,
   aquarium_id:int,
   aquarium_data: AquariumUpdate,
   user:user_dependency
 ):
-  return update_aquarium(db=db, aquarium_id=aquarium_id, aquarium_data=aquarium_data, user_id=user.get("user_id"))
+  return await update_aquarium_async(db=db, aquarium_id=aquarium_id, aquarium_data=aquarium_data, user_id=user.get("user_id"))
 
 
 @router.delete("/{aquarium_id}")
 async def delete_my_aquarium(
-  db:db_dependency,
+  db:async_db_dependency,
   aquarium_id:int,
   user:user_dependency
 ):
-  return delete_aquarium(db=db, aquarium_id=aquarium_id, user_id=user.get("user_id"))
\ No newline at end of file
+  return await delete_aquarium_async(db=db, aquarium_id=aquarium_id, user_id=user.get("user_id"))
\ No newline at end of file
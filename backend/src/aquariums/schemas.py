@@ -3,6 +3,7 @@ from datetime import date
 from typing import Optional, List
 
 from src.aquariums.models import WaterType
+from src.monitoring.schemas import NitrogenStatusResponse, SensorLatestReading
 
 
 class AquariumCreate(BaseModel):
@@ -74,4 +75,23 @@ class AquariumRead(AquariumListRead):
     
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class StockingLevel(BaseModel):
+    percent: float
+    status: str
+
+
+class AquariumDashboardItem(BaseModel):
+    aquarium: AquariumListRead
+    device: Optional[DeviceRead] = None
+    latest: dict[str, SensorLatestReading] = {}
+    trends: dict[str, dict] = {}
+    cycle_status: NitrogenStatusResponse
+    stocking: StockingLevel
+    open_tasks: int = 0
+
+
+class AquariumDashboardResponse(BaseModel):
+    aquariums: List[AquariumDashboardItem]
@@ -1,14 +1,15 @@
 from decimal import Decimal
-from typing import Annotated
-from sqlalchemy import func, desc
+from typing import Annotated, Optional
+from sqlalchemy import func, desc, select, delete
 from datetime import date
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm.attributes import flag_modified
 from starlette import status
 from src.database import get_db
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.aquariums.schemas import AquariumCreate, AquariumUpdate
-from src.users.service import get_user_by_id
+from src.users.service import get_user_by_id, get_user_by_id_async
 from src.tasks.models import Tasks
 from src.media.models import Media
 from src.monitoring.models import Activity_Log
@@ -16,6 +17,11 @@ from src.catalog.models import  Catalog_Inhabitants
 from src.aquariums.models import  Aquarium_Inhabitants, Aquariums
 
 from src.monitoring.models import Devices, Manual_Measurements
+from src.monitoring.device_cache import device_key_cache
+from src.monitoring.latest import latest_readings
+from src.monitoring.alerts import alert_engine, compile_targets
+from src.monitoring.trends import TREND_PARAMETERS, analyze_trends_many
+from src.devices.channel import device_config_channel
 
 db_dependency = Annotated[Session, Depends(get_db)]
 
@@ -59,6 +65,42 @@ def create_aquarium(db: Session, aquarium: AquariumCreate, user_id: int):
     }
 
 
+async def create_aquarium_async(db: AsyncSession, aquarium: AquariumCreate, user_id: int):
+    user = await get_user_by_id_async(db=db, user_id=user_id)
+
+    existing_aqua_name = await db.scalar(
+        select(Aquariums.id)
+        .where(
+            Aquariums.user_id == user.id,
+            func.lower(Aquariums.name) == aquarium.name.lower(),
+        )
+        .limit(1)
+    )
+
+    if existing_aqua_name:
+        raise  HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Name for aquarium already in use')
+
+    db.add(Aquariums(
+        user_id=user.id,
+        name=aquarium.name,
+        volume_l=aquarium.volume_l,
+        length_cm=aquarium.length_cm,
+        width_cm=aquarium.width_cm,
+        height_cm=aquarium.height_cm,
+        water_type=aquarium.water_type,
+        start_date=aquarium.start_date,
+        description=aquarium.description,
+        ground_type=aquarium.ground_type,
+        lighting_model=aquarium.lighting_model,
+        filter_model=aquarium.filter_model
+    ))
+    await db.commit()
+
+    return {
+        "message": "Акваріум успішно додано",
+    }
+
+
 def get_aquarium(db: Session, aquarium_id: int):
     aquarium = db.query(Aquariums). \
         options(joinedload(Aquariums.device)). \
@@ -70,6 +112,22 @@ def get_aquarium(db: Session, aquarium_id: int):
     return aquarium
 
 
+async def get_aquarium_async(db: AsyncSession, aquarium_id: int):
+    # Everything AquariumRead shows is loaded up front, nothing may lazy load after the await.
+    aquarium = await db.scalar(
+        select(Aquariums)
+        .options(
+            joinedload(Aquariums.device),
+            selectinload(Aquariums.inhabitants).joinedload(Aquarium_Inhabitants.inhabitant)
+        )
+        .where(Aquariums.id == aquarium_id)
+    )
+
+    if aquarium is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Акваріум не знайдено')
+    return aquarium
+
+
 def get_aquarium_by_id_db(db: Session, aquarium_id: int, user_id:int):
     aquarium = get_aquarium(db=db, aquarium_id=aquarium_id)
     user = get_user_by_id(db=db, user_id=user_id)
@@ -82,6 +140,18 @@ def get_aquarium_by_id_db(db: Session, aquarium_id: int, user_id:int):
     return  aquarium
 
 
+async def get_aquarium_by_id_db_async(db: AsyncSession, aquarium_id: int, user_id: int):
+    aquarium = await get_aquarium_async(db=db, aquarium_id=aquarium_id)
+    user = await get_user_by_id_async(db=db, user_id=user_id)
+
+    if aquarium.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Ви не можете переглядати чужі акваріуми"
+        )
+    return aquarium
+
+
 def get_aquariums_by_user(db: Session, user_id: int):
     user = get_user_by_id(db=db, user_id=user_id)
 
@@ -89,6 +159,69 @@ def get_aquariums_by_user(db: Session, user_id: int):
     return {"aquariums": aquariums}
 
 
+async def get_aquariums_by_user_async(db: AsyncSession, user_id: int):
+    user = await get_user_by_id_async(db=db, user_id=user_id)
+
+    aquariums = (await db.scalars(select(Aquariums).where(Aquariums.user_id == user.id))).all()
+    return {"aquariums": aquariums}
+
+
+def get_aquariums_dashboard(db: Session, user_id: int):
+    user = get_user_by_id(db=db, user_id=user_id)
+
+    aquariums = db.query(Aquariums).filter(Aquariums.user_id == user.id).order_by(Aquariums.id).all()
+    if not aquariums:
+        return {"aquariums": []}
+    aquarium_ids = [aquarium.id for aquarium in aquariums]
+
+    inhabitants = {aquarium_id: [] for aquarium_id in aquarium_ids}
+    for aquarium_id, size_cm, quantity in db.execute(
+            select(Aquarium_Inhabitants.aquarium_id, Catalog_Inhabitants.size_cm, Aquarium_Inhabitants.quantity)
+            .join(Catalog_Inhabitants, Catalog_Inhabitants.id == Aquarium_Inhabitants.inhabitant_id)
+            .where(Aquarium_Inhabitants.aquarium_id.in_(aquarium_ids))
+    ):
+        inhabitants[aquarium_id].append((size_cm, quantity))
+
+    measurements = {
+        measurement.aquarium_id: measurement
+        for measurement in db.query(Manual_Measurements)
+        .filter(Manual_Measurements.aquarium_id.in_(aquarium_ids))
+        .distinct(Manual_Measurements.aquarium_id)
+        .order_by(Manual_Measurements.aquarium_id, desc(Manual_Measurements.timestamp))
+    }
+
+    open_tasks = dict(db.execute(
+        select(Tasks.aquarium_id, func.count(Tasks.id))
+        .where(Tasks.aquarium_id.in_(aquarium_ids), Tasks.is_active == True)
+        .group_by(Tasks.aquarium_id)
+    ).all())
+
+    devices = {}
+    for device in db.query(Devices).filter(Devices.aquarium_id.in_(aquarium_ids)).order_by(Devices.id):
+        devices.setdefault(device.aquarium_id, device)
+
+    latest = latest_readings.get_for_aquariums(db, aquarium_ids)
+    trends = analyze_trends_many(db, aquarium_ids, TREND_PARAMETERS)
+
+    return {
+        "aquariums": [
+            {
+                "aquarium": aquarium,
+                "device": devices.get(aquarium.id),
+                "latest": {
+                    metric: {"value": value, "timestamp": timestamp}
+                    for metric, (value, timestamp) in latest[aquarium.id].items()
+                },
+                "trends": trends[aquarium.id],
+                "cycle_status": nitrogen_cycle_status(aquarium.start_date, measurements.get(aquarium.id)),
+                "stocking": stocking_level(aquarium.volume_l, inhabitants[aquarium.id]),
+                "open_tasks": open_tasks.get(aquarium.id, 0),
+            }
+            for aquarium in aquariums
+        ]
+    }
+
+
 def update_aquarium(db: Session, aquarium_id: int, aquarium_data: AquariumUpdate, user_id: int):
     aquarium = get_aquarium(db=db, aquarium_id=aquarium_id)
     user = get_user_by_id(db=db, user_id=user_id)
@@ -119,11 +252,15 @@ def update_aquarium(db: Session, aquarium_id: int, aquarium_data: AquariumUpdate
                 detail="Name for aquarium already in use"
             )
 
+    targets = compile_targets(aquarium)
     for key, value in update_data.items():
         setattr(aquarium, key, value)
 
     db.commit()
     db.refresh(aquarium)
+
+    if compile_targets(aquarium) != targets:
+        alert_engine.invalidate_aquariums([aquarium.id])
     return aquarium
 
 
@@ -154,6 +291,79 @@ def delete_aquarium(db: Session, aquarium_id: int, user_id:int):
     db.delete(aquarium)
     db.commit()
 
+    device_key_cache.invalidate_aquariums([aquarium_id])
+    latest_readings.forget_aquariums([aquarium_id])
+    alert_engine.forget_aquariums([aquarium_id])
+
+    return {"message": f"Акваріум '{aquarium.name}' успішно видалено"}
+
+
+async def update_aquarium_async(db: AsyncSession, aquarium_id: int, aquarium_data: AquariumUpdate, user_id: int):
+    aquarium = await get_aquarium_async(db=db, aquarium_id=aquarium_id)
+    user = await get_user_by_id_async(db=db, user_id=user_id)
+
+    if aquarium.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Ви не можете змінювати чужі акваріуми"
+        )
+
+    update_data = aquarium_data.model_dump(exclude_unset=True)
+
+    new_name = update_data.get("name")
+    if new_name:
+        existing = await db.scalar(
+            select(Aquariums.id)
+            .where(
+                Aquariums.user_id == user.id,
+                func.lower(Aquariums.name) == new_name.lower(),
+                Aquariums.id != aquarium.id
+            )
+            .limit(1)
+        )
+
+        if existing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Name for aquarium already in use"
+            )
+
+    targets = compile_targets(aquarium)
+    for key, value in update_data.items():
+        setattr(aquarium, key, value)
+
+    await db.commit()
+
+    if compile_targets(aquarium) != targets:
+        alert_engine.invalidate_aquariums([aquarium.id])
+    return aquarium
+
+
+async def delete_aquarium_async(db: AsyncSession, aquarium_id: int, user_id: int):
+    aquarium = await get_aquarium_async(db=db, aquarium_id=aquarium_id)
+    user = await get_user_by_id_async(db=db, user_id=user_id)
+
+    if aquarium.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Ви не можете видаляти чужі акваріуми"
+        )
+
+    no_sync = {"synchronize_session": False}
+    await db.execute(
+        delete(Media).where(Media.attachable_type == "aquarium", Media.attachable_id == aquarium_id),
+        execution_options=no_sync
+    )
+    await db.execute(delete(Activity_Log).where(Activity_Log.aquarium_id == aquarium_id), execution_options=no_sync)
+    await db.execute(delete(Tasks).where(Tasks.aquarium_id == aquarium_id), execution_options=no_sync)
+
+    await db.delete(aquarium)
+    await db.commit()
+
+    device_key_cache.invalidate_aquariums([aquarium_id])
+    latest_readings.forget_aquariums([aquarium_id])
+    alert_engine.forget_aquariums([aquarium_id])
+
     return {"message": f"Акваріум '{aquarium.name}' успішно видалено"}
 
 
@@ -259,13 +469,20 @@ def update_device_smart_config(db: Session, aquarium_id: int):
 
     clean_config = serialize_for_json(config)
 
+    # Unchanged config keeps its revision, otherwise every waiting device would wake up for nothing.
+    if clean_config == device.config:
+        return
+
     device.config = clean_config
+    device.config_revision = Devices.config_revision + 1
 
     flag_modified(device, "config")
 
     db.add(device)
     db.commit()
 
+    device_config_channel.publish(device.id, device.config_revision, device.config)
+
 
 def calculate_feeding_config(inhabitants: list[Aquarium_Inhabitants]):
     feed_intervals = []
@@ -316,8 +533,6 @@ def calculate_heating_config(aquarium: Aquariums):
 
 
 def calculate_stocking_level(db: Session, aquarium: Aquariums) -> dict:
-    total_waste_load = 0
-
     inhabitants = (
         db.query(Aquarium_Inhabitants)
         .filter(Aquarium_Inhabitants.aquarium_id == aquarium.id)
@@ -325,17 +540,21 @@ def calculate_stocking_level(db: Session, aquarium: Aquariums) -> dict:
         .all()
     )
 
-    for link in inhabitants:
-        fish = link.inhabitant
+    return stocking_level(aquarium.volume_l, [(link.inhabitant.size_cm, link.quantity) for link in inhabitants])
 
-        single_fish_load =float(fish.size_cm)
 
-        if (fish.size_cm or 0) > 15:
+def stocking_level(volume_l: int, inhabitants: list[tuple]) -> dict:
+    total_waste_load = 0
+
+    for size_cm, quantity in inhabitants:
+        single_fish_load = float(size_cm or 0)
+
+        if (size_cm or 0) > 15:
             single_fish_load *= 1.5
 
-        total_waste_load += single_fish_load * link.quantity
+        total_waste_load += single_fish_load * quantity
 
-    filter_capacity = aquarium.volume_l
+    filter_capacity = volume_l
 
     stocking_percent = (total_waste_load / filter_capacity) * 100
 
@@ -390,6 +609,7 @@ def recalculate_aquarium_targets(db: Session, aquarium: Aquariums):
     if target_temp_min > target_temp_max:
         pass
 
+    targets = compile_targets(aquarium)
     aquarium.target_temp_c_min = target_temp_min
     aquarium.target_temp_c_max = target_temp_max
     aquarium.target_ph_min = target_ph_min
@@ -398,19 +618,16 @@ def recalculate_aquarium_targets(db: Session, aquarium: Aquariums):
     db.add(aquarium)
     db.commit()
 
+    if compile_targets(aquarium) != targets:
+        alert_engine.invalidate_aquariums([aquarium.id])
+
 
 def predict_nitrogen_cycle_status(db: Session, aquarium_id: int) -> dict:
 
     aquarium = db.query(Aquariums).filter(Aquariums.id == aquarium_id).first()
 
     if not aquarium or not aquarium.start_date:
-        return {
-            "status": "Unknown",
-            "percent": 0,
-            "message": "Будь ласка, вкажіть дату запуску акваріума в налаштуваннях."
-        }
-
-    days_alive = (date.today() - aquarium.start_date).days
+        return nitrogen_cycle_status(None, None)
 
     measurement = (
         db.query(Manual_Measurements)
@@ -419,6 +636,19 @@ def predict_nitrogen_cycle_status(db: Session, aquarium_id: int) -> dict:
         .first()
     )
 
+    return nitrogen_cycle_status(aquarium.start_date, measurement)
+
+
+def nitrogen_cycle_status(start_date: Optional[date], measurement: Optional[Manual_Measurements]) -> dict:
+    if not start_date:
+        return {
+            "status": "Unknown",
+            "percent": 0,
+            "message": "Будь ласка, вкажіть дату запуску акваріума в налаштуваннях."
+        }
+
+    days_alive = (date.today() - start_date).days
+
     if not measurement:
         if days_alive < 5:
             return {
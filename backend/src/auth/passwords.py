@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from starlette import status
+
+from src.core.config import BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_MAX_SIZE, PASSWORD_HASH_NICE
+
+logger = logging.getLogger(__name__)
+
+# Hashes made with another cost still verify, the cost is stored in the hash itself.
+bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto', bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+class OperationStats:
+    def __init__(self):
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, wait: float, took: float):
+        self.count += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.total_time += took
+        self.max_time = max(self.max_time, took)
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "avg_wait_ms": round(self.total_wait / self.count * 1000, 1) if self.count else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "avg_ms": round(self.total_time / self.count * 1000, 1) if self.count else 0.0,
+            "max_ms": round(self.max_time * 1000, 1),
+        }
+
+
+class PasswordHasher:
+    # bcrypt is ~250 ms of CPU per call at cost 12. Run inline in an async route it freezes
+    # everything else on the worker, ingest included. Here it runs on a few threads (bcrypt
+    # releases the GIL), and once max_pending calls are waiting new ones get 503 right away.
+    def __init__(self, context: CryptContext, workers: int, max_pending: int, nice: int):
+        self.context = context
+        self.workers = workers
+        self.max_pending = max_pending
+        self.nice = nice
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash", initializer=self._lower_priority
+        )
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._stats = {"hash": OperationStats(), "verify": OperationStats()}
+
+        self.rejected = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", self.context.hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run("verify", self.context.verify, password, hashed_password)
+
+    async def _run(self, operation: str, func, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Сервер перевантажений, спробуйте ще раз за мить",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return func(*args)
+            finally:
+                finished = time.perf_counter()
+                with self._lock:
+                    self._stats[operation].record(started - submitted, finished - started)
+
+        # The slot is freed when the job is done (or cancelled before it started), not when the
+        # request goes away, so aborted logins can't push more than max_pending jobs into the pool.
+        future = self._executor.submit(job)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def _lower_priority(self):
+        # On Linux a thread id is a valid target for setpriority, elsewhere it would hit the whole process.
+        if not self.nice or not sys.platform.startswith("linux"):
+            return
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+        except OSError:
+            logger.warning("Could not lower the priority of the password hashing threads")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rounds": self.context.to_dict().get("bcrypt__rounds"),
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "rejected": self.rejected,
+                **{operation: stats.as_dict() for operation, stats in self._stats.items()},
+            }
+
+
+password_hasher = PasswordHasher(
+    context=bcrypt_context,
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_QUEUE_MAX_SIZE,
+    nice=PASSWORD_HASH_NICE,
+)
@@ -2,17 +2,18 @@ import os
 from datetime import timedelta, datetime, timezone
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
-from passlib.context import CryptContext
 from jose import jwt, JWTError
 from starlette import status
 from fastapi.security import OAuth2PasswordBearer
 from src.database import get_db
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.auth.schemas import UserRegistration
 from src.users.models import Users, User_Settings, User_Profiles
+from src.auth.passwords import bcrypt_context, password_hasher
 
 
-bcrypt_context = CryptContext(schemes=['bcrypt'], deprecated='auto')
 oauth2_bearer = OAuth2PasswordBearer(tokenUrl="/auth/login/")
 db_dependency = Annotated[Session, Depends(get_db)]
 
@@ -79,12 +80,55 @@ async def create_user(db:db_dependency, new_user: UserRegistration):
     }
 
 
+async def create_user_async(db: AsyncSession, new_user: UserRegistration):
+    await get_user_by_email_async(db=db, email=new_user.email)
+    await db.commit()
+
+    create_user_model = Users(
+        email = new_user.email,
+        hashed_password = await password_hasher.hash(new_user.password)
+    )
+
+    db.add(create_user_model)
+    # The id is all the profile and settings rows need, one commit covers all three.
+    await db.flush()
+
+    db.add(User_Settings(user_id=create_user_model.id))
+    db.add(User_Profiles(
+        user_id=create_user_model.id,
+        nickname=None,
+        first_name=None,
+        last_name=None
+    ))
+
+    await db.commit()
+
+    token = create_access_token(
+        subject=create_user_model.email,
+        id=create_user_model.id,
+        role=create_user_model.role.value,
+        expires_delta=timedelta(minutes=30)
+    )
+
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "user_name": create_user_model.email
+    }
+
+
 def get_user_by_email(db:db_dependency, email:str):
     existing_user = db.query(Users).filter(Users.email == email).first()
     if existing_user:
          raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Користувач з таким email вже існує")
 
 
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    existing_user = await db.scalar(select(Users.id).where(Users.email == email))
+    if existing_user:
+         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Користувач з таким email вже існує")
+
+
 def authenticate_user(db: Session, email: str, password: str):
     user = db.query(Users).filter(Users.email == email).first()
     if not user:
@@ -101,4 +145,25 @@ def authenticate_user(db: Session, email: str, password: str):
     if not bcrypt_context.verify(password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Неправильний пароль, спробуйте ще раз")
     
-    return user
\ No newline at end of file
+    return user
+
+
+async def authenticate_user_async(db: AsyncSession, email: str, password: str):
+    user = await db.scalar(select(Users).where(Users.email == email))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Неправильный email, спробуйте ще раз"
+        )
+
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Ви заблоковані"
+        )
+    # Ends the read-only transaction, a login queued for the hasher shouldn't hold a pooled connection.
+    await db.commit()
+    if not await password_hasher.verify(password, user.hashed_password):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Неправильний пароль, спробуйте ще раз")
+
+    return user
@@ -1,11 +1,12 @@
 from typing import Annotated, List
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_db
+from src.database import get_db, get_async_db
 from src.auth.service import get_current_user
 from src.catalog.schemas import InhabitantsShowList, DiseasesShow, InhabitantsShowOne, InhabitantsFilter
-from src.catalog.service import get_all_inhabitants, get_all_diseases, get_inhabitant_logic
+from src.catalog.service import get_all_inhabitants_async, get_all_diseases_async, get_inhabitant_logic_async
 from src.monitoring.schemas import SymptomDTO, SmartDiagnosisRequest
 from src.catalog.service import diagnose_disease_smart
 from src.catalog.models import CatalogSymptom
@@ -13,22 +14,23 @@ from src.catalog.models import CatalogSymptom
 router = APIRouter(prefix="/catalog", tags=["Catalog 📚"])
 
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 
 
 @router.get("/inhabitants/", response_model=List[InhabitantsShowList])
-async def get_inhabitants(db:db_dependency, user:user_dependency, filters: InhabitantsFilter = Depends()):
-    return get_all_inhabitants(db=db, user_id=user.get("user_id"), filters=filters)
+async def get_inhabitants(db:async_db_dependency, user:user_dependency, filters: InhabitantsFilter = Depends()):
+    return await get_all_inhabitants_async(db=db, user_id=user.get("user_id"), filters=filters)
 
 
 @router.get("/disease/", response_model=List[DiseasesShow])
-async def get_diseases(db:db_dependency, user:user_dependency):
-    return get_all_diseases(db=db, user_id=user.get("user_id"))
+async def get_diseases(db:async_db_dependency, user:user_dependency):
+    return await get_all_diseases_async(db=db, user_id=user.get("user_id"))
 
 
 @router.get("/inhabitants/{inhabitant_id}", response_model=InhabitantsShowOne)
-async def get_inhabitant(db:db_dependency, inhabitant_id:int, user_id:user_dependency):
-    return get_inhabitant_logic(db=db, inhabitant_id=inhabitant_id, user_id=user_id.get("user_id"))
+async def get_inhabitant(db:async_db_dependency, inhabitant_id:int, user_id:user_dependency):
+    return await get_inhabitant_logic_async(db=db, inhabitant_id=inhabitant_id, user_id=user_id.get("user_id"))
 
 
 @router.get("/symptoms", response_model=List[SymptomDTO])
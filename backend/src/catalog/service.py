@@ -1,7 +1,8 @@
 import os
 from typing import Annotated
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, HTTPException
 from starlette import status
 from src.database import get_db
@@ -104,9 +105,23 @@ def  get_inhabitant_by_id(db: Session, inhabitant_id: int):
    return inhabitant
 
 
+async def get_inhabitant_by_id_async(db: AsyncSession, inhabitant_id: int):
+    inhabitant = await db.get(Catalog_Inhabitants, inhabitant_id)
+    if inhabitant is None:
+        raise  HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Inhabitant не знайдено')
+    return inhabitant
+
+
 def get_all_inhabitants(db: Session, user_id: int, filters: InhabitantsFilter):
-    query = db.query(Catalog_Inhabitants)
+    return filter_inhabitants(db.query(Catalog_Inhabitants), filters).all()
+
+
+async def get_all_inhabitants_async(db: AsyncSession, user_id: int, filters: InhabitantsFilter):
+    return (await db.scalars(filter_inhabitants(select(Catalog_Inhabitants), filters))).all()
 
+
+def filter_inhabitants(query, filters: InhabitantsFilter):
+    # Works for both a Query and a select(), .filter() is the same on each.
     if filters.name:
         query = query.filter(Catalog_Inhabitants.name.ilike(f"%{filters.name}%"))
 
@@ -155,7 +170,7 @@ def get_all_inhabitants(db: Session, user_id: int, filters: InhabitantsFilter):
     if filters.dkh_max:
         query = query.filter(Catalog_Inhabitants.dkh_max >= filters.dkh_max)
 
-    return query.all()
+    return query
 
 
 def get_all_diseases(db: Session, user_id):
@@ -163,10 +178,18 @@ def get_all_diseases(db: Session, user_id):
     return diseases
 
 
+async def get_all_diseases_async(db: AsyncSession, user_id):
+    return (await db.scalars(select(Catalog_Diseases))).all()
+
+
 def get_inhabitant_logic(db: Session, inhabitant_id: int, user_id:int):
     return get_inhabitant_by_id(db, inhabitant_id)
 
 
+async def get_inhabitant_logic_async(db: AsyncSession, inhabitant_id: int, user_id: int):
+    return await get_inhabitant_by_id_async(db, inhabitant_id)
+
+
 def diagnose_disease_smart(db: Session, selected_symptom_ids: list[int]) -> list[dict]:
     diseases = db.query(Catalog_Diseases).options(selectinload(Catalog_Diseases.symptoms_list)).all()
 
@@ -0,0 +1,60 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    def __init__(
+            self,
+            name: str,
+            interval_seconds: float,
+            func: Callable[[], None],
+            run_on_start: bool = True,
+            run_on_stop: bool = False
+    ):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.func = func
+        self.run_on_start = run_on_start
+        self.run_on_stop = run_on_stop
+
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.runs = 0
+        self.failures = 0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        if not self.running:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def run_once(self):
+        try:
+            self.func()
+            self.runs += 1
+        except Exception:
+            self.failures += 1
+            logger.exception("Periodic task %s failed", self.name)
+
+    def _run(self):
+        if self.run_on_start:
+            self.run_once()
+        while not self._stopping.wait(self.interval_seconds):
+            self.run_once()
+        if self.run_on_stop:
+            self.run_once()
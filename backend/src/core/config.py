@@ -0,0 +1,89 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEVICE_CACHE_MAX_SIZE = int(os.getenv("DEVICE_CACHE_MAX_SIZE", 10000))
+DEVICE_CACHE_TTL_SECONDS = float(os.getenv("DEVICE_CACHE_TTL_SECONDS", 300))
+DEVICE_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("DEVICE_CACHE_NEGATIVE_TTL_SECONDS", 30))
+
+INGEST_MODE = os.getenv("INGEST_MODE", "sync")
+INGEST_BUFFER_MAX_SIZE = int(os.getenv("INGEST_BUFFER_MAX_SIZE", 50000))
+INGEST_FLUSH_ROWS = int(os.getenv("INGEST_FLUSH_ROWS", 500))
+INGEST_FLUSH_INTERVAL_MS = int(os.getenv("INGEST_FLUSH_INTERVAL_MS", 200))
+INGEST_FLUSH_RETRIES = int(os.getenv("INGEST_FLUSH_RETRIES", 3))
+INGEST_FLUSH_RETRY_BACKOFF_MS = int(os.getenv("INGEST_FLUSH_RETRY_BACKOFF_MS", 100))
+
+MQTT_ENABLED = os.getenv("MQTT_ENABLED", "false").lower() in ("1", "true", "yes")
+MQTT_HOST = os.getenv("MQTT_HOST", "localhost")
+MQTT_PORT = int(os.getenv("MQTT_PORT", 1883))
+MQTT_USERNAME = os.getenv("MQTT_USERNAME")
+MQTT_PASSWORD = os.getenv("MQTT_PASSWORD")
+MQTT_CLIENT_ID = os.getenv("MQTT_CLIENT_ID")
+MQTT_TOPIC_PREFIX = os.getenv("MQTT_TOPIC_PREFIX", "aquacore/devices")
+MQTT_SHARED_GROUP = os.getenv("MQTT_SHARED_GROUP")
+MQTT_QOS = int(os.getenv("MQTT_QOS", 1))
+MQTT_QUEUE_MAX_SIZE = int(os.getenv("MQTT_QUEUE_MAX_SIZE", 50000))
+MQTT_FLUSH_ROWS = int(os.getenv("MQTT_FLUSH_ROWS", 1000))
+MQTT_FLUSH_INTERVAL_MS = int(os.getenv("MQTT_FLUSH_INTERVAL_MS", 200))
+
+SENSOR_PARTITION_MONTHS_AHEAD = int(os.getenv("SENSOR_PARTITION_MONTHS_AHEAD", 3))
+SENSOR_RETENTION_MONTHS = int(os.getenv("SENSOR_RETENTION_MONTHS", 0))
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL_SECONDS", 6 * 3600))
+
+SERIES_RAW_MAX_HOURS = float(os.getenv("SERIES_RAW_MAX_HOURS", 48))
+SERIES_HOURLY_MAX_DAYS = float(os.getenv("SERIES_HOURLY_MAX_DAYS", 60))
+CHART_RAW_MAX_DAYS = float(os.getenv("CHART_RAW_MAX_DAYS", 31))
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 5000))
+MANUAL_IMPORT_CHUNK_ROWS = int(os.getenv("MANUAL_IMPORT_CHUNK_ROWS", 5000))
+MANUAL_IMPORT_MAX_ERRORS = int(os.getenv("MANUAL_IMPORT_MAX_ERRORS", 1000))
+
+LIVE_QUEUE_SIZE = int(os.getenv("LIVE_QUEUE_SIZE", 100))
+LIVE_KEEPALIVE_SECONDS = float(os.getenv("LIVE_KEEPALIVE_SECONDS", 15))
+LATEST_READINGS_MAX_AGE_SECONDS = float(os.getenv("LATEST_READINGS_MAX_AGE_SECONDS", 30))
+
+DEVICE_CONFIG_POLL_SECONDS = float(os.getenv("DEVICE_CONFIG_POLL_SECONDS", 30))
+DEVICE_CONFIG_POLL_MAX_SECONDS = float(os.getenv("DEVICE_CONFIG_POLL_MAX_SECONDS", 300))
+DEVICE_CONFIG_SYNC_SECONDS = float(os.getenv("DEVICE_CONFIG_SYNC_SECONDS", 10))
+
+DEVICE_OFFLINE_AFTER_SECONDS = float(os.getenv("DEVICE_OFFLINE_AFTER_SECONDS", 300))
+HEARTBEAT_SWEEP_INTERVAL_SECONDS = float(os.getenv("HEARTBEAT_SWEEP_INTERVAL_SECONDS", 30))
+
+INGEST_SEQ_RESET_GAP = int(os.getenv("INGEST_SEQ_RESET_GAP", 1000))
+DEVICE_CLOCK_MAX_SKEW_SECONDS = float(os.getenv("DEVICE_CLOCK_MAX_SKEW_SECONDS", 300))
+BACKFILL_MAX_READINGS = int(os.getenv("BACKFILL_MAX_READINGS", 5000))
+BACKFILL_MAX_AGE_DAYS = float(os.getenv("BACKFILL_MAX_AGE_DAYS", 30))
+
+INGEST_RATE_PER_MINUTE = float(os.getenv("INGEST_RATE_PER_MINUTE", 60))
+INGEST_RATE_BURST = float(os.getenv("INGEST_RATE_BURST", 10))
+INGEST_UNKNOWN_RATE_PER_MINUTE = float(os.getenv("INGEST_UNKNOWN_RATE_PER_MINUTE", 30))
+INGEST_UNKNOWN_RATE_BURST = float(os.getenv("INGEST_UNKNOWN_RATE_BURST", 10))
+RATE_LIMIT_MAX_BUCKETS = int(os.getenv("RATE_LIMIT_MAX_BUCKETS", 100000))
+
+ANOMALY_EWMA_ALPHA = float(os.getenv("ANOMALY_EWMA_ALPHA", 0.05))
+ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", 4.0))
+ANOMALY_WARMUP_SAMPLES = int(os.getenv("ANOMALY_WARMUP_SAMPLES", 30))
+ANOMALY_COOLDOWN_SECONDS = float(os.getenv("ANOMALY_COOLDOWN_SECONDS", 1800))
+ANOMALY_FLUSH_INTERVAL_SECONDS = float(os.getenv("ANOMALY_FLUSH_INTERVAL_SECONDS", 10))
+ANOMALY_CHECKPOINT_INTERVAL_SECONDS = float(os.getenv("ANOMALY_CHECKPOINT_INTERVAL_SECONDS", 300))
+
+ALERT_DEBOUNCE_READINGS = int(os.getenv("ALERT_DEBOUNCE_READINGS", 3))
+ALERT_FLUSH_INTERVAL_SECONDS = float(os.getenv("ALERT_FLUSH_INTERVAL_SECONDS", 5))
+
+NOTIFY_TRANSPORT = os.getenv("NOTIFY_TRANSPORT", "file")
+NOTIFY_FILE_PATH = os.getenv("NOTIFY_FILE_PATH", "notifications.log")
+NOTIFY_SMTP_HOST = os.getenv("NOTIFY_SMTP_HOST", "localhost")
+NOTIFY_SMTP_PORT = int(os.getenv("NOTIFY_SMTP_PORT", 1025))
+NOTIFY_SENDER = os.getenv("NOTIFY_SENDER", "alerts@aquacore.local")
+NOTIFY_COALESCE_SECONDS = float(os.getenv("NOTIFY_COALESCE_SECONDS", 300))
+NOTIFY_DISPATCH_INTERVAL_SECONDS = float(os.getenv("NOTIFY_DISPATCH_INTERVAL_SECONDS", 10))
+NOTIFY_BATCH_SIZE = int(os.getenv("NOTIFY_BATCH_SIZE", 50))
+NOTIFY_MAX_ATTEMPTS = int(os.getenv("NOTIFY_MAX_ATTEMPTS", 5))
+NOTIFY_RETRY_BASE_SECONDS = float(os.getenv("NOTIFY_RETRY_BASE_SECONDS", 30))
+NOTIFY_RETRY_MAX_SECONDS = float(os.getenv("NOTIFY_RETRY_MAX_SECONDS", 1800))
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", max(1, (os.cpu_count() or 2) // 2)))
+PASSWORD_HASH_QUEUE_MAX_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_MAX_SIZE", 16))
+PASSWORD_HASH_NICE = int(os.getenv("PASSWORD_HASH_NICE", 10))
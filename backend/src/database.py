@@ -1,5 +1,6 @@
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, declared_attr
 from dotenv import load_dotenv
 
@@ -20,13 +21,30 @@ DATABASE_URL = (
     f"{os.getenv('DB_NAME')}?sslmode=require&channel_binding=require"
 )
 
+ASYNC_DATABASE_URL = (
+    f"postgresql+asyncpg://{os.getenv('DB_USER')}:"
+    f"{os.getenv('DB_PASS')}@"
+    f"{os.getenv('DB_HOST')}/"
+    f"{os.getenv('DB_NAME')}?ssl=require"
+)
+
 engine = create_engine(DATABASE_URL, echo=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(ASYNC_DATABASE_URL)
+
+# expire_on_commit=False: an expired attribute would need a lazy load, which an AsyncSession can't do implicitly.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,220 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from src.core.background import PeriodicTask
+from src.core.config import DEVICE_CONFIG_SYNC_SECONDS
+from src.database import SessionLocal
+from src.monitoring.models import Devices
+
+logger = logging.getLogger(__name__)
+
+SYNC_CHUNK = 1000
+
+
+class DeviceConfig(NamedTuple):
+    revision: int
+    config: dict
+
+
+class DeviceConfigChannel:
+    # Holds the current config of every device that polled, so an idle long-poll is only a
+    # future on the event loop: no thread, no pooled connection and no DB round trips until
+    # update_device_smart_config publishes a new revision. Changes saved through another
+    # worker are picked up by sync(), one query for all waiting devices per interval.
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._configs: dict[int, DeviceConfig] = {}
+        self._waiters: dict[int, set[asyncio.Future]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+        self.polls = 0
+        self.immediate = 0
+        self.woken = 0
+        self.timeouts = 0
+        self.published = 0
+        self.loads = 0
+        self.syncs = 0
+        self.synced = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def current(self, device_id: int) -> Optional[DeviceConfig]:
+        with self._lock:
+            return self._configs.get(device_id)
+
+    def load(self, db: Session, device_id: int) -> Optional[DeviceConfig]:
+        row = db.execute(select(Devices.config_revision, Devices.config).where(Devices.id == device_id)).first()
+        if row is None:
+            return None
+
+        with self._lock:
+            self.loads += 1
+            current = self._configs.get(device_id)
+            # A publish may have landed while the row was being read.
+            if current is None or current.revision < row.config_revision:
+                current = self._configs[device_id] = DeviceConfig(row.config_revision, row.config or {})
+            return current
+
+    def publish(self, device_id: int, revision: int, config: dict):
+        # Called from request threads after the commit; waiters are woken on the event loop.
+        with self._lock:
+            current = self._configs.get(device_id)
+            if current is not None and current.revision >= revision:
+                return
+            self._configs[device_id] = DeviceConfig(revision, config or {})
+            self.published += 1
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake, device_id)
+
+    async def wait(self, device_id: int, revision: Optional[int], timeout: float) -> Optional[DeviceConfig]:
+        # Answers only with a revision newer than the one the device has. A device can be ahead
+        # of this worker when the change went through another one, then it waits for the sync.
+        known = -1 if revision is None else revision
+        with self._lock:
+            self.polls += 1
+
+        current = self.current(device_id)
+        if current is not None and current.revision > known:
+            with self._lock:
+                self.immediate += 1
+            return current
+        if timeout <= 0:
+            return None
+
+        deadline = time.monotonic() + timeout
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._waiters[device_id].add(future)
+        try:
+            # Registered before the second look, so a publish in between still wakes us.
+            while True:
+                current = self.current(device_id)
+                if current is not None and current.revision > known:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError
+                await asyncio.wait_for(future, remaining)
+                # Woken by a publish that is still not newer than what the device has.
+                with self._lock:
+                    self._waiters[device_id].discard(future)
+                    future = asyncio.get_running_loop().create_future()
+                    self._waiters[device_id].add(future)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            return None
+        finally:
+            with self._lock:
+                waiters = self._waiters.get(device_id)
+                if waiters is not None:
+                    waiters.discard(future)
+                    if not waiters:
+                        del self._waiters[device_id]
+
+        with self._lock:
+            self.woken += 1
+        return current
+
+    def sync(self, db: Session) -> int:
+        with self._lock:
+            cached = {
+                device_id: self._configs[device_id].revision
+                for device_id in self._waiters if device_id in self._configs
+            }
+
+        changed = []
+        device_ids = list(cached)
+        for start in range(0, len(device_ids), SYNC_CHUNK):
+            chunk = device_ids[start:start + SYNC_CHUNK]
+            rows = db.execute(select(Devices.id, Devices.config_revision).where(Devices.id.in_(chunk))).all()
+            changed.extend(device_id for device_id, revision in rows if revision > cached[device_id])
+
+        if changed:
+            rows = db.execute(
+                select(Devices.id, Devices.config_revision, Devices.config).where(Devices.id.in_(changed))
+            ).all()
+            for device_id, revision, config in rows:
+                self.publish(device_id, revision, config)
+
+        with self._lock:
+            self.syncs += 1
+            self.synced += len(changed)
+        return len(changed)
+
+    def forget_devices(self, device_ids: list[int]):
+        with self._lock:
+            for device_id in device_ids:
+                self._configs.pop(device_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "devices": len(self._configs),
+                "waiting": sum(len(waiters) for waiters in self._waiters.values()),
+                "polls": self.polls,
+                "immediate": self.immediate,
+                "woken": self.woken,
+                "timeouts": self.timeouts,
+                "published": self.published,
+                "loads": self.loads,
+                "syncs": self.syncs,
+                "synced": self.synced,
+            }
+
+    def _wake(self, device_id: int):
+        with self._lock:
+            waiters = list(self._waiters.get(device_id, ()))
+        for future in waiters:
+            if not future.done():
+                future.set_result(None)
+
+
+device_config_channel = DeviceConfigChannel()
+
+
+def run_device_config_sync():
+    db = SessionLocal()
+    try:
+        changed = device_config_channel.sync(db)
+        if changed:
+            logger.info("Device configs changed elsewhere: %d", changed)
+    finally:
+        db.close()
+
+
+device_config_syncer = PeriodicTask(
+    name="device-config-sync",
+    interval_seconds=DEVICE_CONFIG_SYNC_SECONDS,
+    func=run_device_config_sync,
+    run_on_start=False,
+)
+
+
+def config_etag(device_id: int, revision: int) -> str:
+    return f'"{device_id}-{revision}"'
+
+
+def parse_etag(value: Optional[str], device_id: int) -> Optional[int]:
+    if not value:
+        return None
+    for tag in value.split(","):
+        tag = tag.strip().removeprefix("W/").strip('"')
+        prefix, _, revision = tag.rpartition("-")
+        if prefix == str(device_id) and revision.isdigit():
+            return int(revision)
+    return None
+
+
+@event.listens_for(Devices, "after_delete")
+def _forget_deleted_device(mapper, connection, target: Devices):
+    device_config_channel.forget_devices([target.id])
@@ -0,0 +1,58 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from starlette.concurrency import run_in_threadpool
+from starlette import status
+
+from src.database import SessionLocal
+from src.core.config import DEVICE_CONFIG_POLL_SECONDS, DEVICE_CONFIG_POLL_MAX_SECONDS
+from src.devices.channel import config_etag, device_config_channel, parse_etag
+from src.devices.schemas import DeviceConfigResponse
+from src.monitoring.device_cache import device_key_cache
+from src.monitoring.heartbeat import heartbeat_tracker
+
+router = APIRouter(prefix="/devices", tags=["Devices 📡"])
+
+
+@router.get(
+  "/config",
+  response_model=DeviceConfigResponse,
+  responses={status.HTTP_304_NOT_MODIFIED: {"description": "Конфігурація не змінилась"}}
+)
+async def poll_device_config(
+        response: Response,
+        api_key: str = Header(..., alias="X-API-Key"),
+        if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+        revision: Optional[int] = Query(None, ge=0),
+        wait: float = Query(DEVICE_CONFIG_POLL_SECONDS, ge=0, le=DEVICE_CONFIG_POLL_MAX_SECONDS)
+):
+  def load(device):
+    db = SessionLocal()
+    try:
+      device = device or device_key_cache.load(db, api_key)
+      return device, device_config_channel.load(db, device.device_id) if device else None
+    finally:
+      db.close()
+
+  found, device = device_key_cache.peek(api_key)
+  current = device_config_channel.current(device.device_id) if device else None
+
+  # Only the first poll of a device touches the database, later ones wait on the channel.
+  if not found or (device is not None and current is None):
+    device, current = await run_in_threadpool(load, device)
+
+  if device is None or current is None:
+    raise HTTPException(status_code=404, detail="Девайс не знайдено або невірний api key")
+
+  heartbeat_tracker.touch([device.device_id])
+
+  known = revision if revision is not None else parse_etag(if_none_match, device.device_id)
+  # The device got a newer revision from another worker, so the cached one is stale.
+  if known is not None and known > current.revision:
+    _, current = await run_in_threadpool(load, device)
+
+  update = await device_config_channel.wait(device.device_id, known, wait)
+  if update is None:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": config_etag(device.device_id, known)})
+
+  response.headers["ETag"] = config_etag(device.device_id, update.revision)
+  return {"device_id": device.device_id, "revision": update.revision, "config": update.config}
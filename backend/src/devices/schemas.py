@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class DeviceConfigResponse(BaseModel):
+    device_id: int
+    revision: int
+    config: dict
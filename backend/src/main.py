@@ -1,22 +1,70 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 import src.models_registry
 from fastapi import FastAPI
-from src.database import SessionLocal
+from src.database import SessionLocal, async_engine
+from src.core.config import INGEST_MODE, MQTT_ENABLED
+from src.monitoring.ingest_buffer import ingest_buffer
+from src.monitoring.mqtt_gateway import mqtt_gateway
+from src.monitoring.partitions import partition_maintenance
+from src.monitoring.live import measurement_broker
+from src.monitoring.heartbeat import heartbeat_sweeper
+from src.monitoring.anomalies import anomaly_flusher, anomaly_checkpointer
+from src.monitoring.alerts import alert_flusher
+from src.notifications.dispatcher import notification_sender, flush_notifications
+from src.devices.channel import device_config_channel, device_config_syncer
 from src.auth.router import router as auth_router
 from src.users.router import router as users_router
 from src.aquariums.router import router as aquariums_router
 from src.monitoring.router import router as monitoring_router
+from src.devices.router import router as devices_router
 from src.admin.router import router as admin_router
 from src.catalog.router import router as catalog_router
 from src.tasks.router import router as tasks_router
 from src.core.router import router as core_router
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  measurement_broker.bind(asyncio.get_running_loop())
+  device_config_channel.bind(asyncio.get_running_loop())
+  partition_maintenance.start()
+  heartbeat_sweeper.start()
+  anomaly_flusher.start()
+  anomaly_checkpointer.start()
+  alert_flusher.start()
+  notification_sender.start()
+  device_config_syncer.start()
+  if INGEST_MODE == "buffered":
+    ingest_buffer.start()
+  if MQTT_ENABLED:
+    mqtt_gateway.start()
+
+  yield
+
+  await asyncio.to_thread(mqtt_gateway.stop)
+  await asyncio.to_thread(ingest_buffer.stop)
+  await asyncio.to_thread(partition_maintenance.stop)
+  await asyncio.to_thread(heartbeat_sweeper.stop)
+  await asyncio.to_thread(anomaly_flusher.stop)
+  await asyncio.to_thread(anomaly_checkpointer.stop)
+  await asyncio.to_thread(alert_flusher.stop)
+  await asyncio.to_thread(notification_sender.stop)
+  await asyncio.to_thread(device_config_syncer.stop)
+  await asyncio.to_thread(flush_notifications)
+  await async_engine.dispose()
+
+
 app = FastAPI(
-  title="AquaCore 🐠"
+  title="AquaCore 🐠",
+  lifespan=lifespan
 )
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(aquariums_router)
 app.include_router(monitoring_router)
+app.include_router(devices_router)
 app.include_router(admin_router)
 app.include_router(catalog_router)
 app.include_router(tasks_router)
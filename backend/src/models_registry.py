@@ -3,5 +3,7 @@ from src.users.models import Users, User_Profiles, User_Settings
 from src.catalog.models import Catalog_Inhabitants, Catalog_Diseases, Knowledge_Base_Articles
 from src.media.models import Media
 from src.monitoring.models import Devices, Sensor_Measurements, Manual_Measurements, Activity_Log
+from src.monitoring.models import Sensor_Rollups_Hourly, Sensor_Rollups_Daily, Sensor_Anomaly_State
+from src.monitoring.models import Alert_Events
 from src.social.models import Posts, Likes, Follows
 from src.tasks.models import Tasks, Task_Completions 
\ No newline at end of file
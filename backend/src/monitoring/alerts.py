@@ -0,0 +1,320 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.aquariums.models import Aquariums
+from src.core.background import PeriodicTask
+from src.core.config import ALERT_DEBOUNCE_READINGS, ALERT_FLUSH_INTERVAL_SECONDS
+from src.database import SessionLocal
+from src.monitoring.device_cache import device_key_cache
+from src.monitoring.models import Alert_Events, Devices
+
+logger = logging.getLogger(__name__)
+
+TARGET_COLUMNS = {
+    "temperature": ("target_temp_c_min", "target_temp_c_max"),
+    "ph": ("target_ph_min", "target_ph_max"),
+    "tds": ("target_tds_min", "target_tds_max"),
+    "gh": ("target_gh_min", "target_gh_max"),
+    "kh": ("target_kh_min", "target_kh_max"),
+    "ammonia": (None, "target_ammonia_max"),
+    "nitrite": (None, "target_nitrite_max"),
+    "nitrate": (None, "target_nitrate_max"),
+    "phosphate": (None, "target_phosphate_max"),
+}
+
+SENSOR_ALERT_METRICS = ("temperature", "ph", "tds")
+MANUAL_ALERT_METRICS = ("ammonia", "nitrite", "nitrate", "gh", "kh", "phosphate")
+
+# How far back inside the range a value has to come before an alert clears.
+HYSTERESIS = {
+    "temperature": 0.3,
+    "ph": 0.1,
+    "tds": 10,
+    "gh": 0.5,
+    "kh": 0.5,
+    "ammonia": 0.02,
+    "nitrite": 0.02,
+    "nitrate": 2,
+    "phosphate": 0.1,
+}
+
+ALERT_OK = "ok"
+ALERT_LOW = "low"
+ALERT_HIGH = "high"
+
+Targets = dict[str, tuple[Optional[float], Optional[float]]]
+
+
+class AlertState:
+    __slots__ = ("state", "pending", "pending_count")
+
+    def __init__(self, state: str = ALERT_OK):
+        self.state = state
+        self.pending = state
+        self.pending_count = 0
+
+
+def compile_targets(aquarium) -> Targets:
+    targets = {}
+    for metric, (min_column, max_column) in TARGET_COLUMNS.items():
+        low = getattr(aquarium, min_column) if min_column else None
+        high = getattr(aquarium, max_column)
+        if low is None and high is None:
+            continue
+        targets[metric] = (
+            float(low) if low is not None else None,
+            float(high) if high is not None else None,
+        )
+    return targets
+
+
+def classify(metric: str, value: float, low: Optional[float], high: Optional[float], current: str) -> str:
+    if high is not None and value > high:
+        return ALERT_HIGH
+    if low is not None and value < low:
+        return ALERT_LOW
+
+    margin = HYSTERESIS.get(metric, 0)
+    if current == ALERT_HIGH and high is not None and value > high - margin:
+        return ALERT_HIGH
+    if current == ALERT_LOW and low is not None and value < low + margin:
+        return ALERT_LOW
+    return ALERT_OK
+
+
+class AlertEngine:
+    def __init__(self, debounce_readings: int):
+        self.debounce_readings = debounce_readings
+
+        self._targets: dict[int, Targets] = {}
+        self._states: dict[tuple[int, str], AlertState] = {}
+        self._restored: set[int] = set()
+        self._pending: list[dict] = []
+        self._listeners: list[Callable[[list[dict]], None]] = []
+        self._lock = threading.Lock()
+
+        self.evaluations = 0
+        self.transitions = 0
+        self.debounced = 0
+        self.compiled = 0
+        self.persisted = 0
+
+    def evaluate_sensor_rows(self, db: Session, rows: list[dict]) -> list[dict]:
+        if not rows:
+            return []
+
+        aquariums = self._resolve_device_aquariums(db, {row["device_id"] for row in rows})
+        self._ensure_targets(db, {a_id for a_id in aquariums.values() if a_id is not None})
+
+        readings = [
+            (aquariums.get(row["device_id"]), row["device_id"], row.get("timestamp"), row)
+            for row in rows
+        ]
+        return self._evaluate(readings, SENSOR_ALERT_METRICS, "sensor", self.debounce_readings)
+
+    def evaluate_manual_rows(self, db: Session, rows: list[dict]) -> list[dict]:
+        if not rows:
+            return []
+
+        self._ensure_targets(db, {row["aquarium_id"] for row in rows})
+
+        # A manual test is a deliberate reading, one is enough to switch state.
+        readings = [(row["aquarium_id"], None, row.get("timestamp"), row) for row in rows]
+        return self._evaluate(readings, MANUAL_ALERT_METRICS, "manual", 1)
+
+    def _evaluate(self, readings: list[tuple], metrics: tuple[str, ...], source: str, debounce: int) -> list[dict]:
+        transitions = []
+        with self._lock:
+            for aquarium_id, device_id, timestamp, row in readings:
+                targets = self._targets.get(aquarium_id)
+                if not targets:
+                    continue
+                for metric in metrics:
+                    value = row.get(metric)
+                    bounds = targets.get(metric)
+                    if value is None or bounds is None:
+                        continue
+
+                    value = float(value)
+                    key = (aquarium_id, metric)
+                    state = self._states.get(key)
+                    if state is None:
+                        state = self._states[key] = AlertState()
+
+                    self.evaluations += 1
+                    new_state = classify(metric, value, *bounds, state.state)
+                    if new_state == state.state:
+                        state.pending, state.pending_count = state.state, 0
+                        continue
+
+                    if new_state == state.pending:
+                        state.pending_count += 1
+                    else:
+                        state.pending, state.pending_count = new_state, 1
+                    if state.pending_count < debounce:
+                        self.debounced += 1
+                        continue
+
+                    transitions.append({
+                        "aquarium_id": aquarium_id,
+                        "device_id": device_id,
+                        "metric": metric,
+                        "state": new_state,
+                        "previous_state": state.state,
+                        "value": value,
+                        "target_min": bounds[0],
+                        "target_max": bounds[1],
+                        "source": source,
+                        "timestamp": timestamp or datetime.now(),
+                    })
+                    state.state, state.pending, state.pending_count = new_state, new_state, 0
+
+            self._pending.extend(transitions)
+            self.transitions += len(transitions)
+
+        if transitions:
+            for listener in self._listeners:
+                try:
+                    listener(transitions)
+                except Exception:
+                    logger.exception("Alert listener %r failed", listener)
+        return transitions
+
+    def add_listener(self, listener: Callable[[list[dict]], None]):
+        self._listeners.append(listener)
+
+    def _resolve_device_aquariums(self, db: Session, device_ids: set[int]) -> dict[int, Optional[int]]:
+        resolved = {}
+        missing = []
+        for device_id in device_ids:
+            device = device_key_cache.get_by_device(device_id)
+            if device is None:
+                missing.append(device_id)
+            else:
+                resolved[device_id] = device.aquarium_id
+
+        if missing:
+            resolved.update(db.execute(
+                select(Devices.id, Devices.aquarium_id).where(Devices.id.in_(missing))
+            ).all())
+        return resolved
+
+    def _ensure_targets(self, db: Session, aquarium_ids: set[int]):
+        with self._lock:
+            missing = [a_id for a_id in aquarium_ids if a_id not in self._targets]
+            unrestored = [a_id for a_id in missing if a_id not in self._restored]
+        if not missing:
+            return
+
+        columns = {column for pair in TARGET_COLUMNS.values() for column in pair if column}
+        rows = db.execute(
+            select(Aquariums.id, *(getattr(Aquariums, column) for column in sorted(columns)))
+            .where(Aquariums.id.in_(missing))
+        ).all()
+        compiled = {row.id: compile_targets(row) for row in rows}
+
+        # Pick up where the last process left off instead of re-firing every open alert.
+        last_states = []
+        if unrestored:
+            last_states = db.execute(
+                select(Alert_Events.aquarium_id, Alert_Events.metric, Alert_Events.state)
+                .where(Alert_Events.aquarium_id.in_(unrestored))
+                .distinct(Alert_Events.aquarium_id, Alert_Events.metric)
+                .order_by(Alert_Events.aquarium_id, Alert_Events.metric, Alert_Events.timestamp.desc())
+            ).all()
+
+        with self._lock:
+            for aquarium_id in missing:
+                self._targets[aquarium_id] = compiled.get(aquarium_id, {})
+            self.compiled += len(missing)
+            for aquarium_id, metric, state in last_states:
+                self._states.setdefault((aquarium_id, metric), AlertState(state))
+            self._restored.update(unrestored)
+
+    def invalidate_aquariums(self, aquarium_ids: list[int]):
+        with self._lock:
+            for aquarium_id in aquarium_ids:
+                self._targets.pop(aquarium_id, None)
+
+    def forget_aquariums(self, aquarium_ids: list[int]):
+        aquarium_ids = set(aquarium_ids)
+        with self._lock:
+            for aquarium_id in aquarium_ids:
+                self._targets.pop(aquarium_id, None)
+                self._restored.discard(aquarium_id)
+            for key in [key for key in self._states if key[0] in aquarium_ids]:
+                del self._states[key]
+            self._pending = [event for event in self._pending if event["aquarium_id"] not in aquarium_ids]
+
+    def active_alerts(self, aquarium_id: int) -> dict[str, str]:
+        with self._lock:
+            return {
+                metric: state.state for (a_id, metric), state in self._states.items()
+                if a_id == aquarium_id and state.state != ALERT_OK
+            }
+
+    def flush(self, db: Session) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        existing = set(db.scalars(
+            select(Aquariums.id).where(Aquariums.id.in_({event["aquarium_id"] for event in pending}))
+        ))
+        events = [event for event in pending if event["aquarium_id"] in existing]
+        if events:
+            try:
+                db.execute(insert(Alert_Events), events)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self._pending[:0] = pending
+                raise
+
+        with self._lock:
+            self.persisted += len(events)
+        return len(events)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "aquariums": len(self._targets),
+                "tracked": len(self._states),
+                "active": sum(1 for state in self._states.values() if state.state != ALERT_OK),
+                "evaluations": self.evaluations,
+                "transitions": self.transitions,
+                "debounced": self.debounced,
+                "compiled": self.compiled,
+                "pending": len(self._pending),
+                "persisted": self.persisted,
+            }
+
+
+alert_engine = AlertEngine(debounce_readings=ALERT_DEBOUNCE_READINGS)
+
+
+def run_alert_flush():
+    db = SessionLocal()
+    try:
+        persisted = alert_engine.flush(db)
+        if persisted:
+            logger.info("Persisted %d alert transitions", persisted)
+    finally:
+        db.close()
+
+
+alert_flusher = PeriodicTask(
+    name="aquarium-alert-flusher",
+    interval_seconds=ALERT_FLUSH_INTERVAL_SECONDS,
+    func=run_alert_flush,
+    run_on_start=False,
+    run_on_stop=True,
+)
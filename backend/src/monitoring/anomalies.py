@@ -0,0 +1,305 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.core.background import PeriodicTask
+from src.core.config import (
+    ANOMALY_EWMA_ALPHA, ANOMALY_Z_THRESHOLD, ANOMALY_WARMUP_SAMPLES, ANOMALY_COOLDOWN_SECONDS,
+    ANOMALY_FLUSH_INTERVAL_SECONDS, ANOMALY_CHECKPOINT_INTERVAL_SECONDS
+)
+from src.database import SessionLocal
+from src.monitoring.models import Activity_Log, Devices, Sensor_Anomaly_State
+
+logger = logging.getLogger(__name__)
+
+ANOMALY_EVENT_TYPE = "sensor_anomaly"
+
+# Floor for the standard deviation, so a sensor that reads the same value for hours
+# doesn't turn the next 0.01 step into a huge z-score.
+ANOMALY_METRICS = {
+    "temperature": 0.05,
+    "ph": 0.02,
+    "tds": 2.0,
+    "turbidity": 0.05,
+}
+
+METRIC_LABELS = {
+    "temperature": "температура",
+    "ph": "pH",
+    "tds": "TDS",
+    "turbidity": "каламутність",
+}
+
+CHECKPOINT_CHUNK = 1000
+MAX_PENDING_EVENTS = 10000
+
+
+class EwmaState:
+    __slots__ = ("mean", "variance", "samples", "last_alert_at")
+
+    def __init__(self, mean: float, variance: float = 0.0, samples: int = 1, last_alert_at: Optional[datetime] = None):
+        self.mean = mean
+        self.variance = variance
+        self.samples = samples
+        self.last_alert_at = last_alert_at
+
+
+class AnomalyDetector:
+    def __init__(self, alpha: float, z_threshold: float, warmup_samples: int, cooldown_seconds: float):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup_samples = warmup_samples
+        self.cooldown = timedelta(seconds=cooldown_seconds)
+
+        self._states: dict[tuple[int, str], EwmaState] = {}
+        self._dirty: set[tuple[int, str]] = set()
+        self._pending: list[dict] = []
+        self._restored = False
+        self._lock = threading.Lock()
+
+        self.observed = 0
+        self.anomalies = 0
+        self.suppressed = 0
+        self.logged = 0
+        self.dropped = 0
+        self.checkpointed = 0
+        self.observe_seconds = 0.0
+
+    def observe(self, rows: list[dict]) -> list[dict]:
+        started = time.perf_counter()
+        found = []
+        with self._lock:
+            for row in rows:
+                device_id = row["device_id"]
+                timestamp = row.get("timestamp") or datetime.now()
+                for metric, min_std in ANOMALY_METRICS.items():
+                    value = row.get(metric)
+                    if value is None:
+                        continue
+                    anomaly = self._update((device_id, metric), float(value), min_std, timestamp)
+                    if anomaly is not None:
+                        found.append({"device_id": device_id, "metric": metric, "timestamp": timestamp, **anomaly})
+                self.observed += 1
+            self._pending.extend(found)
+            if len(self._pending) > MAX_PENDING_EVENTS:
+                self.dropped += len(self._pending) - MAX_PENDING_EVENTS
+                del self._pending[:-MAX_PENDING_EVENTS]
+            self.anomalies += len(found)
+            self.observe_seconds += time.perf_counter() - started
+        return found
+
+    def _update(self, key: tuple[int, str], value: float, min_std: float, timestamp: datetime) -> Optional[dict]:
+        self._dirty.add(key)
+        state = self._states.get(key)
+        if state is None:
+            self._states[key] = EwmaState(value)
+            return None
+
+        anomaly = None
+        deviation = value - state.mean
+        if state.samples >= self.warmup_samples:
+            z = deviation / max(math.sqrt(state.variance), min_std)
+            if abs(z) >= self.z_threshold:
+                if state.last_alert_at is None or timestamp - state.last_alert_at >= self.cooldown:
+                    state.last_alert_at = timestamp
+                    anomaly = {"value": value, "expected": state.mean, "z": z}
+                else:
+                    self.suppressed += 1
+
+        # Plain running mean while warming up, then an exponentially weighted one.
+        alpha = max(self.alpha, 1 / (state.samples + 1))
+        increment = alpha * deviation
+        state.mean += increment
+        state.variance = (1 - alpha) * (state.variance + deviation * increment)
+        state.samples += 1
+        return anomaly
+
+    def flush_events(self, db: Session) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return 0
+
+        device_ids = {anomaly["device_id"] for anomaly in pending}
+        aquariums = dict(db.execute(
+            select(Devices.id, Devices.aquarium_id).where(Devices.id.in_(device_ids))
+        ).all())
+
+        entries = [
+            {
+                "aquarium_id": aquariums[anomaly["device_id"]],
+                "timestamp": anomaly["timestamp"],
+                "description": describe_anomaly(anomaly),
+                "event_type": ANOMALY_EVENT_TYPE,
+                "reference_id": anomaly["device_id"],
+            }
+            for anomaly in pending
+            if aquariums.get(anomaly["device_id"]) is not None
+        ]
+        if entries:
+            try:
+                db.execute(insert(Activity_Log), entries)
+                db.commit()
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self._pending[:0] = pending
+                raise
+
+        with self._lock:
+            self.logged += len(entries)
+        return len(entries)
+
+    def restore(self, db: Session):
+        stored = db.execute(
+            select(
+                Sensor_Anomaly_State.device_id, Sensor_Anomaly_State.metric, Sensor_Anomaly_State.mean,
+                Sensor_Anomaly_State.variance, Sensor_Anomaly_State.samples, Sensor_Anomaly_State.last_alert_at
+            )
+        ).all()
+
+        with self._lock:
+            for device_id, metric, mean, variance, samples, last_alert_at in stored:
+                key = (device_id, metric)
+                current = self._states.get(key)
+                # Readings that arrived before the restore only replace the checkpoint
+                # once they have warmed up on their own.
+                if current is None or current.samples < self.warmup_samples:
+                    self._states[key] = EwmaState(mean, variance, samples, last_alert_at)
+                    self._dirty.discard(key)
+            self._restored = True
+
+    def checkpoint(self, db: Session) -> int:
+        if not self._restored:
+            self.restore(db)
+
+        updated_at = datetime.now()
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            rows = [
+                {
+                    "device_id": device_id,
+                    "metric": metric,
+                    "mean": state.mean,
+                    "variance": state.variance,
+                    "samples": state.samples,
+                    "last_alert_at": state.last_alert_at,
+                    "updated_at": updated_at,
+                }
+                for device_id, metric in dirty
+                if (state := self._states.get((device_id, metric))) is not None
+            ]
+        if not rows:
+            return 0
+
+        stmt = insert(Sensor_Anomaly_State)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["device_id", "metric"],
+            set_={column: stmt.excluded[column] for column in ("mean", "variance", "samples", "last_alert_at", "updated_at")}
+        )
+        try:
+            for start in range(0, len(rows), CHECKPOINT_CHUNK):
+                chunk = rows[start:start + CHECKPOINT_CHUNK]
+                # Skip devices deleted since their last reading instead of failing on the foreign key.
+                existing = set(db.scalars(
+                    select(Devices.id).where(Devices.id.in_({row["device_id"] for row in chunk}))
+                ))
+                chunk = [row for row in chunk if row["device_id"] in existing]
+                if chunk:
+                    db.execute(stmt, chunk)
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty.update(dirty)
+            raise
+
+        with self._lock:
+            self.checkpointed += len(rows)
+        return len(rows)
+
+    def forget_devices(self, device_ids: list[int]):
+        device_ids = set(device_ids)
+        with self._lock:
+            for key in [key for key in self._states if key[0] in device_ids]:
+                del self._states[key]
+                self._dirty.discard(key)
+            self._pending = [anomaly for anomaly in self._pending if anomaly["device_id"] not in device_ids]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tracked_series": len(self._states),
+                "observed": self.observed,
+                "anomalies": self.anomalies,
+                "suppressed_by_cooldown": self.suppressed,
+                "pending_events": len(self._pending),
+                "logged": self.logged,
+                "dropped": self.dropped,
+                "dirty_series": len(self._dirty),
+                "checkpointed": self.checkpointed,
+                "avg_observe_us": round(self.observe_seconds / self.observed * 1e6, 3) if self.observed else 0.0,
+            }
+
+
+def describe_anomaly(anomaly: dict) -> str:
+    label = METRIC_LABELS.get(anomaly["metric"], anomaly["metric"])
+    return (
+        f"Аномальне значення датчика: {label} = {round(anomaly['value'], 2)} "
+        f"(очікувалось близько {round(anomaly['expected'], 2)}, z = {anomaly['z']:+.1f})"
+    )
+
+
+anomaly_detector = AnomalyDetector(
+    alpha=ANOMALY_EWMA_ALPHA,
+    z_threshold=ANOMALY_Z_THRESHOLD,
+    warmup_samples=ANOMALY_WARMUP_SAMPLES,
+    cooldown_seconds=ANOMALY_COOLDOWN_SECONDS,
+)
+
+
+def run_anomaly_flush():
+    db = SessionLocal()
+    try:
+        logged = anomaly_detector.flush_events(db)
+        if logged:
+            logger.info("Logged %d sensor anomalies", logged)
+    finally:
+        db.close()
+
+
+def run_anomaly_checkpoint():
+    db = SessionLocal()
+    try:
+        anomaly_detector.checkpoint(db)
+    finally:
+        db.close()
+
+
+anomaly_flusher = PeriodicTask(
+    name="sensor-anomaly-flusher",
+    interval_seconds=ANOMALY_FLUSH_INTERVAL_SECONDS,
+    func=run_anomaly_flush,
+    run_on_start=False,
+    run_on_stop=True,
+)
+
+anomaly_checkpointer = PeriodicTask(
+    name="sensor-anomaly-checkpointer",
+    interval_seconds=ANOMALY_CHECKPOINT_INTERVAL_SECONDS,
+    func=run_anomaly_checkpoint,
+    run_on_start=True,
+    run_on_stop=True,
+)
+
+
+@event.listens_for(Devices, "after_delete")
+def _forget_deleted_device(mapper, connection, target: Devices):
+    anomaly_detector.forget_devices([target.id])
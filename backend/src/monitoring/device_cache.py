@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from src.core.config import (
+    DEVICE_CACHE_MAX_SIZE, DEVICE_CACHE_TTL_SECONDS, DEVICE_CACHE_NEGATIVE_TTL_SECONDS
+)
+from src.monitoring.models import Devices, DeviceStatus
+from src.monitoring.rate_limit import RateLimit, parse_rate_limit
+
+
+class CachedDevice(NamedTuple):
+    device_id: int
+    aquarium_id: Optional[int]
+    status: DeviceStatus
+    rate_limit: Optional[RateLimit] = None
+
+
+class DeviceKeyCache:
+    def __init__(self, max_size: int, ttl_seconds: float, negative_ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+
+        # api_key -> (expires_at, device); device is None for unknown keys
+        self._entries: OrderedDict[str, tuple[float, Optional[CachedDevice]]] = OrderedDict()
+        self._keys_by_device: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def peek(self, api_key: str) -> tuple[bool, Optional[CachedDevice]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(api_key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            expires_at, device = entry
+            if expires_at <= now:
+                self._drop(api_key)
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(api_key)
+            if device is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, device
+
+    def put(self, api_key: str, device: Optional[CachedDevice]):
+        ttl = self.ttl_seconds if device is not None else self.negative_ttl_seconds
+        with self._lock:
+            self._drop(api_key)
+            self._entries[api_key] = (time.monotonic() + ttl, device)
+            if device is not None:
+                self._keys_by_device[device.device_id] = api_key
+
+            while len(self._entries) > self.max_size:
+                oldest_key = next(iter(self._entries))
+                self._drop(oldest_key)
+                self.evictions += 1
+
+    def resolve(self, db: Session, api_key: str) -> Optional[CachedDevice]:
+        found, device = self.peek(api_key)
+        if found:
+            return device
+        return self.load(db, api_key)
+
+    def load(self, db: Session, api_key: str) -> Optional[CachedDevice]:
+        row = db.execute(
+            select(Devices.id, Devices.aquarium_id, Devices.status, Devices.config).where(Devices.api_key == api_key)
+        ).first()
+
+        device = CachedDevice(row.id, row.aquarium_id, row.status, parse_rate_limit(row.config)) if row else None
+        self.put(api_key, device)
+        return device
+
+    def resolve_many(self, db: Session, api_keys: set[str]) -> dict[str, Optional[CachedDevice]]:
+        resolved = {}
+        missing = set()
+
+        for api_key in api_keys:
+            found, device = self.peek(api_key)
+            if found:
+                resolved[api_key] = device
+            else:
+                missing.add(api_key)
+
+        if missing:
+            resolved.update(self.load_many(db, missing))
+        return resolved
+
+    def load_many(self, db: Session, api_keys: set[str]) -> dict[str, Optional[CachedDevice]]:
+        rows = db.execute(
+            select(Devices.api_key, Devices.id, Devices.aquarium_id, Devices.status, Devices.config)
+            .where(Devices.api_key.in_(api_keys))
+        ).all()
+        loaded = {api_key: CachedDevice(device_id, aquarium_id, status, parse_rate_limit(config))
+                  for api_key, device_id, aquarium_id, status, config in rows}
+
+        resolved = {}
+        for api_key in api_keys:
+            device = loaded.get(api_key)
+            self.put(api_key, device)
+            resolved[api_key] = device
+        return resolved
+
+    def get_by_device(self, device_id: int) -> Optional[CachedDevice]:
+        with self._lock:
+            api_key = self._keys_by_device.get(device_id)
+            if api_key is None:
+                return None
+            return self._entries[api_key][1]
+
+    def invalidate_key(self, api_key: str):
+        with self._lock:
+            self._drop(api_key)
+
+    def invalidate_device(self, device_id: int):
+        with self._lock:
+            api_key = self._keys_by_device.get(device_id)
+            if api_key is not None:
+                self._drop(api_key)
+
+    def invalidate_devices(self, device_ids: list[int]):
+        for device_id in device_ids:
+            self.invalidate_device(device_id)
+
+    def invalidate_aquariums(self, aquarium_ids: list[int]):
+        aquarium_ids = set(aquarium_ids)
+        with self._lock:
+            stale = [
+                api_key for api_key, (_, device) in self._entries.items()
+                if device is not None and device.aquarium_id in aquarium_ids
+            ]
+            for api_key in stale:
+                self._drop(api_key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_device.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._entries)
+        lookups = self.hits + self.negative_hits + self.misses
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.negative_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+    def _drop(self, api_key: str):
+        entry = self._entries.pop(api_key, None)
+        if entry is not None and entry[1] is not None:
+            self._keys_by_device.pop(entry[1].device_id, None)
+
+
+device_key_cache = DeviceKeyCache(
+    max_size=DEVICE_CACHE_MAX_SIZE,
+    ttl_seconds=DEVICE_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=DEVICE_CACHE_NEGATIVE_TTL_SECONDS,
+)
+
+
+@event.listens_for(Devices, "after_insert")
+def _forget_negative_entry(mapper, connection, target: Devices):
+    device_key_cache.invalidate_key(target.api_key)
+
+
+@event.listens_for(Devices, "after_update")
+def _invalidate_changed_device(mapper, connection, target: Devices):
+    for old_key in inspect(target).attrs.api_key.history.deleted:
+        device_key_cache.invalidate_key(old_key)
+    device_key_cache.invalidate_key(target.api_key)
+    device_key_cache.invalidate_device(target.id)
+
+
+@event.listens_for(Devices, "after_delete")
+def _invalidate_deleted_device(mapper, connection, target: Devices):
+    device_key_cache.invalidate_key(target.api_key)
+    device_key_cache.invalidate_device(target.id)
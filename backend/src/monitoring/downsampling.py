@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import Float, case, cast, func, select
+from sqlalchemy.orm import Session
+
+from src.core.config import CHART_RAW_MAX_DAYS
+from src.monitoring.models import SENSOR_METRICS, Sensor_Measurements, Sensor_Rollups_Hourly
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    # Largest-Triangle-Three-Buckets: keeps the first and last point and, from every bucket
+    # in between, the point forming the largest triangle with the previously kept point and
+    # the average of the next bucket. Returns indices into x / y.
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    sum_x = np.concatenate(([0.0], np.cumsum(x)))
+    sum_y = np.concatenate(([0.0], np.cumsum(y)))
+    sizes = edges[1:] - edges[:-1]
+    avg_x = (sum_x[edges[1:]] - sum_x[edges[:-1]]) / sizes
+    avg_y = (sum_y[edges[1:]] - sum_y[edges[:-1]]) / sizes
+    # The bucket after the last one is the final point itself.
+    avg_x = np.append(avg_x[1:], x[-1])
+    avg_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        xs, ys = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x[bucket]) * (ys - y[a]) - (x[a] - xs) * (avg_y[bucket] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[bucket + 1] = a
+    return selected
+
+
+def _raw_columns(db: Session, device_id: int, since: datetime, until: datetime, metrics: tuple[str, ...]) -> list:
+    return db.execute(
+        select(
+            func.extract("epoch", Sensor_Measurements.timestamp),
+            *(func.coalesce(cast(getattr(Sensor_Measurements, m), Float), float("nan")) for m in metrics)
+        )
+        .where(Sensor_Measurements.device_id == device_id)
+        .where(Sensor_Measurements.timestamp >= since, Sensor_Measurements.timestamp < until)
+        .order_by(Sensor_Measurements.timestamp)
+    ).all()
+
+
+def _rollup_columns(db: Session, device_id: int, since: datetime, until: datetime, metrics: tuple[str, ...]) -> list:
+    # An hourly average would flatten a short pH crash, so each bucket contributes
+    # whichever extreme lies further from its average.
+    table = Sensor_Rollups_Hourly
+    columns = []
+    for metric in metrics:
+        low, high = getattr(table, f"{metric}_min"), getattr(table, f"{metric}_max")
+        count, total = getattr(table, f"{metric}_count"), getattr(table, f"{metric}_sum")
+        average = total / func.nullif(count, 0)
+        columns.append(func.coalesce(
+            case((high - average > average - low, high), else_=low), float("nan")
+        ))
+    return db.execute(
+        select(func.extract("epoch", table.bucket), *columns)
+        .where(table.device_id == device_id)
+        .where(table.bucket >= since, table.bucket < until)
+        .order_by(table.bucket)
+    ).all()
+
+
+def get_downsampled_series(
+        db: Session,
+        device_id: int,
+        since: datetime,
+        until: datetime,
+        points: int,
+        metrics: tuple[str, ...] = SENSOR_METRICS
+) -> dict:
+    source = "raw" if until - since <= timedelta(days=CHART_RAW_MAX_DAYS) else "hour"
+    loader = _raw_columns if source == "raw" else _rollup_columns
+    rows = loader(db, device_id, since, until, metrics)
+
+    data = np.array(rows, dtype=np.float64) if rows else np.empty((0, len(metrics) + 1))
+    epochs = data[:, 0]
+
+    series = {}
+    for column, metric in enumerate(metrics, start=1):
+        values = data[:, column]
+        present = np.flatnonzero(np.isfinite(values))
+        x, y = epochs[present], values[present]
+        keep = lttb(x, y, points)
+        series[metric] = {
+            # Postgres epochs of naive timestamps are wall-clock seconds, so convert back without a timezone.
+            "timestamps": (x[keep] * 1e6).astype("datetime64[us]").tolist(),
+            "values": y[keep].tolist(),
+        }
+
+    return {
+        "device_id": device_id,
+        "since": since,
+        "until": until,
+        "source": source,
+        "raw_points": len(rows),
+        "series": series,
+    }
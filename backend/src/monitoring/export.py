@@ -0,0 +1,84 @@
+import csv
+import io
+from datetime import datetime
+from typing import Iterator, Optional
+
+from sqlalchemy import Select, select
+
+from src.aquariums.models import Aquariums
+from src.core.config import EXPORT_CHUNK_ROWS
+from src.database import SessionLocal
+from src.monitoring.models import SENSOR_METRICS, Devices, Sensor_Measurements
+
+EXPORT_COLUMNS = ("id", "device_id", "aquarium_id", "timestamp", *SENSOR_METRICS)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def sensor_export_statement(
+        user_id: int,
+        aquarium_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+) -> Select:
+    stmt = (
+        select(
+            Sensor_Measurements.id,
+            Sensor_Measurements.device_id,
+            Devices.aquarium_id,
+            Sensor_Measurements.timestamp,
+            *(getattr(Sensor_Measurements, metric) for metric in SENSOR_METRICS)
+        )
+        .join(Devices, Devices.id == Sensor_Measurements.device_id)
+        .join(Aquariums, Aquariums.id == Devices.aquarium_id)
+        .where(Aquariums.user_id == user_id)
+        .order_by(Sensor_Measurements.timestamp, Sensor_Measurements.id)
+    )
+
+    if aquarium_id is not None:
+        stmt = stmt.where(Devices.aquarium_id == aquarium_id)
+    if since is not None:
+        stmt = stmt.where(Sensor_Measurements.timestamp >= since)
+    if until is not None:
+        stmt = stmt.where(Sensor_Measurements.timestamp < until)
+    return stmt
+
+
+def stream_sensor_export(stmt: Select, fmt: str, chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[str]:
+    encode = _encode_csv if fmt == "csv" else _encode_ndjson
+
+    if fmt == "csv":
+        yield ",".join(EXPORT_COLUMNS) + "\n"
+
+    # The request session is closed before the body is streamed, so the export owns its own.
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=chunk_rows))
+        for rows in result.partitions():
+            yield encode(rows)
+    finally:
+        db.close()
+
+
+def _json_value(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, datetime):
+        return f'"{value.isoformat()}"'
+    return str(value)
+
+
+def _encode_ndjson(rows) -> str:
+    return "".join(
+        "{" + ",".join(f'"{name}":{_json_value(value)}' for name, value in zip(EXPORT_COLUMNS, row)) + "}\n"
+        for row in rows
+    )
+
+
+def _encode_csv(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
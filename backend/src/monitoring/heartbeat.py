@@ -0,0 +1,222 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from src.core.background import PeriodicTask
+from src.core.config import DEVICE_OFFLINE_AFTER_SECONDS, HEARTBEAT_SWEEP_INTERVAL_SECONDS
+from src.database import SessionLocal
+from src.monitoring.models import Devices, DeviceStatus
+
+logger = logging.getLogger(__name__)
+
+STATUS_UPDATE_CHUNK = 1000
+
+
+class HeartbeatTracker:
+    # Every process that ingests (API workers, a standalone MQTT gateway) tracks what it heard
+    # in memory. Sweeps write only status transitions, plus Devices.last_seen_at at most once per
+    # half silence window per device, so a device heard by any process is never marked offline.
+    def __init__(self, offline_after_seconds: float):
+        self.offline_after = timedelta(seconds=offline_after_seconds)
+        self.presence_interval = self.offline_after / 2
+
+        self._last_seen: dict[int, datetime] = {}
+        # device_id -> Devices.last_seen_at as far as this process knows; None until the first sweep.
+        self._persisted_seen: Optional[dict[int, Optional[datetime]]] = None
+        self._max_known_id = 0
+        self._started_at = datetime.now()
+        self._swept_at = datetime.min
+        self._lock = threading.Lock()
+
+        self.sweeps = 0
+        self.went_online = 0
+        self.went_offline = 0
+        self.presence_writes = 0
+        self.last_sweep_ms = 0.0
+
+    def touch(self, device_ids, seen_at: Optional[datetime] = None):
+        seen_at = seen_at or datetime.now()
+        with self._lock:
+            for device_id in device_ids:
+                self._last_seen[device_id] = seen_at
+
+    def last_seen(self, device_id: int) -> Optional[datetime]:
+        with self._lock:
+            return self._last_seen.get(device_id)
+
+    def sweep(self, db: Session) -> tuple[list[int], list[int]]:
+        started = datetime.now()
+        persisted_seen = self._load_new_devices(db)
+
+        with self._lock:
+            heard = [
+                device_id for device_id, seen_at in self._last_seen.items()
+                if seen_at > self._swept_at and device_id in persisted_seen
+            ]
+
+        online = []
+        for chunk in _chunks(heard):
+            online += db.scalars(
+                update(Devices)
+                .where(Devices.id.in_(chunk), Devices.status != DeviceStatus.online)
+                .values(status=DeviceStatus.online, last_seen_at=started)
+                .returning(Devices.id)
+                .execution_options(synchronize_session=False)
+            ).all()
+
+        went_online = set(online)
+        refresh_before = started - self.presence_interval
+        presence = [
+            device_id for device_id in heard
+            if device_id not in went_online
+            and (persisted_seen[device_id] is None or persisted_seen[device_id] <= refresh_before)
+        ]
+        for chunk in _chunks(presence):
+            db.execute(update(Devices).where(Devices.id.in_(chunk)).values(last_seen_at=started))
+
+        # Devices persisted as online but never seen since last_seen_at was added get one
+        # full silence window counted from process start.
+        cutoff = started - self.offline_after
+        silent = Devices.last_seen_at <= cutoff
+        if self._started_at <= cutoff:
+            silent = silent | Devices.last_seen_at.is_(None)
+        offline = db.scalars(
+            update(Devices)
+            .where(Devices.status == DeviceStatus.online, silent)
+            .values(status=DeviceStatus.offline)
+            .returning(Devices.id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        db.commit()
+
+        with self._lock:
+            for device_id in (*online, *presence):
+                self._persisted_seen[device_id] = started
+            self._swept_at = started
+            self.sweeps += 1
+            self.went_online += len(online)
+            self.went_offline += len(offline)
+            self.presence_writes += len(presence)
+            self.last_sweep_ms = (datetime.now() - started).total_seconds() * 1000
+
+        return online, list(offline)
+
+    def forget_devices(self, device_ids: list[int]):
+        with self._lock:
+            for device_id in device_ids:
+                self._last_seen.pop(device_id, None)
+                if self._persisted_seen is not None:
+                    self._persisted_seen.pop(device_id, None)
+
+    def stale_devices(self, db: Session, silence_seconds: Optional[float] = None, limit: int = 100) -> list[dict]:
+        cutoff = datetime.now() - (timedelta(seconds=silence_seconds) if silence_seconds else self.offline_after)
+        persisted_seen = self._load_new_devices(db)
+
+        with self._lock:
+            local_seen = dict(self._last_seen)
+
+        candidates = []
+        for device_id, seen_at in persisted_seen.items():
+            local = local_seen.get(device_id)
+            if local is not None and (seen_at is None or local > seen_at):
+                seen_at = local
+            if seen_at is None or seen_at <= cutoff:
+                candidates.append((seen_at, device_id))
+        candidates.sort(key=lambda item: (item[0] is not None, item[0] or datetime.min, item[1]))
+
+        # Other processes may have heard a candidate since this one last wrote, so the rows
+        # are rechecked page by page and only as many as the limit needs are read.
+        stale = []
+        for start in range(0, len(candidates), limit):
+            page = candidates[start:start + limit]
+            rows = {
+                row.id: row for row in db.execute(
+                    select(Devices.id, Devices.name, Devices.aquarium_id, Devices.status, Devices.last_seen_at)
+                    .where(Devices.id.in_([device_id for _, device_id in page]))
+                )
+            }
+            for seen_at, device_id in page:
+                row = rows.get(device_id)
+                if row is None:
+                    continue
+                if row.last_seen_at is not None and row.last_seen_at > cutoff:
+                    with self._lock:
+                        if self._persisted_seen is not None and device_id in self._persisted_seen:
+                            self._persisted_seen[device_id] = row.last_seen_at
+                    continue
+                stale.append({
+                    "device_id": device_id,
+                    "name": row.name,
+                    "aquarium_id": row.aquarium_id,
+                    "status": row.status,
+                    "last_seen": seen_at,
+                })
+                if len(stale) == limit:
+                    return stale
+        return stale
+
+    def _load_new_devices(self, db: Session) -> dict[int, Optional[datetime]]:
+        # Ids only grow, so devices created since the last look (by any process) are a range scan.
+        with self._lock:
+            max_known_id = self._max_known_id
+        rows = db.execute(
+            select(Devices.id, Devices.last_seen_at).where(Devices.id > max_known_id).order_by(Devices.id)
+        ).all()
+
+        with self._lock:
+            if self._persisted_seen is None:
+                self._persisted_seen = {}
+            for device_id, seen_at in rows:
+                self._persisted_seen.setdefault(device_id, seen_at)
+            if rows:
+                self._max_known_id = max(self._max_known_id, rows[-1].id)
+            return dict(self._persisted_seen)
+
+    def stats(self) -> dict:
+        cutoff = datetime.now() - self.offline_after
+        with self._lock:
+            return {
+                "tracked": len(self._last_seen),
+                "online": sum(1 for seen_at in self._last_seen.values() if seen_at > cutoff),
+                "sweeps": self.sweeps,
+                "went_online": self.went_online,
+                "went_offline": self.went_offline,
+                "presence_writes": self.presence_writes,
+                "last_sweep_ms": round(self.last_sweep_ms, 3),
+            }
+
+
+def _chunks(device_ids: list[int]):
+    for start in range(0, len(device_ids), STATUS_UPDATE_CHUNK):
+        yield device_ids[start:start + STATUS_UPDATE_CHUNK]
+
+
+heartbeat_tracker = HeartbeatTracker(offline_after_seconds=DEVICE_OFFLINE_AFTER_SECONDS)
+
+
+def run_heartbeat_sweep():
+    db = SessionLocal()
+    try:
+        online, offline = heartbeat_tracker.sweep(db)
+        if online or offline:
+            logger.info("Devices online: %d, offline: %d", len(online), len(offline))
+    finally:
+        db.close()
+
+
+heartbeat_sweeper = PeriodicTask(
+    name="device-heartbeat-sweeper",
+    interval_seconds=HEARTBEAT_SWEEP_INTERVAL_SECONDS,
+    func=run_heartbeat_sweep,
+    run_on_start=False,
+    run_on_stop=True,
+)
+
+
+@event.listens_for(Devices, "after_delete")
+def _forget_deleted_device(mapper, connection, target: Devices):
+    heartbeat_tracker.forget_devices([target.id])
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from src.core.config import DEVICE_CLOCK_MAX_SKEW_SECONDS
+from src.monitoring.alerts import alert_engine
+from src.monitoring.anomalies import anomaly_detector
+from src.monitoring.latest import latest_readings
+from src.monitoring.live import measurement_broker
+from src.monitoring.models import Sensor_Measurements
+from src.monitoring.rollups import apply_rollups
+from src.monitoring.schemas import SensorMeasurements
+from src.monitoring.sequence import sequence_tracker
+
+
+def reading_timestamp(device_ts: Optional[datetime], received_at: Optional[datetime] = None) -> Optional[datetime]:
+    if device_ts is None:
+        return received_at
+
+    if device_ts.tzinfo is not None:
+        device_ts = device_ts.astimezone().replace(tzinfo=None)
+
+    # A device clock running ahead would write into future partitions and rollup buckets.
+    if device_ts > datetime.now() + timedelta(seconds=DEVICE_CLOCK_MAX_SKEW_SECONDS):
+        return received_at
+    return device_ts
+
+
+def build_sensor_row(
+        device_id: int,
+        measurements: SensorMeasurements,
+        timestamp: Optional[datetime] = None,
+        seq: Optional[int] = None
+) -> dict:
+    row = {"device_id": device_id, "seq": seq, **measurements.model_dump()}
+    if timestamp is not None:
+        row["timestamp"] = timestamp
+    return row
+
+
+def insert_sensor_rows(db: Session, rows: list[dict]) -> list[dict]:
+    stmt = insert(Sensor_Measurements).on_conflict_do_nothing()
+    if not any(row["seq"] is not None for row in rows):
+        db.execute(stmt, rows)
+        return rows
+
+    # Retries that carry the device timestamp collide on the (device_id, seq, timestamp)
+    # unique index, e.g. after a restart wiped the in-memory marks.
+    inserted = set(db.execute(
+        stmt.returning(Sensor_Measurements.device_id, Sensor_Measurements.seq, Sensor_Measurements.timestamp),
+        rows
+    ).all())
+    return [row for row in rows
+            if row["seq"] is None or (row["device_id"], row["seq"], row["timestamp"]) in inserted]
+
+
+def store_sensor_rows(db: Session, rows: list[dict], detect_anomalies: bool = True) -> list[dict]:
+    rows, _ = sequence_tracker.split(rows)
+    if not rows:
+        return []
+
+    received_at = datetime.now()
+    for row in rows:
+        row.setdefault("timestamp", received_at)
+        row.setdefault("seq", None)
+
+    stored = insert_sensor_rows(db, rows)
+    sequence_tracker.count_conflicts(len(rows) - len(stored))
+
+    apply_rollups(db, stored)
+    db.commit()
+
+    sequence_tracker.advance(stored)
+    latest_readings.update(stored)
+    measurement_broker.publish(stored)
+    alert_engine.evaluate_sensor_rows(db, stored)
+    if detect_anomalies:
+        anomaly_detector.observe(stored)
+    return stored
+
+
+def drop_known_readings(db: Session, rows: list[dict]) -> list[dict]:
+    # Readings without seq have no unique index to collide on, a re-sent backlog
+    # is recognised by the exact device timestamp instead.
+    seqless = [row for row in rows if row["seq"] is None]
+    if not seqless:
+        return rows
+
+    known = set(db.execute(
+        select(Sensor_Measurements.device_id, Sensor_Measurements.timestamp)
+        .where(Sensor_Measurements.device_id.in_({row["device_id"] for row in seqless}))
+        .where(Sensor_Measurements.seq.is_(None))
+        .where(Sensor_Measurements.timestamp.between(
+            min(row["timestamp"] for row in seqless), max(row["timestamp"] for row in seqless)
+        ))
+    ).all())
+
+    fresh = []
+    for row in rows:
+        if row["seq"] is None:
+            key = (row["device_id"], row["timestamp"])
+            if key in known:
+                continue
+            known.add(key)
+        fresh.append(row)
+    return fresh
+
+
+def backfill_sensor_rows(db: Session, rows: list[dict]) -> list[dict]:
+    # The in-memory seq marks follow the live stream, an offline backlog sits behind them,
+    # so duplicates are left to the unique index.
+    rows = drop_known_readings(db, sorted(rows, key=lambda row: row["timestamp"]))
+    if not rows:
+        return []
+
+    stored = insert_sensor_rows(db, rows)
+    # Rollups merge per bucket and keep "last" by last_at, late rows only touch their own buckets.
+    apply_rollups(db, stored)
+    db.commit()
+
+    # Old readings don't go to live subscribers, alerts or anomaly detection, those track the present.
+    latest_readings.update(stored)
+    return stored
@@ -0,0 +1,188 @@
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Optional
+
+from src.core.config import (
+    INGEST_BUFFER_MAX_SIZE,
+    INGEST_FLUSH_INTERVAL_MS,
+    INGEST_FLUSH_RETRIES,
+    INGEST_FLUSH_RETRY_BACKOFF_MS,
+    INGEST_FLUSH_ROWS,
+)
+from src.database import SessionLocal
+from src.monitoring.ingest import store_sensor_rows
+
+logger = logging.getLogger(__name__)
+
+
+class IngestBuffer:
+    def __init__(
+            self,
+            max_size: int,
+            flush_rows: int,
+            flush_interval_ms: int,
+            writer: Callable,
+            retries: int = INGEST_FLUSH_RETRIES,
+            retry_backoff_ms: int = INGEST_FLUSH_RETRY_BACKOFF_MS
+    ):
+        self.max_size = max_size
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval_ms / 1000
+        self.writer = writer
+        self.retries = retries
+        self.retry_backoff = retry_backoff_ms / 1000
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_rows = 0
+        self.retried_flushes = 0
+        self.row_fallbacks = 0
+        self.last_flush_size = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, row: dict) -> bool:
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def start(self):
+        if self.running:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="ingest-buffer-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        if not self.running:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self.running,
+                "depth": self._queue.qsize(),
+                "max_size": self.max_size,
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "flushes": self.flushes,
+                "flushed_rows": self.flushed_rows,
+                "failed_rows": self.failed_rows,
+                "retried_flushes": self.retried_flushes,
+                "row_fallbacks": self.row_fallbacks,
+                "last_flush_size": self.last_flush_size,
+                "last_flush_ms": round(self.last_flush_ms, 2),
+                "avg_flush_ms": round(self.total_flush_ms / self.flushes, 2) if self.flushes else 0.0,
+                "max_flush_ms": round(self.max_flush_ms, 2),
+            }
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+            elif self._stopping.is_set():
+                break
+
+    def _collect(self) -> list[dict]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.flush_rows:
+            try:
+                if self._stopping.is_set():
+                    batch.append(self._queue.get_nowait())
+                    continue
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _flush(self, batch: list[dict]):
+        started = time.perf_counter()
+        stored = len(batch)
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self._lock:
+                    self.retried_flushes += 1
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                self._write(batch)
+                break
+            except Exception:
+                logger.warning(
+                    "Failed to flush %s buffered sensor measurements (attempt %s of %s)",
+                    len(batch), attempt + 1, self.retries + 1, exc_info=True
+                )
+        else:
+            # One bad row must not take the rest of the group commit down with it.
+            with self._lock:
+                self.row_fallbacks += 1
+            stored = self._flush_rows(batch)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.flushes += 1
+            self.flushed_rows += stored
+            self.last_flush_size = stored
+            self.last_flush_ms = elapsed_ms
+            self.total_flush_ms += elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+
+    def _flush_rows(self, batch: list[dict]) -> int:
+        stored = 0
+        for row in batch:
+            try:
+                self._write([row])
+                stored += 1
+            except Exception:
+                logger.exception("Dropped buffered sensor measurement %s", row)
+                with self._lock:
+                    self.failed_rows += 1
+        return stored
+
+    def _write(self, rows: list[dict]):
+        db = SessionLocal()
+        try:
+            self.writer(db, rows)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+ingest_buffer = IngestBuffer(
+    max_size=INGEST_BUFFER_MAX_SIZE,
+    flush_rows=INGEST_FLUSH_ROWS,
+    flush_interval_ms=INGEST_FLUSH_INTERVAL_MS,
+    writer=store_sensor_rows,
+)
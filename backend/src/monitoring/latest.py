@@ -0,0 +1,224 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import event, inspect, select, true
+from sqlalchemy.orm import Session
+
+from src.core.config import LATEST_READINGS_MAX_AGE_SECONDS
+from src.monitoring.models import SENSOR_METRICS, Devices, Sensor_Measurements, Sensor_Rollups_Hourly
+from src.monitoring.rollups import METRIC_SCALES
+
+# metric -> (value, timestamp)
+DeviceState = dict[str, tuple[float, datetime]]
+
+
+def normalize_value(metric: str, value) -> float:
+    scale = METRIC_SCALES[metric]
+    value = round(float(value), scale)
+    return int(value) if scale == 0 else value
+
+
+class LatestReadings:
+    # Readings stored by another process (another API worker, a standalone MQTT gateway) never
+    # pass through update(), so a device with no local traffic is reloaded once max_age passes.
+    def __init__(self, max_age_seconds: float):
+        self.max_age = max_age_seconds
+
+        self._states: dict[int, DeviceState] = {}
+        # device_id -> monotonic time of the last load or local update
+        self._loaded: dict[int, float] = {}
+        self._devices_by_aquarium: dict[int, tuple[int, ...]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+
+    def update(self, rows: list[dict]):
+        now = time.monotonic()
+        with self._lock:
+            for row in rows:
+                if row["device_id"] in self._loaded:
+                    self._loaded[row["device_id"]] = now
+                state = self._states.setdefault(row["device_id"], {})
+                for metric in SENSOR_METRICS:
+                    value = row.get(metric)
+                    if value is not None:
+                        self._merge(state, metric, normalize_value(metric, value), row["timestamp"])
+
+    def get(self, db: Session, device_id: int) -> DeviceState:
+        return self.get_many(db, [device_id])[device_id]
+
+    def get_many(self, db: Session, device_ids: list[int]) -> dict[int, DeviceState]:
+        expired = time.monotonic() - self.max_age
+        with self._lock:
+            missing = [device_id for device_id in set(device_ids) if self._loaded.get(device_id, expired) <= expired]
+            self.hits += len(set(device_ids)) - len(missing)
+
+        if missing:
+            self._load(db, missing)
+
+        with self._lock:
+            return {device_id: dict(self._states.get(device_id, {})) for device_id in device_ids}
+
+    def get_for_aquarium(self, db: Session, aquarium_id: int) -> DeviceState:
+        return self.get_for_aquariums(db, [aquarium_id])[aquarium_id]
+
+    def get_for_aquariums(self, db: Session, aquarium_ids: list[int]) -> dict[int, DeviceState]:
+        devices_by_aquarium = self._resolve_aquarium_devices(db, aquarium_ids)
+        states = self.get_many(db, [d_id for d_ids in devices_by_aquarium.values() for d_id in d_ids])
+
+        result = {}
+        for aquarium_id, device_ids in devices_by_aquarium.items():
+            merged = {}
+            for device_id in device_ids:
+                for metric, (value, timestamp) in states[device_id].items():
+                    self._merge(merged, metric, value, timestamp)
+            result[aquarium_id] = merged
+        return result
+
+    def forget_devices(self, device_ids: list[int]):
+        with self._lock:
+            for device_id in device_ids:
+                self._states.pop(device_id, None)
+                self._loaded.pop(device_id, None)
+
+    def forget_aquariums(self, aquarium_ids: list[int]):
+        with self._lock:
+            for aquarium_id in aquarium_ids:
+                self._devices_by_aquarium.pop(aquarium_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._states.clear()
+            self._loaded.clear()
+            self._devices_by_aquarium.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "devices": len(self._states),
+                "loaded_devices": len(self._loaded),
+                "aquariums": len(self._devices_by_aquarium),
+                "hits": self.hits,
+                "loads": self.loads,
+            }
+
+    @staticmethod
+    def _merge(state: DeviceState, metric: str, value: float, timestamp: datetime):
+        current = state.get(metric)
+        if current is None or timestamp >= current[1]:
+            state[metric] = (value, timestamp)
+
+    def _resolve_aquarium_devices(self, db: Session, aquarium_ids: list[int]) -> dict[int, tuple[int, ...]]:
+        with self._lock:
+            resolved = {a_id: self._devices_by_aquarium[a_id]
+                        for a_id in aquarium_ids if a_id in self._devices_by_aquarium}
+        missing = [a_id for a_id in set(aquarium_ids) if a_id not in resolved]
+
+        if missing:
+            found = {a_id: [] for a_id in missing}
+            for aquarium_id, device_id in db.execute(
+                    select(Devices.aquarium_id, Devices.id).where(Devices.aquarium_id.in_(missing))
+            ):
+                found[aquarium_id].append(device_id)
+
+            with self._lock:
+                for aquarium_id, device_ids in found.items():
+                    self._devices_by_aquarium[aquarium_id] = tuple(device_ids)
+                    resolved[aquarium_id] = tuple(device_ids)
+
+        return resolved
+
+    def _load(self, db: Session, device_ids: list[int]):
+        metric_columns = [getattr(Sensor_Measurements, metric) for metric in SENSOR_METRICS]
+        latest_row = (
+            select(Sensor_Measurements.timestamp, *metric_columns)
+            .where(Sensor_Measurements.device_id == Devices.id)
+            .order_by(Sensor_Measurements.timestamp.desc())
+            .limit(1)
+            .lateral()
+        )
+        rows = db.execute(
+            select(Devices.id, latest_row).join(latest_row, true()).where(Devices.id.in_(device_ids))
+        ).all()
+
+        loaded = {device_id: {} for device_id in device_ids}
+        incomplete = {metric: [] for metric in SENSOR_METRICS}
+        for device_id, timestamp, *values in rows:
+            for metric, value in zip(SENSOR_METRICS, values):
+                if value is None:
+                    incomplete[metric].append(device_id)
+                else:
+                    loaded[device_id][metric] = (normalize_value(metric, value), timestamp)
+
+        # Rare case: the newest row lacks a metric, look it up through the hourly rollups
+        # so a metric the device never reports doesn't cost a scan of its whole history.
+        for metric, metric_device_ids in incomplete.items():
+            for device_id, value, timestamp in self._load_metric(db, metric, metric_device_ids):
+                loaded[device_id][metric] = (normalize_value(metric, value), timestamp)
+
+        now = time.monotonic()
+        with self._lock:
+            for device_id, state in loaded.items():
+                current = self._states.setdefault(device_id, {})
+                for metric, (value, timestamp) in state.items():
+                    self._merge(current, metric, value, timestamp)
+                self._loaded[device_id] = now
+            self.loads += len(loaded)
+
+    @staticmethod
+    def _load_metric(db: Session, metric: str, device_ids: list[int]) -> list[tuple]:
+        if not device_ids:
+            return []
+
+        bucket = (
+            select(Sensor_Rollups_Hourly.device_id, Sensor_Rollups_Hourly.bucket)
+            .where(Sensor_Rollups_Hourly.device_id.in_(device_ids))
+            .where(getattr(Sensor_Rollups_Hourly, f"{metric}_count") > 0)
+            .distinct(Sensor_Rollups_Hourly.device_id)
+            .order_by(Sensor_Rollups_Hourly.device_id, Sensor_Rollups_Hourly.bucket.desc())
+            .subquery()
+        )
+
+        column = getattr(Sensor_Measurements, metric)
+        latest_row = (
+            select(column, Sensor_Measurements.timestamp)
+            .where(Sensor_Measurements.device_id == bucket.c.device_id, column.isnot(None))
+            .where(Sensor_Measurements.timestamp >= bucket.c.bucket,
+                   Sensor_Measurements.timestamp < bucket.c.bucket + timedelta(hours=1))
+            .order_by(Sensor_Measurements.timestamp.desc())
+            .limit(1)
+            .lateral()
+        )
+        return db.execute(select(bucket.c.device_id, latest_row).join(latest_row, true())).all()
+
+
+latest_readings = LatestReadings(max_age_seconds=LATEST_READINGS_MAX_AGE_SECONDS)
+
+
+def latest_value(state: DeviceState, metric: str) -> Optional[float]:
+    reading = state.get(metric)
+    return reading[0] if reading else None
+
+
+@event.listens_for(Devices, "after_insert")
+def _register_device(mapper, connection, target: Devices):
+    if target.aquarium_id is not None:
+        latest_readings.forget_aquariums([target.aquarium_id])
+
+
+@event.listens_for(Devices, "after_update")
+def _reassign_device(mapper, connection, target: Devices):
+    history = inspect(target).attrs.aquarium_id.history
+    changed = [a_id for a_id in (*history.deleted, *history.added) if a_id is not None]
+    if changed:
+        latest_readings.forget_aquariums(changed)
+
+
+@event.listens_for(Devices, "after_delete")
+def _forget_deleted_device(mapper, connection, target: Devices):
+    latest_readings.forget_devices([target.id])
+    if target.aquarium_id is not None:
+        latest_readings.forget_aquariums([target.aquarium_id])
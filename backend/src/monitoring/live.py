@@ -0,0 +1,120 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+from src.core.config import LIVE_QUEUE_SIZE, LIVE_KEEPALIVE_SECONDS
+from src.monitoring.device_cache import device_key_cache
+from src.monitoring.models import SENSOR_METRICS
+
+Topic = tuple[str, int]
+
+
+class MeasurementBroker:
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: dict[Topic, set[asyncio.Queue]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+        self.connections = 0
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.fanouts = 0
+        self.total_fanout_ms = 0.0
+        self.max_fanout_ms = 0.0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    def subscribe(self, topics: list[Topic]) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        for topic in topics:
+            self._subscribers[topic].add(queue)
+        self.connections += 1
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue, topics: list[Topic]):
+        for topic in topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is None:
+                continue
+            subscribers.discard(queue)
+            if not subscribers:
+                del self._subscribers[topic]
+        self.connections -= 1
+
+    def publish(self, rows: list[dict]):
+        # Called from ingest threads: only hand the rows over to the event loop.
+        if self._loop is None or not self._subscribers:
+            return
+
+        with self._lock:
+            self.published += len(rows)
+        self._loop.call_soon_threadsafe(self._fan_out, rows, time.perf_counter())
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "topics": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "avg_fanout_ms": round(self.total_fanout_ms / self.fanouts, 3) if self.fanouts else 0.0,
+            "max_fanout_ms": round(self.max_fanout_ms, 3),
+        }
+
+    def _fan_out(self, rows: list[dict], published_at: float):
+        for row in rows:
+            device = device_key_cache.get_by_device(row["device_id"])
+            aquarium_id = device.aquarium_id if device else None
+
+            queues = set(self._subscribers.get(("device", row["device_id"]), ()))
+            if aquarium_id is not None:
+                queues |= self._subscribers.get(("aquarium", aquarium_id), set())
+            if not queues:
+                continue
+
+            event = format_event(row, aquarium_id)
+            for queue in queues:
+                try:
+                    queue.put_nowait(event)
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    self.dropped += 1
+
+        elapsed_ms = (time.perf_counter() - published_at) * 1000
+        self.fanouts += 1
+        self.total_fanout_ms += elapsed_ms
+        self.max_fanout_ms = max(self.max_fanout_ms, elapsed_ms)
+
+
+def format_event(row: dict, aquarium_id: Optional[int]) -> str:
+    timestamp = row.get("timestamp")
+    payload = {
+        "device_id": row["device_id"],
+        "aquarium_id": aquarium_id,
+        "timestamp": timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp,
+        **{metric: row.get(metric) for metric in SENSOR_METRICS},
+    }
+    return f"event: measurement\ndata: {json.dumps(payload)}\n\n"
+
+
+measurement_broker = MeasurementBroker(queue_size=LIVE_QUEUE_SIZE)
+
+
+async def live_event_stream(queue: asyncio.Queue, topics: list[Topic]):
+    try:
+        yield ": connected\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), timeout=LIVE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+    finally:
+        measurement_broker.unsubscribe(queue, topics)
@@ -0,0 +1,170 @@
+import codecs
+import csv
+import itertools
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from starlette import status
+
+from src.aquariums.service import get_aquarium
+from src.core.config import MANUAL_IMPORT_CHUNK_ROWS, MANUAL_IMPORT_MAX_ERRORS
+from src.monitoring.alerts import alert_engine
+from src.monitoring.models import Manual_Measurements
+
+MANUAL_METRICS = ("ammonia", "nitrite", "nitrate", "gh", "kh", "phosphate")
+TIMESTAMP_COLUMNS = ("timestamp", "date", "datetime", "time")
+DATE_FORMATS = ("%d.%m.%Y %H:%M:%S", "%d.%m.%Y %H:%M", "%d.%m.%Y")
+
+# DECIMAL(4, 2) holds values below 100; anything larger would abort the whole insert.
+METRIC_LIMITS = {
+    metric: Decimal(10) ** (column.type.precision - column.type.scale)
+    for metric, column in ((m, Manual_Measurements.__table__.c[m]) for m in MANUAL_METRICS)
+}
+
+
+def parse_timestamp(value: str) -> datetime:
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        for date_format in DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+        raise ValueError(f"невірна дата '{value}'")
+
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return timestamp
+
+
+def parse_metric(metric: str, value: str) -> Optional[Decimal]:
+    if not value:
+        return None
+    try:
+        number = Decimal(value.replace(",", "."))
+    except InvalidOperation:
+        raise ValueError(f"{metric}: невірне число '{value}'")
+    if not number.is_finite() or number < 0 or number >= METRIC_LIMITS[metric]:
+        raise ValueError(f"{metric}: значення {value} поза допустимим діапазоном")
+    return number
+
+
+def read_header(reader) -> tuple[int, dict[str, int]]:
+    header = next(reader, None)
+    if not header:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Файл порожній")
+
+    columns = {name.strip().lower(): index for index, name in enumerate(header)}
+    timestamp_index = next((columns[name] for name in TIMESTAMP_COLUMNS if name in columns), None)
+    if timestamp_index is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="У файлі немає колонки з датою вимірювання (timestamp)"
+        )
+
+    metrics = {metric: columns[metric] for metric in MANUAL_METRICS if metric in columns}
+    if not metrics:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="У файлі немає жодного показника")
+    return timestamp_index, metrics
+
+
+def parse_row(record: list[str], timestamp_index: int, metrics: dict[str, int], now: datetime) -> dict:
+    width = len(record)
+    raw_timestamp = record[timestamp_index].strip() if timestamp_index < width else ""
+    if not raw_timestamp:
+        raise ValueError("відсутня дата вимірювання")
+
+    timestamp = parse_timestamp(raw_timestamp)
+    if timestamp > now:
+        raise ValueError("дата вимірювання в майбутньому")
+
+    row = {"timestamp": timestamp}
+    for metric, index in metrics.items():
+        row[metric] = parse_metric(metric, record[index].strip() if index < width else "")
+
+    if all(row[metric] is None for metric in metrics):
+        raise ValueError("рядок не містить жодного показника")
+    return row
+
+
+def import_manual_measurements(db: Session, aquarium_id: int, user_id: int, file: BinaryIO) -> dict:
+    aquarium = get_aquarium(db=db, aquarium_id=aquarium_id)
+
+    if aquarium.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Ви не можете вносити тести в чужі акваріуми"
+        )
+
+    previous_latest = db.scalar(
+        select(func.max(Manual_Measurements.timestamp)).where(Manual_Measurements.aquarium_id == aquarium_id)
+    )
+
+    lines = codecs.iterdecode(file, "utf-8-sig")
+    # Core insert on the table: the ORM bulk path splits batches on every different set of NULL columns.
+    stmt = insert(Manual_Measurements.__table__)
+    now = datetime.now()
+    imported = 0
+    errors = []
+    error_count = 0
+    newest = None
+    chunk = []
+    line_num = 0
+
+    try:
+        first_line = next(lines, "")
+        # Spreadsheets with a comma decimal separator export ';'-separated files.
+        delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+
+        reader = csv.reader(itertools.chain([first_line], lines), delimiter=delimiter)
+        timestamp_index, metrics = read_header(reader)
+
+        for record in reader:
+            line_num = reader.line_num
+            if not any(field.strip() for field in record):
+                continue
+            try:
+                row = parse_row(record, timestamp_index, metrics, now)
+            except ValueError as e:
+                error_count += 1
+                if len(errors) < MANUAL_IMPORT_MAX_ERRORS:
+                    errors.append({"line": line_num, "detail": str(e)})
+                continue
+
+            row["aquarium_id"] = aquarium_id
+            chunk.append(row)
+            if newest is None or row["timestamp"] > newest["timestamp"]:
+                newest = row
+
+            if len(chunk) >= MANUAL_IMPORT_CHUNK_ROWS:
+                db.execute(stmt, chunk)
+                imported += len(chunk)
+                chunk = []
+    except (UnicodeDecodeError, csv.Error) as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Не вдалося прочитати файл (рядок {line_num + 1}): {e}"
+        )
+
+    if chunk:
+        db.execute(stmt, chunk)
+        imported += len(chunk)
+    db.commit()
+
+    # Old lab results don't change the current state of the tank, only a newer test does.
+    if newest is not None and (previous_latest is None or newest["timestamp"] > previous_latest):
+        alert_engine.evaluate_manual_rows(db, [newest])
+
+    return {
+        "imported": imported,
+        "rejected": error_count,
+        "errors": errors,
+        "errors_truncated": error_count > len(errors),
+    }
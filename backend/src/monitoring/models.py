@@ -6,9 +6,9 @@ from sqlalchemy.dialects.postgresql import JSONB
 
 from sqlalchemy import (
     String, Text, Boolean, DateTime, Date, ForeignKey, 
-    CheckConstraint, DECIMAL, BIGINT, INTEGER, func
+    CheckConstraint, DECIMAL, BIGINT, INTEGER, Index, func, text
 )
-from sqlalchemy.dialects.postgresql import TIMESTAMP, ENUM
+from sqlalchemy.dialects.postgresql import TIMESTAMP, ENUM, DOUBLE_PRECISION
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, declared_attr, relationship
 from src.database import Base, TableNameMixin
 
@@ -19,12 +19,19 @@ str_unique_not_null = Annotated[str, mapped_column(String(255), unique=True, nul
 text_not_null = Annotated[str, mapped_column(Text, nullable=False)]
 timestamp_now = Annotated[datetime, mapped_column(TIMESTAMP, server_default=func.now())]
 date_now = Annotated[date, mapped_column(Date, server_default=func.now())]
+rollup_value = Annotated[Optional[float], mapped_column(DOUBLE_PRECISION)]
+rollup_count = Annotated[int, mapped_column(INTEGER, nullable=False, server_default="0")]
 
 class DeviceStatus(enum.Enum):
     online = 'online'
     offline = 'offline'
 
 class Devices(Base, TableNameMixin):
+    __table_args__ = (
+        # Candidates for the heartbeat sweep's offline transition.
+        Index("ix_devices_online_last_seen_at", "last_seen_at", postgresql_where=text("status = 'online'")),
+    )
+
     id: Mapped[int_pk]
     aquarium_id: Mapped[Optional[int]] = mapped_column(BIGINT, ForeignKey('aquariums.id', ondelete='SET NULL'))
     api_key: Mapped[str] = mapped_column(String(255), unique=True, nullable=False)
@@ -32,15 +39,32 @@ class Devices(Base, TableNameMixin):
     status: Mapped[DeviceStatus] = mapped_column(ENUM(DeviceStatus), default=DeviceStatus.offline)
     power_watts: Mapped[Optional[int]] = mapped_column(INTEGER, default=0)
     config: Mapped[dict] = mapped_column(JSONB, default=dict)
+    config_revision: Mapped[int] = mapped_column(BIGINT, nullable=False, default=0, server_default="0")
+    last_seen_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP)
 
 
     aquarium: Mapped[Optional["Aquariums"]] = relationship(back_populates="device")
     sensor_measurements: Mapped[list["Sensor_Measurements"]] = relationship(back_populates="device")
 
+SENSOR_METRICS = (
+    "temperature", "ph", "tds", "turbidity", "water_level", "room_temperature", "room_humidity"
+)
+
+
 class Sensor_Measurements(Base, TableNameMixin):
-    id: Mapped[int_pk]
+    __table_args__ = (
+        Index("ix_sensor_measurements_device_id_timestamp_id", "device_id", "timestamp", "id"),
+        Index(
+            "uq_sensor_measurements_device_id_seq_timestamp", "device_id", "seq", "timestamp",
+            unique=True, postgresql_where=text("seq IS NOT NULL")
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True, autoincrement=True)
     device_id: Mapped[int] = mapped_column(BIGINT, ForeignKey('devices.id', ondelete='CASCADE'))
-    timestamp: Mapped[timestamp_now]
+    timestamp: Mapped[datetime] = mapped_column(TIMESTAMP, primary_key=True, server_default=func.now())
+    seq: Mapped[Optional[int]] = mapped_column(BIGINT)
     temperature: Mapped[Optional[Decimal]] = mapped_column(DECIMAL(5, 2))
     ph: Mapped[Optional[Decimal]] = mapped_column(DECIMAL(4, 2))
     tds: Mapped[Optional[int]] = mapped_column(INTEGER)
@@ -52,7 +76,96 @@ class Sensor_Measurements(Base, TableNameMixin):
 
     device: Mapped["Devices"] = relationship(back_populates="sensor_measurements")
 
+class SensorRollupMixin:
+    device_id: Mapped[int] = mapped_column(BIGINT, ForeignKey('devices.id', ondelete='CASCADE'), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(TIMESTAMP, primary_key=True)
+    samples: Mapped[rollup_count]
+    last_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False)
+
+    temperature_min: Mapped[rollup_value]
+    temperature_max: Mapped[rollup_value]
+    temperature_sum: Mapped[rollup_value]
+    temperature_count: Mapped[rollup_count]
+    temperature_last: Mapped[rollup_value]
+
+    ph_min: Mapped[rollup_value]
+    ph_max: Mapped[rollup_value]
+    ph_sum: Mapped[rollup_value]
+    ph_count: Mapped[rollup_count]
+    ph_last: Mapped[rollup_value]
+
+    tds_min: Mapped[rollup_value]
+    tds_max: Mapped[rollup_value]
+    tds_sum: Mapped[rollup_value]
+    tds_count: Mapped[rollup_count]
+    tds_last: Mapped[rollup_value]
+
+    turbidity_min: Mapped[rollup_value]
+    turbidity_max: Mapped[rollup_value]
+    turbidity_sum: Mapped[rollup_value]
+    turbidity_count: Mapped[rollup_count]
+    turbidity_last: Mapped[rollup_value]
+
+    water_level_min: Mapped[rollup_value]
+    water_level_max: Mapped[rollup_value]
+    water_level_sum: Mapped[rollup_value]
+    water_level_count: Mapped[rollup_count]
+    water_level_last: Mapped[rollup_value]
+
+    room_temperature_min: Mapped[rollup_value]
+    room_temperature_max: Mapped[rollup_value]
+    room_temperature_sum: Mapped[rollup_value]
+    room_temperature_count: Mapped[rollup_count]
+    room_temperature_last: Mapped[rollup_value]
+
+    room_humidity_min: Mapped[rollup_value]
+    room_humidity_max: Mapped[rollup_value]
+    room_humidity_sum: Mapped[rollup_value]
+    room_humidity_count: Mapped[rollup_count]
+    room_humidity_last: Mapped[rollup_value]
+
+
+class Sensor_Rollups_Hourly(SensorRollupMixin, Base, TableNameMixin):
+    pass
+
+
+class Sensor_Rollups_Daily(SensorRollupMixin, Base, TableNameMixin):
+    pass
+
+
+class Sensor_Anomaly_State(Base, TableNameMixin):
+    device_id: Mapped[int] = mapped_column(BIGINT, ForeignKey('devices.id', ondelete='CASCADE'), primary_key=True)
+    metric: Mapped[str] = mapped_column(String(50), primary_key=True)
+    mean: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False)
+    variance: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False)
+    samples: Mapped[rollup_count]
+    last_alert_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP)
+    updated_at: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False)
+
+
+class Alert_Events(Base, TableNameMixin):
+    __table_args__ = (
+        Index("ix_alert_events_aquarium_id_metric_timestamp", "aquarium_id", "metric", "timestamp"),
+    )
+
+    id: Mapped[int_pk]
+    aquarium_id: Mapped[int] = mapped_column(BIGINT, ForeignKey('aquariums.id', ondelete='CASCADE'), nullable=False)
+    device_id: Mapped[Optional[int]] = mapped_column(BIGINT, ForeignKey('devices.id', ondelete='SET NULL'))
+    metric: Mapped[str] = mapped_column(String(50), nullable=False)
+    state: Mapped[str] = mapped_column(String(10), nullable=False)
+    previous_state: Mapped[str] = mapped_column(String(10), nullable=False)
+    value: Mapped[float] = mapped_column(DOUBLE_PRECISION, nullable=False)
+    target_min: Mapped[Optional[float]] = mapped_column(DOUBLE_PRECISION)
+    target_max: Mapped[Optional[float]] = mapped_column(DOUBLE_PRECISION)
+    source: Mapped[str] = mapped_column(String(10), nullable=False)
+    timestamp: Mapped[datetime] = mapped_column(TIMESTAMP, nullable=False)
+
+
 class Manual_Measurements(Base, TableNameMixin):
+    __table_args__ = (
+        Index("ix_manual_measurements_aquarium_id_timestamp_id", "aquarium_id", "timestamp", "id"),
+    )
+
     id: Mapped[int_pk]
     aquarium_id: Mapped[int] = mapped_column(BIGINT, ForeignKey('aquariums.id', ondelete='CASCADE'))
     timestamp: Mapped[timestamp_now]
@@ -0,0 +1,250 @@
+import argparse
+import json
+import logging
+import os
+import signal
+import threading
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from src.core.config import (
+    MQTT_HOST, MQTT_PORT, MQTT_USERNAME, MQTT_PASSWORD, MQTT_CLIENT_ID, MQTT_TOPIC_PREFIX, MQTT_SHARED_GROUP,
+    MQTT_QOS, MQTT_QUEUE_MAX_SIZE, MQTT_FLUSH_ROWS, MQTT_FLUSH_INTERVAL_MS
+)
+from src.monitoring.device_cache import device_key_cache
+from src.monitoring.ingest_buffer import IngestBuffer
+
+try:
+    import paho.mqtt.client as mqtt
+except ImportError:
+    mqtt = None
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_SUFFIX = "telemetry"
+MAX_READINGS_PER_MESSAGE = 1000
+
+
+class MqttGateway:
+    # Devices publish the same JSON as POST /measurements/sensor (or a list of them) to
+    # {prefix}/{device_id}/telemetry. The network loop only parses and queues, the writer
+    # thread authenticates the api_key against the topic and stores whole batches.
+    def __init__(
+            self,
+            host: str,
+            port: int,
+            topic_prefix: str,
+            shared_group: Optional[str],
+            qos: int,
+            client_id: Optional[str],
+            username: Optional[str],
+            password: Optional[str],
+            max_size: int,
+            flush_rows: int,
+            flush_interval_ms: int
+    ):
+        self.host = host
+        self.port = port
+        self.topic_prefix = topic_prefix.rstrip("/")
+        self.shared_group = shared_group
+        self.qos = qos
+        # Brokers drop the older session when a client id connects twice, e.g. API workers plus a gateway.
+        self.client_id = client_id or f"aquacore-gateway-{os.getpid()}"
+        self.username = username
+        self.password = password
+
+        self.buffer = IngestBuffer(
+            max_size=max_size, flush_rows=flush_rows, flush_interval_ms=flush_interval_ms, writer=self._write
+        )
+        self._client = None
+        self._lock = threading.Lock()
+
+        self.connected = False
+        self.connects = 0
+        self.messages = 0
+        self.malformed = 0
+        self.dropped = 0
+        self.unauthorized = 0
+        self.rejected = 0
+        self.duplicates = 0
+        self.stored = 0
+
+    @property
+    def subscription(self) -> str:
+        topic = f"{self.topic_prefix}/+/{TELEMETRY_SUFFIX}"
+        # With several gateways a shared subscription hands each message to one of them only.
+        return f"$share/{self.shared_group}/{topic}" if self.shared_group else topic
+
+    @property
+    def running(self) -> bool:
+        return self._client is not None
+
+    def start(self):
+        if self.running:
+            return
+        if mqtt is None:
+            raise RuntimeError("MQTT ingestion requires paho-mqtt: poetry install --extras mqtt")
+
+        client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=self.client_id)
+        if self.username:
+            client.username_pw_set(self.username, self.password)
+        client.on_connect = self._on_connect
+        client.on_disconnect = self._on_disconnect
+        client.on_message = self._on_message
+        client.reconnect_delay_set(min_delay=1, max_delay=30)
+
+        self.buffer.start()
+        client.connect_async(self.host, self.port)
+        client.loop_start()
+        self._client = client
+
+    def stop(self, timeout: Optional[float] = None):
+        if not self.running:
+            return
+        client, self._client = self._client, None
+        client.disconnect()
+        client.loop_stop()
+        self.buffer.stop(timeout)
+
+    def topic_device_id(self, topic: str) -> Optional[int]:
+        if not topic.startswith(f"{self.topic_prefix}/"):
+            return None
+        parts = topic[len(self.topic_prefix) + 1:].split("/")
+        if len(parts) != 2 or parts[1] != TELEMETRY_SUFFIX or not parts[0].isdigit():
+            return None
+        return int(parts[0])
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self.running,
+                "connected": self.connected,
+                "connects": self.connects,
+                "subscription": self.subscription,
+                "messages": self.messages,
+                "malformed": self.malformed,
+                "dropped": self.dropped,
+                "unauthorized": self.unauthorized,
+                "rejected": self.rejected,
+                "duplicates": self.duplicates,
+                "stored": self.stored,
+                "buffer": self.buffer.stats(),
+            }
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
+        if reason_code.is_failure:
+            logger.warning("MQTT broker %s:%s refused the connection: %s", self.host, self.port, reason_code)
+            return
+        # Subscribing here restores the subscription after every reconnect.
+        client.subscribe(self.subscription, qos=self.qos)
+        with self._lock:
+            self.connected = True
+            self.connects += 1
+        logger.info("MQTT gateway subscribed to %s on %s:%s", self.subscription, self.host, self.port)
+
+    def _on_disconnect(self, client, userdata, flags, reason_code, properties):
+        with self._lock:
+            self.connected = False
+        if reason_code.is_failure:
+            logger.warning("MQTT gateway lost the broker connection: %s", reason_code)
+
+    def _on_message(self, client, userdata, message):
+        device_id = self.topic_device_id(message.topic)
+        try:
+            payload = json.loads(message.payload) if device_id is not None else None
+        except ValueError:
+            payload = None
+
+        readings = payload if isinstance(payload, list) else [payload]
+        if payload is None or len(readings) > MAX_READINGS_PER_MESSAGE \
+                or not all(isinstance(reading, dict) for reading in readings):
+            with self._lock:
+                self.messages += 1
+                self.malformed += 1
+            return
+
+        dropped = sum(1 for reading in readings if not self.buffer.submit((device_id, reading)))
+        with self._lock:
+            self.messages += 1
+            self.dropped += dropped
+
+    def _write(self, db: Session, batch: list[tuple[int, dict]]):
+        # Deferred: monitoring.service pulls in the user services, which import the admin metrics.
+        from src.monitoring.service import ingest_sensor_batch
+
+        api_keys = {reading.get("api_key") for _, reading in batch if isinstance(reading.get("api_key"), str)}
+        devices = device_key_cache.resolve_many(db, api_keys)
+
+        # A key is only good for its own topic, otherwise any device could write as another.
+        readings = []
+        for device_id, reading in batch:
+            api_key = reading.get("api_key")
+            device = devices.get(api_key) if isinstance(api_key, str) else None
+            if device is not None and device.device_id == device_id:
+                readings.append(reading)
+
+        result = ingest_sensor_batch(db, readings) if readings else {"accepted": 0, "rejected": 0, "duplicates": 0}
+        with self._lock:
+            self.unauthorized += len(batch) - len(readings)
+            self.rejected += result["rejected"]
+            self.duplicates += result["duplicates"]
+            self.stored += result["accepted"] - result["duplicates"]
+
+
+mqtt_gateway = MqttGateway(
+    host=MQTT_HOST,
+    port=MQTT_PORT,
+    topic_prefix=MQTT_TOPIC_PREFIX,
+    shared_group=MQTT_SHARED_GROUP,
+    qos=MQTT_QOS,
+    client_id=MQTT_CLIENT_ID,
+    username=MQTT_USERNAME,
+    password=MQTT_PASSWORD,
+    max_size=MQTT_QUEUE_MAX_SIZE,
+    flush_rows=MQTT_FLUSH_ROWS,
+    flush_interval_ms=MQTT_FLUSH_INTERVAL_MS,
+)
+
+
+def main():
+    # Standalone gateway next to (or instead of) the embedded one from MQTT_ENABLED. Like a second
+    # API worker it keeps its own alert and anomaly state for the devices it serves, and its
+    # heartbeats reach the API through Devices.last_seen_at. The API's /measurements/latest
+    # picks its rows up within LATEST_READINGS_MAX_AGE_SECONDS, but the live SSE feed only
+    # carries rows ingested by the API process itself: use MQTT_ENABLED if the dashboard needs them.
+    import src.models_registry
+    from src.monitoring.anomalies import anomaly_flusher, anomaly_checkpointer
+    from src.monitoring.alerts import alert_flusher
+    from src.monitoring.heartbeat import heartbeat_sweeper
+    from src.notifications.dispatcher import notification_sender, flush_notifications
+
+    parser = argparse.ArgumentParser(description="MQTT telemetry gateway")
+    parser.add_argument("--host", default=MQTT_HOST)
+    parser.add_argument("--port", type=int, default=MQTT_PORT)
+    parser.add_argument("--stats-interval", type=float, default=60)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stopping.set())
+    signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+
+    tasks = [heartbeat_sweeper, anomaly_flusher, anomaly_checkpointer, alert_flusher, notification_sender]
+    for task in tasks:
+        task.start()
+    mqtt_gateway.host, mqtt_gateway.port = args.host, args.port
+    mqtt_gateway.start()
+
+    while not stopping.wait(args.stats_interval):
+        logger.info("MQTT gateway stats: %s", mqtt_gateway.stats())
+
+    mqtt_gateway.stop()
+    for task in tasks:
+        task.stop()
+    flush_notifications()
+    logger.info("MQTT gateway stopped: %s", mqtt_gateway.stats())
+
+
+if __name__ == "__main__":
+    main()
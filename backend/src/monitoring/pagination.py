@@ -0,0 +1,46 @@
+import base64
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_
+from starlette import status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(timestamp: datetime, row_id: int) -> str:
+    raw = f"{timestamp.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Невірний курсор пагінації")
+
+
+def apply_keyset(
+        stmt: Select,
+        timestamp_column,
+        id_column,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        order: str = "desc"
+) -> Select:
+    if since is not None:
+        stmt = stmt.where(timestamp_column >= since)
+    if until is not None:
+        stmt = stmt.where(timestamp_column < until)
+
+    key = tuple_(timestamp_column, id_column)
+    if cursor is not None:
+        stmt = stmt.where(key < decode_cursor(cursor) if order == "desc" else key > decode_cursor(cursor))
+
+    if order == "desc":
+        return stmt.order_by(timestamp_column.desc(), id_column.desc())
+    return stmt.order_by(timestamp_column.asc(), id_column.asc())
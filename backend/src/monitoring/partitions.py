@@ -0,0 +1,282 @@
+import argparse
+import logging
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from src.core.background import PeriodicTask
+from src.core.config import (
+    SENSOR_PARTITION_MONTHS_AHEAD, SENSOR_RETENTION_MONTHS, PARTITION_MAINTENANCE_INTERVAL_SECONDS
+)
+from src.database import SessionLocal
+from src.monitoring.models import (
+    Alert_Events, Devices, Sensor_Anomaly_State, Sensor_Measurements, Sensor_Rollups_Daily, Sensor_Rollups_Hourly
+)
+from src.users.models import User_Settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = Sensor_Measurements.__tablename__
+LEGACY_TABLE = f"{PARENT_TABLE}_legacy"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+
+# Columns added to existing tables after the baseline schema, applied by `migrate`.
+NEW_COLUMNS = [
+    (PARENT_TABLE, "seq BIGINT"),
+    (Devices.__tablename__, "config_revision BIGINT NOT NULL DEFAULT 0"),
+    (Devices.__tablename__, "last_seen_at TIMESTAMP"),
+    (User_Settings.__tablename__, "notify_alerts BOOLEAN DEFAULT true"),
+]
+# Tables added after the baseline schema, created by `migrate` if they are missing.
+NEW_TABLES = [Sensor_Rollups_Hourly, Sensor_Rollups_Daily, Sensor_Anomaly_State, Alert_Events]
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    month_index = value.year * 12 + value.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+def is_partitioned(db: Session) -> bool:
+    relkind = db.execute(
+        text("SELECT relkind FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p')"),
+        {"name": PARENT_TABLE}
+    ).scalar()
+    return relkind == "p"
+
+
+def list_month_partitions(db: Session) -> dict[date, str]:
+    rows = db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :parent"
+        ),
+        {"parent": PARENT_TABLE}
+    ).scalars().all()
+
+    partitions = {}
+    for name in rows:
+        suffix = name[len(PARENT_TABLE) + 1:]
+        try:
+            partitions[datetime.strptime(suffix, "%Y_%m").date()] = name
+        except ValueError:
+            continue
+    return partitions
+
+
+def ensure_default_partition(db: Session):
+    db.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+
+
+def create_month_partition(db: Session, month: date) -> str:
+    name = partition_name(month)
+    lower, upper = month.isoformat(), add_months(month, 1).isoformat()
+
+    stray_rows = db.execute(
+        text(
+            f"SELECT 1 FROM {DEFAULT_PARTITION} "
+            "WHERE timestamp >= :lower AND timestamp < :upper LIMIT 1"
+        ),
+        {"lower": lower, "upper": upper}
+    ).first() if _table_exists(db, DEFAULT_PARTITION) else None
+
+    if stray_rows is None:
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        return name
+
+    # Rows for this month already landed in the default partition: move them into
+    # a standalone table first, otherwise Postgres refuses to create the range.
+    db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE timestamp >= :lower AND timestamp < :upper RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"lower": lower, "upper": upper}
+    )
+    db.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{lower}') TO ('{upper}')"
+    ))
+    return name
+
+
+def ensure_partitions(db: Session, months_ahead: int = SENSOR_PARTITION_MONTHS_AHEAD,
+                      since: Optional[date] = None) -> list[str]:
+    created = _create_missing_partitions(db, months_ahead, since)
+    db.commit()
+    return created
+
+
+def drop_expired_partitions(db: Session, retention_months: int = SENSOR_RETENTION_MONTHS) -> list[str]:
+    if retention_months <= 0:
+        return []
+
+    cutoff = add_months(month_start(date.today()), -retention_months)
+
+    dropped = []
+    for month, name in sorted(list_month_partitions(db).items()):
+        if add_months(month, 1) > cutoff:
+            continue
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+
+    db.commit()
+    return dropped
+
+
+def run_partition_maintenance():
+    db = SessionLocal()
+    try:
+        if not is_partitioned(db):
+            logger.warning("%s is not partitioned yet, run `python -m src.monitoring.partitions migrate`",
+                           PARENT_TABLE)
+            return
+
+        created = ensure_partitions(db)
+        dropped = drop_expired_partitions(db)
+        if created or dropped:
+            logger.info("Sensor partitions created: %s, dropped: %s", created, dropped)
+    finally:
+        db.close()
+
+
+partition_maintenance = PeriodicTask(
+    name="sensor-partition-maintenance",
+    interval_seconds=PARTITION_MAINTENANCE_INTERVAL_SECONDS,
+    func=run_partition_maintenance,
+)
+
+
+def migrate_to_partitioned(db: Session, drop_legacy: bool = False) -> int:
+    if is_partitioned(db):
+        return 0
+
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} RENAME TO {LEGACY_TABLE}"))
+    _rename_legacy_relations(db)
+    db.execute(text(f"ALTER TABLE {LEGACY_TABLE} ADD COLUMN IF NOT EXISTS seq BIGINT"))
+
+    db.execute(text(
+        f"CREATE TABLE {PARENT_TABLE} (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (timestamp)"
+    ))
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} ALTER COLUMN timestamp SET NOT NULL"))
+    db.execute(text(f"ALTER TABLE {PARENT_TABLE} ADD PRIMARY KEY (id, timestamp)"))
+    db.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ADD CONSTRAINT {PARENT_TABLE}_device_id_fkey "
+        "FOREIGN KEY (device_id) REFERENCES devices (id) ON DELETE CASCADE"
+    ))
+    for index in Sensor_Measurements.__table__.indexes:
+        index.create(db.connection())
+
+    oldest = db.execute(text(f"SELECT min(timestamp) FROM {LEGACY_TABLE}")).scalar()
+    _create_missing_partitions(db, SENSOR_PARTITION_MONTHS_AHEAD, oldest.date() if oldest else None)
+
+    columns = [column.name for column in Sensor_Measurements.__table__.columns]
+    source_columns = ["coalesce(timestamp, now())" if name == "timestamp" else name for name in columns]
+    copied = db.execute(text(
+        f"INSERT INTO {PARENT_TABLE} ({', '.join(columns)}) "
+        f"SELECT {', '.join(source_columns)} FROM {LEGACY_TABLE}"
+    )).rowcount
+
+    db.execute(text(f"ALTER SEQUENCE {PARENT_TABLE}_id_seq OWNED BY {PARENT_TABLE}.id"))
+    if drop_legacy:
+        db.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+
+    db.commit()
+    return copied
+
+
+def add_new_columns(db: Session):
+    for table, column in NEW_COLUMNS:
+        db.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column}"))
+    for model in NEW_TABLES:
+        model.__table__.create(db.connection(), checkfirst=True)
+    for index in (*Sensor_Measurements.__table__.indexes, *Devices.__table__.indexes):
+        index.create(db.connection(), checkfirst=True)
+    db.commit()
+
+
+def _create_missing_partitions(db: Session, months_ahead: int, since: Optional[date]) -> list[str]:
+    existing = list_month_partitions(db)
+    current = month_start(date.today())
+    month = month_start(since) if since else current
+
+    ensure_default_partition(db)
+
+    created = []
+    while month <= add_months(current, months_ahead):
+        if month not in existing:
+            created.append(create_month_partition(db, month))
+        month = add_months(month, 1)
+    return created
+
+
+def _rename_legacy_relations(db: Session):
+    constraints = db.execute(
+        text("SELECT conname FROM pg_constraint WHERE conrelid = CAST(:table AS regclass)"),
+        {"table": LEGACY_TABLE}
+    ).scalars().all()
+    for name in constraints:
+        if name.startswith(PARENT_TABLE):
+            db.execute(text(
+                f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT {name} "
+                f"TO {name.replace(PARENT_TABLE, LEGACY_TABLE, 1)}"
+            ))
+
+    indexes = db.execute(
+        text("SELECT indexname FROM pg_indexes WHERE tablename = :table"),
+        {"table": LEGACY_TABLE}
+    ).scalars().all()
+    for name in indexes:
+        if PARENT_TABLE in name and LEGACY_TABLE not in name:
+            db.execute(text(f"ALTER INDEX {name} RENAME TO {name.replace(PARENT_TABLE, LEGACY_TABLE, 1)}"))
+
+
+def _table_exists(db: Session, name: str) -> bool:
+    return db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sensor_Measurements partition management")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser(
+        "migrate", help="convert the existing table to monthly partitions, add new columns and tables"
+    )
+    migrate.add_argument("--drop-legacy", action="store_true")
+    subparsers.add_parser("maintain", help="create upcoming partitions and apply retention")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "migrate":
+        db = SessionLocal()
+        try:
+            copied = migrate_to_partitioned(db, drop_legacy=args.drop_legacy)
+            print(f"Copied {copied} rows into partitioned {PARENT_TABLE}")
+            add_new_columns(db)
+        finally:
+            db.close()
+    else:
+        run_partition_maintenance()
+
+
+if __name__ == "__main__":
+    main()
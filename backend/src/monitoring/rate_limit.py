@@ -0,0 +1,93 @@
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import NamedTuple, Optional
+
+from src.core.config import (
+    INGEST_RATE_PER_MINUTE, INGEST_RATE_BURST, INGEST_UNKNOWN_RATE_PER_MINUTE, INGEST_UNKNOWN_RATE_BURST,
+    RATE_LIMIT_MAX_BUCKETS
+)
+
+
+class RateLimit(NamedTuple):
+    per_minute: float
+    burst: float
+
+
+DEFAULT_LIMIT = RateLimit(INGEST_RATE_PER_MINUTE, INGEST_RATE_BURST)
+UNKNOWN_KEY_LIMIT = RateLimit(INGEST_UNKNOWN_RATE_PER_MINUTE, INGEST_UNKNOWN_RATE_BURST)
+REJECTED_DEVICES_MAX = 1000
+
+
+def parse_rate_limit(config: Optional[dict]) -> Optional[RateLimit]:
+    # Devices.config: {"rate_limit": {"per_minute": 6, "burst": 3}}
+    settings = (config or {}).get("rate_limit")
+    if not isinstance(settings, dict):
+        return None
+    try:
+        per_minute = float(settings["per_minute"])
+        burst = float(settings.get("burst", max(per_minute, 1)))
+    except (KeyError, TypeError, ValueError):
+        return None
+    if per_minute <= 0 or burst < 1:
+        return None
+    return RateLimit(per_minute, burst)
+
+
+def retry_after(limit: RateLimit) -> int:
+    return max(1, math.ceil(60 / limit.per_minute))
+
+
+class TokenBucketLimiter:
+    def __init__(self, max_buckets: int):
+        self.max_buckets = max_buckets
+
+        # key -> (tokens, updated_at)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._rejected_by_device: Counter[int] = Counter()
+        self._lock = threading.Lock()
+
+        self.allowed = 0
+        self.rejected = 0
+        self.rejected_unknown = 0
+
+    def allow(self, key: str, limit: RateLimit, device_id: Optional[int] = None, cost: float = 1.0) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated_at) * limit.per_minute / 60)
+
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+                self.allowed += 1
+            else:
+                self.rejected += 1
+                if device_id is None:
+                    self.rejected_unknown += 1
+                else:
+                    self._rejected_by_device[device_id] += 1
+                    if len(self._rejected_by_device) > REJECTED_DEVICES_MAX:
+                        # Keeps the worst offenders, the long tail only grows the admin metrics.
+                        self._rejected_by_device = Counter(
+                            dict(self._rejected_by_device.most_common(REJECTED_DEVICES_MAX // 2))
+                        )
+
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "buckets": len(self._buckets),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "rejected_unknown": self.rejected_unknown,
+                "rejected_by_device": dict(self._rejected_by_device.most_common()),
+            }
+
+
+ingest_limiter = TokenBucketLimiter(max_buckets=RATE_LIMIT_MAX_BUCKETS)
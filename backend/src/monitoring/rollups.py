@@ -0,0 +1,253 @@
+import argparse
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import case, delete, func, select, type_coerce
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, aggregate_order_by, insert
+from sqlalchemy.orm import Session
+
+from src.core.config import SERIES_RAW_MAX_HOURS, SERIES_HOURLY_MAX_DAYS
+from src.database import SessionLocal
+from src.monitoring.models import (
+    SENSOR_METRICS, Sensor_Measurements, Sensor_Rollups_Hourly, Sensor_Rollups_Daily
+)
+
+ROLLUP_TABLES = {
+    "hour": Sensor_Rollups_Hourly,
+    "day": Sensor_Rollups_Daily,
+}
+
+# Raw columns round on insert (DECIMAL(4, 2), INTEGER, ...), so rollups round the same way.
+METRIC_SCALES = {
+    metric: getattr(Sensor_Measurements.__table__.c[metric].type, "scale", None) or 0
+    for metric in SENSOR_METRICS
+}
+
+
+def bucket_start(timestamp: datetime, resolution: str) -> datetime:
+    if resolution == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def aggregate_rows(rows: list[dict], resolution: str) -> list[dict]:
+    buckets = {}
+
+    for row in rows:
+        key = (row["device_id"], bucket_start(row["timestamp"], resolution))
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = {"device_id": key[0], "bucket": key[1], "samples": 0, "last_at": row["timestamp"]}
+            for metric in SENSOR_METRICS:
+                bucket.update({
+                    f"{metric}_min": None, f"{metric}_max": None, f"{metric}_sum": None,
+                    f"{metric}_count": 0, f"{metric}_last": None,
+                })
+            buckets[key] = bucket
+
+        is_latest = row["timestamp"] >= bucket["last_at"]
+        bucket["samples"] += 1
+        if is_latest:
+            bucket["last_at"] = row["timestamp"]
+
+        for metric in SENSOR_METRICS:
+            value = row.get(metric)
+            if value is None:
+                continue
+            value = round(float(value), METRIC_SCALES[metric])
+            if bucket[f"{metric}_count"] == 0:
+                bucket[f"{metric}_min"] = bucket[f"{metric}_max"] = value
+                bucket[f"{metric}_sum"] = 0.0
+            else:
+                bucket[f"{metric}_min"] = min(bucket[f"{metric}_min"], value)
+                bucket[f"{metric}_max"] = max(bucket[f"{metric}_max"], value)
+            bucket[f"{metric}_sum"] += value
+            bucket[f"{metric}_count"] += 1
+            if is_latest or bucket[f"{metric}_last"] is None:
+                bucket[f"{metric}_last"] = value
+
+    return list(buckets.values())
+
+
+def apply_rollups(db: Session, rows: list[dict]):
+    for resolution, table in ROLLUP_TABLES.items():
+        buckets = aggregate_rows(rows, resolution)
+        if not buckets:
+            continue
+
+        stmt = insert(table)
+        current, incoming = table.__table__.c, stmt.excluded
+        newer = incoming.last_at >= current.last_at
+
+        values = {
+            "samples": current.samples + incoming.samples,
+            "last_at": func.greatest(current.last_at, incoming.last_at),
+        }
+        for metric in SENSOR_METRICS:
+            values.update({
+                f"{metric}_min": func.least(current[f"{metric}_min"], incoming[f"{metric}_min"]),
+                f"{metric}_max": func.greatest(current[f"{metric}_max"], incoming[f"{metric}_max"]),
+                f"{metric}_sum": func.coalesce(current[f"{metric}_sum"], 0) + func.coalesce(incoming[f"{metric}_sum"], 0),
+                f"{metric}_count": current[f"{metric}_count"] + incoming[f"{metric}_count"],
+                f"{metric}_last": case(
+                    (newer, func.coalesce(incoming[f"{metric}_last"], current[f"{metric}_last"])),
+                    else_=func.coalesce(current[f"{metric}_last"], incoming[f"{metric}_last"]),
+                ),
+            })
+
+        db.execute(
+            stmt.on_conflict_do_update(index_elements=["device_id", "bucket"], set_=values),
+            buckets
+        )
+
+
+def rebuild_rollups(
+        db: Session,
+        since: datetime,
+        until: datetime,
+        device_ids: Optional[list[int]] = None
+):
+    for resolution, table in ROLLUP_TABLES.items():
+        start = bucket_start(since, resolution)
+        end = bucket_start(until, resolution) + (timedelta(hours=1) if resolution == "hour" else timedelta(days=1))
+
+        cleanup = delete(table).where(table.bucket >= start, table.bucket < end)
+        if device_ids is not None:
+            cleanup = cleanup.where(table.device_id.in_(device_ids))
+        db.execute(cleanup)
+
+        bucket = func.date_trunc(resolution, Sensor_Measurements.timestamp)
+        columns = [
+            Sensor_Measurements.device_id,
+            bucket.label("bucket"),
+            func.count().label("samples"),
+            func.max(Sensor_Measurements.timestamp).label("last_at"),
+        ]
+        for metric in SENSOR_METRICS:
+            value = getattr(Sensor_Measurements, metric)
+            columns += [
+                func.min(value).label(f"{metric}_min"),
+                func.max(value).label(f"{metric}_max"),
+                func.sum(value).label(f"{metric}_sum"),
+                func.count(value).label(f"{metric}_count"),
+                type_coerce(
+                    func.array_agg(aggregate_order_by(value, Sensor_Measurements.timestamp.desc()))
+                    .filter(value.isnot(None)),
+                    ARRAY(DOUBLE_PRECISION)
+                )[1].label(f"{metric}_last"),
+            ]
+
+        source = (
+            select(*columns)
+            .where(Sensor_Measurements.timestamp >= start, Sensor_Measurements.timestamp < end)
+            .group_by(Sensor_Measurements.device_id, bucket)
+        )
+        if device_ids is not None:
+            source = source.where(Sensor_Measurements.device_id.in_(device_ids))
+
+        column_names = ["device_id", "bucket", "samples", "last_at"]
+        for metric in SENSOR_METRICS:
+            column_names += [f"{metric}_{part}" for part in ("min", "max", "sum", "count", "last")]
+
+        db.execute(insert(table).from_select(column_names, source))
+
+    db.commit()
+
+
+def choose_resolution(since: datetime, until: datetime) -> str:
+    span = until - since
+    if span <= timedelta(hours=SERIES_RAW_MAX_HOURS):
+        return "raw"
+    if span <= timedelta(days=SERIES_HOURLY_MAX_DAYS):
+        return "hour"
+    return "day"
+
+
+def get_sensor_series(
+        db: Session,
+        device_id: int,
+        since: datetime,
+        until: datetime,
+        resolution: str = "auto"
+) -> dict:
+    if resolution == "auto":
+        resolution = choose_resolution(since, until)
+
+    if resolution == "raw":
+        points = _raw_points(db, device_id, since, until)
+    else:
+        points = _rollup_points(db, ROLLUP_TABLES[resolution], device_id, since, until)
+
+    return {
+        "device_id": device_id,
+        "resolution": resolution,
+        "since": since,
+        "until": until,
+        "points": points,
+    }
+
+
+def _raw_points(db: Session, device_id: int, since: datetime, until: datetime) -> list[dict]:
+    rows = db.execute(
+        select(Sensor_Measurements.timestamp, *(getattr(Sensor_Measurements, m) for m in SENSOR_METRICS))
+        .where(Sensor_Measurements.device_id == device_id)
+        .where(Sensor_Measurements.timestamp >= since, Sensor_Measurements.timestamp < until)
+        .order_by(Sensor_Measurements.timestamp)
+    ).all()
+
+    points = []
+    for timestamp, *values in rows:
+        point = {"timestamp": timestamp, "samples": 1}
+        for metric, value in zip(SENSOR_METRICS, values):
+            if value is None:
+                point[metric] = None
+            else:
+                value = float(value)
+                point[metric] = {"min": value, "max": value, "avg": value, "last": value, "count": 1}
+        points.append(point)
+    return points
+
+
+def _rollup_points(db: Session, table, device_id: int, since: datetime, until: datetime) -> list[dict]:
+    rows = db.scalars(
+        select(table)
+        .where(table.device_id == device_id)
+        .where(table.bucket >= since, table.bucket < until)
+        .order_by(table.bucket)
+    ).all()
+
+    points = []
+    for row in rows:
+        point = {"timestamp": row.bucket, "samples": row.samples}
+        for metric in SENSOR_METRICS:
+            count = getattr(row, f"{metric}_count")
+            if not count:
+                point[metric] = None
+                continue
+            point[metric] = {
+                "min": getattr(row, f"{metric}_min"),
+                "max": getattr(row, f"{metric}_max"),
+                "avg": getattr(row, f"{metric}_sum") / count,
+                "last": getattr(row, f"{metric}_last"),
+                "count": count,
+            }
+        points.append(point)
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild sensor rollups from raw Sensor_Measurements")
+    parser.add_argument("--since", type=datetime.fromisoformat, required=True)
+    parser.add_argument("--until", type=datetime.fromisoformat, default=datetime.now())
+    parser.add_argument("--device-id", type=int, action="append", dest="device_ids")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db, since=args.since, until=args.until, device_ids=args.device_ids)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,34 @@
 
-from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import desc
+from datetime import datetime, timedelta
+from typing import Annotated, Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from starlette import status
 
-from src.database import get_db
+from src.database import SessionLocal, get_db
+from src.core.config import INGEST_MODE
 from src.auth.service import get_current_user
-from src.monitoring.models import Devices, Manual_Measurements, Sensor_Measurements
-from src.monitoring.service import create_manual_measurement
+from src.aquariums.service import get_aquarium
+from src.monitoring.models import SENSOR_METRICS, Devices, Manual_Measurements, Sensor_Measurements
+from src.monitoring.ingest import build_sensor_row, reading_timestamp, store_sensor_rows
+from src.monitoring.rollups import get_sensor_series
+from src.monitoring.downsampling import get_downsampled_series
+from src.monitoring.export import EXPORT_MEDIA_TYPES, sensor_export_statement, stream_sensor_export
+from src.monitoring.pagination import NEXT_CURSOR_HEADER, apply_keyset, encode_cursor
+from src.monitoring.ingest_buffer import ingest_buffer
+from src.monitoring.service import create_manual_measurement, ingest_sensor_batch, get_live_topics, check_ingest_rate
+from src.monitoring.service import ingest_sensor_backfill
+from src.monitoring.live import live_event_stream, measurement_broker
+from src.monitoring.latest import latest_readings
+from src.monitoring.heartbeat import heartbeat_tracker
 from src.monitoring.schemas import ManualDataCreate, SensorIncoming, SensorMeasurementResponse,ManualMeasurementResponse
+from src.monitoring.schemas import SensorBatchIncoming, SensorBatchResponse, SensorSeriesResponse, SensorLatestResponse
+from src.monitoring.schemas import SensorChartResponse, ManualImportResponse
+from src.monitoring.schemas import SensorBackfillIncoming, SensorBackfillResponse
+from src.monitoring.manual_import import import_manual_measurements
 
 router = APIRouter(prefix="/measurements", tags=["Measurements 📈"])
 
@@ -20,41 +39,165 @@ user_dependency = Annotated[dict, Depends(get_current_user)]
 @router.get("/sensor/{device_id}", response_model=list[SensorMeasurementResponse])
 def get_sensor_measurements(
         device_id: int,
-        limit: int = 50,
+        response: Response,
+        limit: int = Query(50, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        order: Literal["desc", "asc"] = "desc",
         db: Session = Depends(get_db)
 ):
-  measurements = db.query(Sensor_Measurements) \
-    .filter(Sensor_Measurements.device_id == device_id) \
-    .order_by(desc(Sensor_Measurements.timestamp)) \
-    .limit(limit) \
-    .all()
+  stmt = apply_keyset(
+    select(Sensor_Measurements).where(Sensor_Measurements.device_id == device_id),
+    Sensor_Measurements.timestamp, Sensor_Measurements.id,
+    cursor=cursor, since=since, until=until, order=order
+  )
+  measurements = db.scalars(stmt.limit(limit)).all()
 
-  if not measurements:
-    return []
+  if measurements:
+    last = measurements[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.timestamp, last.id)
 
   return measurements
 
+
+@router.get("/sensor/{device_id}/series", response_model=SensorSeriesResponse)
+def get_sensor_series_route(
+        device_id: int,
+        db: db_dependency,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        resolution: Literal["auto", "raw", "hour", "day"] = "auto"
+):
+  until = until or datetime.now()
+  since = since or until - timedelta(hours=24)
+
+  if since >= until:
+    raise HTTPException(status_code=400, detail="Початок періоду має бути раніше за кінець")
+
+  return get_sensor_series(db, device_id=device_id, since=since, until=until, resolution=resolution)
+
+
+@router.get("/sensor/{device_id}/chart", response_model=SensorChartResponse)
+def get_sensor_chart_route(
+        device_id: int,
+        db: db_dependency,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        points: int = Query(800, ge=3, le=10000),
+        metrics: Optional[list[str]] = Query(None)
+):
+  until = until or datetime.now()
+  since = since or until - timedelta(hours=24)
+
+  if since >= until:
+    raise HTTPException(status_code=400, detail="Початок періоду має бути раніше за кінець")
+
+  metrics = tuple(dict.fromkeys(metrics)) if metrics else SENSOR_METRICS
+  if any(metric not in SENSOR_METRICS for metric in metrics):
+    raise HTTPException(status_code=400, detail="Неправильні параметри")
+
+  return get_downsampled_series(db, device_id=device_id, since=since, until=until, points=points, metrics=metrics)
+
+
+@router.get("/sensor/{device_id}/latest", response_model=SensorLatestResponse)
+def get_sensor_latest(device_id: int, db: db_dependency):
+  state = latest_readings.get(db, device_id)
+  return {
+    "device_id": device_id,
+    "readings": {metric: {"value": value, "timestamp": timestamp} for metric, (value, timestamp) in state.items()}
+  }
+
+
+@router.get("/latest/{aquarium_id}", response_model=SensorLatestResponse)
+def get_aquarium_latest(aquarium_id: int, db: db_dependency, user: user_dependency):
+  aquarium = get_aquarium(db=db, aquarium_id=aquarium_id)
+  if aquarium.user_id != user.get("user_id"):
+    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ви не можете переглядати чужі акваріуми")
+
+  state = latest_readings.get_for_aquarium(db, aquarium_id)
+  return {
+    "aquarium_id": aquarium_id,
+    "readings": {metric: {"value": value, "timestamp": timestamp} for metric, (value, timestamp) in state.items()}
+  }
+
+
+@router.get("/export")
+def export_sensor_measurements(
+        db: db_dependency,
+        user: user_dependency,
+        format: Literal["ndjson", "csv"] = "ndjson",
+        aquarium_id: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+):
+  if aquarium_id is not None:
+    aquarium = get_aquarium(db=db, aquarium_id=aquarium_id)
+    if aquarium.user_id != user.get("user_id"):
+      raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Ви не можете переглядати чужі акваріуми")
+
+  stmt = sensor_export_statement(user_id=user.get("user_id"), aquarium_id=aquarium_id, since=since, until=until)
+  filename = f"sensor_measurements_{datetime.now():%Y%m%d_%H%M%S}.{format}"
+
+  return StreamingResponse(
+    stream_sensor_export(stmt, format),
+    media_type=EXPORT_MEDIA_TYPES[format],
+    headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+  )
+
+
+@router.get("/live")
+async def live_measurements(
+        user: user_dependency,
+        device_id: Optional[int] = None,
+        aquarium_id: Optional[int] = None
+):
+  # The stream can stay open for hours, so the ownership check gets its own short-lived
+  # session instead of holding a pooled connection through db_dependency.
+  def resolve_topics():
+    db = SessionLocal()
+    try:
+      return get_live_topics(db, user.get("user_id"), device_id=device_id, aquarium_id=aquarium_id)
+    finally:
+      db.close()
+
+  topics = await run_in_threadpool(resolve_topics)
+  queue = measurement_broker.subscribe(topics)
+
+  return StreamingResponse(
+    live_event_stream(queue, topics),
+    media_type="text/event-stream",
+    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+  )
+
+
 @router.get("/manual/{aquarium_id}", response_model=list[ManualMeasurementResponse])
 def get_manual_measurements(
         aquarium_id: int,
-        limit: int = 20,
+        response: Response,
+        limit: int = Query(20, ge=1, le=1000),
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        order: Literal["desc", "asc"] = "desc",
         db: Session = Depends(get_db)
 ):
+  stmt = apply_keyset(
+    select(Manual_Measurements).where(Manual_Measurements.aquarium_id == aquarium_id),
+    Manual_Measurements.timestamp, Manual_Measurements.id,
+    cursor=cursor, since=since, until=until, order=order
+  )
+  measurements = db.scalars(stmt.limit(limit)).all()
 
-  measurements = db.query(Manual_Measurements) \
-    .filter(Manual_Measurements.aquarium_id == aquarium_id) \
-    .order_by(desc(Manual_Measurements.timestamp)) \
-    .limit(limit) \
-    .all()
-
-  if not measurements:
-    return []
+  if measurements:
+    last = measurements[-1]
+    response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.timestamp, last.id)
 
   return measurements
 
 
 @router.post("/manual/{aquarium_id}")
-async def add_manual_measurements(
+def add_manual_measurements(
   db:db_dependency,
   data:ManualDataCreate,
   aquarium_id:int,
@@ -63,26 +206,55 @@ async def add_manual_measurements(
   return create_manual_measurement(db=db, data=data, aquarium_id=aquarium_id, user_id=user.get("user_id"))
 
 
-@router.post("/sensor", status_code=status.HTTP_200_OK)
-def receive_sensor_data_route(data: SensorIncoming, db: db_dependency):
-  device = db.query(Devices).filter(Devices.api_key == data.api_key).first()
+@router.post("/manual/{aquarium_id}/import", response_model=ManualImportResponse)
+def import_manual_measurements_route(
+        aquarium_id: int,
+        db: db_dependency,
+        user: user_dependency,
+        file: UploadFile = File(...)
+):
+  return import_manual_measurements(db, aquarium_id=aquarium_id, user_id=user.get("user_id"), file=file.file)
 
+
+@router.post("/sensor", status_code=status.HTTP_200_OK)
+def receive_sensor_data_route(data: SensorIncoming, db: db_dependency, request: Request, response: Response):
+  device = check_ingest_rate(db, data.api_key, request.client.host if request.client else None)
   if not device:
     raise HTTPException(status_code=404, detail="Девайс не знайдено або невірний api key")
 
-  new_measurement = Sensor_Measurements(
-    device_id=device.id,
-    temperature=data.measurements.temperature,
-    ph=data.measurements.ph,
-    tds=data.measurements.tds,
-    turbidity=data.measurements.turbidity,
-    water_level=data.measurements.water_level,
-    room_temperature=data.measurements.room_temperature,
-    room_humidity=data.measurements.room_humidity
-  )
+  heartbeat_tracker.touch([device.device_id])
+
+  if INGEST_MODE == "buffered":
+    row = build_sensor_row(
+      device.device_id, data.measurements,
+      timestamp=reading_timestamp(data.device_ts, received_at=datetime.now()), seq=data.seq
+    )
+    if not ingest_buffer.submit(row):
+      raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Черга вимірювань переповнена, спробуйте пізніше",
+        headers={"Retry-After": "1"}
+      )
+
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {"status": "accepted", "message": "Дані прийнято в обробку"}
+
+  row = build_sensor_row(device.device_id, data.measurements, timestamp=reading_timestamp(data.device_ts), seq=data.seq)
+  if not store_sensor_rows(db, [row]):
+    return {"status": "duplicate", "message": "Дублікат, вимірювання вже збережено"}
 
-  db.add(new_measurement)
-  db.commit()
-  db.refresh(new_measurement)
+  return {"status": "success", "message": "Дані збережено"}
+
+
+@router.post("/sensor/batch", response_model=SensorBatchResponse)
+def receive_sensor_batch_route(data: SensorBatchIncoming, db: db_dependency):
+  return ingest_sensor_batch(db=db, readings=data.readings)
+
+
+@router.post("/sensor/backfill", response_model=SensorBackfillResponse)
+def receive_sensor_backfill_route(data: SensorBackfillIncoming, db: db_dependency, request: Request):
+  device = check_ingest_rate(db, data.api_key, request.client.host if request.client else None)
+  if not device:
+    raise HTTPException(status_code=404, detail="Девайс не знайдено або невірний api key")
 
-  return {"status": "success", "message": "Дані збережено"}
\ No newline at end of file
+  return ingest_sensor_backfill(db=db, device_id=device.device_id, readings=data.readings)
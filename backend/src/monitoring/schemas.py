@@ -3,6 +3,8 @@ from datetime import datetime, date
 from typing import Optional, List
 from decimal import Decimal
 
+from src.core.config import BACKFILL_MAX_READINGS
+
 class ManualDataCreate(BaseModel):
     ammonia: Optional[Decimal]
     nitrite: Optional[Decimal]
@@ -11,6 +13,16 @@ class ManualDataCreate(BaseModel):
     kh: Optional[Decimal]
     phosphate: Optional[Decimal]
 
+class ManualImportError(BaseModel):
+    line: int
+    detail: str
+
+class ManualImportResponse(BaseModel):
+    imported: int
+    rejected: int
+    errors: List[ManualImportError]
+    errors_truncated: bool = False
+
 class NitrogenStatusResponse(BaseModel):
     status: str
     percent: int
@@ -36,12 +48,52 @@ class SensorMeasurements(BaseModel):
 class SensorIncoming(BaseModel):
     api_key: str
     measurements: SensorMeasurements
+    seq: Optional[int] = Field(None, ge=0)
+    device_ts: Optional[datetime] = None
+
+
+class SensorBatchIncoming(BaseModel):
+    readings: List[dict] = Field(..., min_length=1, max_length=1000)
+
+
+class SensorBatchItemResult(BaseModel):
+    index: int
+    accepted: bool
+    detail: Optional[str] = None
+
+
+class SensorBatchResponse(BaseModel):
+    accepted: int
+    rejected: int
+    duplicates: int = 0
+    results: List[SensorBatchItemResult]
+
+
+class SensorBackfillReading(BaseModel):
+    measurements: SensorMeasurements
+    device_ts: datetime
+    seq: Optional[int] = Field(None, ge=0)
+
+
+class SensorBackfillIncoming(BaseModel):
+    api_key: str
+    readings: List[dict] = Field(..., min_length=1, max_length=BACKFILL_MAX_READINGS)
+
+
+class SensorBackfillResponse(BaseModel):
+    accepted: int
+    rejected: int
+    duplicates: int
+    since: Optional[datetime] = None
+    until: Optional[datetime] = None
+    errors: List[SensorBatchItemResult]
 
 
 class SensorMeasurementResponse(BaseModel):
     id: int
     device_id: int
     timestamp: datetime
+    seq: Optional[int] = None
     temperature: Optional[float]
     ph: Optional[float]
     tds: Optional[int]
@@ -65,4 +117,57 @@ class ManualMeasurementResponse(BaseModel):
     phosphate: Optional[float]
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class SensorMetricAggregate(BaseModel):
+    min: Optional[float]
+    max: Optional[float]
+    avg: Optional[float]
+    last: Optional[float]
+    count: int
+
+
+class SensorSeriesPoint(BaseModel):
+    timestamp: datetime
+    samples: int
+    temperature: Optional[SensorMetricAggregate] = None
+    ph: Optional[SensorMetricAggregate] = None
+    tds: Optional[SensorMetricAggregate] = None
+    turbidity: Optional[SensorMetricAggregate] = None
+    water_level: Optional[SensorMetricAggregate] = None
+    room_temperature: Optional[SensorMetricAggregate] = None
+    room_humidity: Optional[SensorMetricAggregate] = None
+
+
+class SensorSeriesResponse(BaseModel):
+    device_id: int
+    resolution: str
+    since: datetime
+    until: datetime
+    points: List[SensorSeriesPoint]
+
+
+class SensorChartSeries(BaseModel):
+    timestamps: List[datetime]
+    values: List[float]
+
+
+class SensorChartResponse(BaseModel):
+    device_id: int
+    since: datetime
+    until: datetime
+    source: str
+    raw_points: int
+    series: dict[str, SensorChartSeries]
+
+
+class SensorLatestReading(BaseModel):
+    value: float
+    timestamp: datetime
+
+
+class SensorLatestResponse(BaseModel):
+    device_id: Optional[int] = None
+    aquarium_id: Optional[int] = None
+    readings: dict[str, SensorLatestReading]
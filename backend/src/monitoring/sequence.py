@@ -0,0 +1,81 @@
+import threading
+
+from sqlalchemy import event
+
+from src.core.config import INGEST_SEQ_RESET_GAP
+from src.monitoring.models import Devices
+
+
+class SequenceTracker:
+    def __init__(self, reset_gap: int):
+        self.reset_gap = reset_gap
+
+        # device_id -> highest stored seq
+        self._marks: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+        self.duplicates = 0
+        self.conflicts = 0
+        self.resets = 0
+
+    def split(self, rows: list[dict]) -> tuple[list[dict], list[dict]]:
+        with self._lock:
+            marks = dict(self._marks)
+
+        fresh, duplicates = [], []
+        sequenced = sorted((row for row in rows if row.get("seq") is not None), key=lambda row: row["seq"])
+
+        for row in sequenced:
+            device_id, seq = row["device_id"], row["seq"]
+            mark = marks.get(device_id)
+            # A large step back means the device lost its counter (reflash, NVS wipe),
+            # a retry is at most a few readings behind the mark.
+            if mark is not None and mark - self.reset_gap <= seq <= mark:
+                duplicates.append(row)
+                continue
+            marks[device_id] = seq
+            fresh.append(row)
+
+        fresh.extend(row for row in rows if row.get("seq") is None)
+
+        with self._lock:
+            self.duplicates += len(duplicates)
+        return fresh, duplicates
+
+    def advance(self, rows: list[dict]):
+        sequenced = sorted((row for row in rows if row.get("seq") is not None), key=lambda row: row["seq"])
+        with self._lock:
+            for row in sequenced:
+                seq = row["seq"]
+                mark = self._marks.get(row["device_id"])
+                if mark is None or seq > mark:
+                    self._marks[row["device_id"]] = seq
+                elif seq < mark - self.reset_gap:
+                    self._marks[row["device_id"]] = seq
+                    self.resets += 1
+
+    def count_conflicts(self, count: int):
+        with self._lock:
+            self.conflicts += count
+
+    def forget_devices(self, device_ids: list[int]):
+        with self._lock:
+            for device_id in device_ids:
+                self._marks.pop(device_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "devices": len(self._marks),
+                "duplicates": self.duplicates,
+                "conflicts": self.conflicts,
+                "resets": self.resets,
+            }
+
+
+sequence_tracker = SequenceTracker(reset_gap=INGEST_SEQ_RESET_GAP)
+
+
+@event.listens_for(Devices, "after_delete")
+def _forget_deleted_device(mapper, connection, target: Devices):
+    sequence_tracker.forget_devices([target.id])
@@ -1,14 +1,24 @@
 import os
-from typing import Annotated
+from datetime import datetime, timedelta
+from typing import Annotated, Optional
 from sqlalchemy import func
 from fastapi import Depends, HTTPException, status
 from starlette import status
 from src.database import get_db
 from sqlalchemy.orm import Session
 from sqlalchemy import select, desc
+from pydantic import ValidationError
 from src.aquariums.service import get_aquarium
-from src.monitoring.schemas import ManualDataCreate
+from src.core.config import BACKFILL_MAX_AGE_DAYS
+from src.monitoring.schemas import ManualDataCreate, SensorIncoming, SensorBackfillReading
 from src.monitoring.models import Manual_Measurements, Sensor_Measurements, Devices
+from src.monitoring.device_cache import CachedDevice, device_key_cache
+from src.monitoring.rate_limit import DEFAULT_LIMIT, UNKNOWN_KEY_LIMIT, RateLimit, ingest_limiter, retry_after
+from src.monitoring.ingest import backfill_sensor_rows, build_sensor_row, reading_timestamp, store_sensor_rows
+from src.monitoring.latest import latest_readings, latest_value
+from src.monitoring.heartbeat import heartbeat_tracker
+from src.monitoring.alerts import alert_engine
+from src.monitoring.trends import TREND_PARAMETERS, analyze_trends
 from src.users.service import get_user_by_id
 
 db_dependency = Annotated[Session, Depends(get_db)]
@@ -37,12 +47,178 @@ def create_manual_measurement(db: Session, data: ManualDataCreate, aquarium_id:
     db.commit()
     db.refresh(new_manual_measurement)
 
+    alert_engine.evaluate_manual_rows(db, [{
+        "aquarium_id": aquarium.id,
+        "timestamp": new_manual_measurement.timestamp,
+        **data.model_dump(),
+    }])
+
     return {
         "message": "Тести успішно додані",
         "measurement": new_manual_measurement
     }
 
 
+def get_live_topics(db: Session, user_id: int, device_id: int = None, aquarium_id: int = None) -> list[tuple[str, int]]:
+    if device_id is None and aquarium_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Вкажіть device_id або aquarium_id"
+        )
+
+    topics = []
+
+    if device_id is not None:
+        device = db.query(Devices).filter(Devices.id == device_id).first()
+        if device is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Девайс не знайдено")
+        if device.aquarium is None or device.aquarium.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Ви не можете переглядати чужі пристрої"
+            )
+        topics.append(("device", device_id))
+
+    if aquarium_id is not None:
+        aquarium = get_aquarium(db=db, aquarium_id=aquarium_id)
+        if aquarium.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Ви не можете переглядати чужі акваріуми"
+            )
+        topics.append(("aquarium", aquarium_id))
+
+    return topics
+
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def check_ingest_rate(db: Session, api_key: str, client_host: Optional[str]) -> Optional[CachedDevice]:
+    found, device = device_key_cache.peek(api_key)
+
+    # Keys that aren't known to resolve are charged to the client address before the lookup,
+    # so a flood of made-up keys is neither a SELECT each nor a bucket each.
+    if device is None:
+        _charge(f"ip:{client_host}", UNKNOWN_KEY_LIMIT, None)
+        if found:
+            return None
+        device = device_key_cache.load(db, api_key)
+        if device is None:
+            return None
+
+    _charge(f"key:{api_key}", device.rate_limit or DEFAULT_LIMIT, device.device_id)
+    return device
+
+
+def _charge(key: str, limit: RateLimit, device_id: Optional[int]):
+    if not ingest_limiter.allow(key, limit, device_id=device_id):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Перевищено ліміт запитів для пристрою",
+            headers={"Retry-After": str(retry_after(limit))}
+        )
+
+
+def ingest_sensor_batch(db: Session, readings: list[dict]) -> dict:
+    results = []
+    parsed = []
+
+    for index, raw in enumerate(readings):
+        try:
+            parsed.append((index, SensorIncoming.model_validate(raw)))
+        except ValidationError as e:
+            results.append({"index": index, "accepted": False, "detail": format_validation_error(e)})
+
+    # One lookup for the whole batch; buckets are only created for keys that resolve.
+    devices = device_key_cache.resolve_many(db, {item.api_key for _, item in parsed})
+
+    # A batch is one request per device, however many readings it carries.
+    allowed = {
+        api_key: ingest_limiter.allow(f"key:{api_key}", device.rate_limit or DEFAULT_LIMIT, device_id=device.device_id)
+        for api_key, device in devices.items() if device is not None
+    }
+
+    rows = []
+    row_indexes = []
+    for index, item in parsed:
+        device = devices.get(item.api_key)
+        if device is None:
+            results.append({"index": index, "accepted": False, "detail": "Девайс не знайдено або невірний api key"})
+            continue
+
+        if not allowed[item.api_key]:
+            results.append({"index": index, "accepted": False, "detail": "Перевищено ліміт запитів для пристрою"})
+            continue
+
+        rows.append(build_sensor_row(
+            device.device_id, item.measurements, timestamp=reading_timestamp(item.device_ts), seq=item.seq
+        ))
+        row_indexes.append(index)
+
+    heartbeat_tracker.touch({row["device_id"] for row in rows})
+    stored = {id(row) for row in store_sensor_rows(db, rows)}
+
+    duplicates = 0
+    for index, row in zip(row_indexes, rows):
+        if id(row) in stored:
+            results.append({"index": index, "accepted": True, "detail": None})
+        else:
+            duplicates += 1
+            results.append({"index": index, "accepted": True, "detail": "Дублікат, вимірювання вже збережено"})
+
+    results.sort(key=lambda result: result["index"])
+
+    return {
+        "accepted": len(rows),
+        "rejected": len(results) - len(rows),
+        "duplicates": duplicates,
+        "results": results
+    }
+
+
+def ingest_sensor_backfill(db: Session, device_id: int, readings: list[dict]) -> dict:
+    errors = []
+    rows = []
+    oldest = datetime.now() - timedelta(days=BACKFILL_MAX_AGE_DAYS)
+
+    for index, raw in enumerate(readings):
+        try:
+            item = SensorBackfillReading.model_validate(raw)
+        except ValidationError as e:
+            errors.append({"index": index, "accepted": False, "detail": format_validation_error(e)})
+            continue
+
+        timestamp = reading_timestamp(item.device_ts)
+        if timestamp is None:
+            errors.append({"index": index, "accepted": False, "detail": "Час вимірювання в майбутньому"})
+            continue
+        if timestamp < oldest:
+            errors.append({
+                "index": index, "accepted": False,
+                "detail": f"Вимірювання старше за {BACKFILL_MAX_AGE_DAYS:g} днів"
+            })
+            continue
+
+        rows.append(build_sensor_row(device_id, item.measurements, timestamp=timestamp, seq=item.seq))
+
+    heartbeat_tracker.touch([device_id])
+    stored = backfill_sensor_rows(db, rows) if rows else []
+
+    return {
+        "accepted": len(rows),
+        "rejected": len(errors),
+        "duplicates": len(rows) - len(stored),
+        "since": min((row["timestamp"] for row in stored), default=None),
+        "until": max((row["timestamp"] for row in stored), default=None),
+        "errors": errors
+    }
+
+
 def analyze_parameter_trends(
         db: Session,
         aquarium_id: int,
@@ -59,70 +235,34 @@ def analyze_parameter_trends(
             detail="Ви не можете переглядати чужі акваріуми"
         )
 
-    target_field = getattr(Sensor_Measurements, parameter)
-
-    stmt = (
-        select(Sensor_Measurements)
-        .join(Devices)
-        .where(Devices.aquarium_id == aquarium_id)
-        .where(target_field.isnot(None))
-        .order_by(desc(Sensor_Measurements.timestamp))
-        .limit(n_points)
-    )
-
-    measurements = db.scalars(stmt).all()
-
-    if len(measurements) < 2:
+    if latest_value(latest_readings.get_for_aquarium(db, aquarium_id), parameter) is None:
         return {
             "status": "Unknown",
             "rate_per_hour": 0,
             "message": "Недостатньо даних для аналізу тренду."
         }
 
-    newest = measurements[0]
-    oldest = measurements[-1]
-
-    val_diff = float(getattr(newest, parameter)) - float(getattr(oldest, parameter))
-
-    time_diff_seconds = (newest.timestamp - oldest.timestamp).total_seconds()
+    return analyze_trends(db, aquarium_id, (parameter,), n_points=n_points)[parameter]
 
-    if time_diff_seconds == 0:
-        return {"status": "Error", "message": "Помилка часу вимірювань."}
 
-    time_diff_hours = time_diff_seconds / 3600.0
-
-    rate_per_hour = val_diff / time_diff_hours
-
-    THRESHOLD = 0.2
+def analyze_aquarium_trends(
+        db: Session,
+        aquarium_id: int,
+        user_id: int,
+        n_points: int = 30,
+        hours: Optional[float] = None
+) -> dict:
+    aquarium = get_aquarium(db=db, aquarium_id=aquarium_id)
 
-    if parameter == "ph":
-        if rate_per_hour < -THRESHOLD:
-            return {
-                "status": "CRITICAL DROP",
-                "rate_per_hour": round(rate_per_hour, 3),
-                "color": "red",
-                "message": f"УВАГА! pH різко падає! ({round(rate_per_hour, 2)} за годину). Ризик pH-шоку."
-            }
-        elif rate_per_hour > THRESHOLD:
-            return {
-                "status": "Rapid Rise",
-                "rate_per_hour": round(rate_per_hour, 3),
-                "color": "orange",
-                "message": f"pH різко зростає ({round(rate_per_hour, 2)} за годину). Можливий викид аміаку."
-            }
+    if aquarium.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Ви не можете переглядати чужі акваріуми"
+        )
 
-    elif parameter == "temperature":
-        if abs(rate_per_hour) > 2.0:
-            return {
-                "status": "Temp Shock",
-                "rate_per_hour": round(rate_per_hour, 2),
-                "color": "red",
-                "message": "Температурний шок! Вода змінює температуру занадто швидко."
-            }
+    since = datetime.now() - timedelta(hours=hours) if hours else None
 
     return {
-        "status": "Stable",
-        "rate_per_hour": round(rate_per_hour, 3),
-        "color": "green",
-        "message": "Параметри стабільні."
+        "aquarium_id": aquarium_id,
+        "parameters": analyze_trends(db, aquarium_id, TREND_PARAMETERS, n_points=n_points, since=since)
     }
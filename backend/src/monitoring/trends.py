@@ -0,0 +1,199 @@
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import Float, cast, func, select, true
+from sqlalchemy.orm import Session
+
+from src.monitoring.models import Devices, Sensor_Measurements
+
+TREND_PARAMETERS = ("ph", "temperature", "tds")
+MAX_TREND_POINTS = 1000
+
+PH_RATE_THRESHOLD = 0.2
+TEMPERATURE_RATE_THRESHOLD = 2.0
+
+
+def load_trend_window(
+        db: Session,
+        aquarium_id: int,
+        parameters: tuple[str, ...] = TREND_PARAMETERS,
+        n_points: int = 10,
+        since: Optional[datetime] = None
+) -> np.ndarray:
+    # One columnar query: epoch seconds plus one float column per parameter, NULL -> NaN.
+    columns = [getattr(Sensor_Measurements, parameter) for parameter in parameters]
+    stmt = (
+        select(
+            func.extract("epoch", Sensor_Measurements.timestamp),
+            *(func.coalesce(cast(column, Float), float("nan")) for column in columns)
+        )
+        .join(Devices, Devices.id == Sensor_Measurements.device_id)
+        .where(Devices.aquarium_id == aquarium_id)
+        .order_by(Sensor_Measurements.timestamp.desc())
+        .limit(min(n_points, MAX_TREND_POINTS))
+    )
+    if len(columns) == 1:
+        stmt = stmt.where(columns[0].isnot(None))
+    else:
+        stmt = stmt.where(func.coalesce(*columns).isnot(None))
+    if since is not None:
+        stmt = stmt.where(Sensor_Measurements.timestamp >= since)
+
+    rows = db.execute(stmt).all()
+    if not rows:
+        return np.empty((0, len(parameters) + 1))
+    return np.array(rows, dtype=np.float64)
+
+
+def load_trend_windows(
+        db: Session,
+        aquarium_ids: list[int],
+        parameters: tuple[str, ...] = TREND_PARAMETERS,
+        n_points: int = 10
+) -> dict[int, np.ndarray]:
+    # Same window as load_trend_window for many aquariums at once: the newest n_points rows
+    # of every device through one LATERAL query, merged per aquarium.
+    n_points = min(n_points, MAX_TREND_POINTS)
+    columns = [getattr(Sensor_Measurements, parameter) for parameter in parameters]
+    newest = (
+        select(
+            func.extract("epoch", Sensor_Measurements.timestamp).label("epoch"),
+            *(func.coalesce(cast(column, Float), float("nan")).label(column.key) for column in columns)
+        )
+        .where(Sensor_Measurements.device_id == Devices.id)
+        .where(func.coalesce(*columns).isnot(None) if len(columns) > 1 else columns[0].isnot(None))
+        .order_by(Sensor_Measurements.timestamp.desc())
+        .limit(n_points)
+        .lateral()
+    )
+    rows = db.execute(
+        select(Devices.aquarium_id, newest).join(newest, true()).where(Devices.aquarium_id.in_(aquarium_ids))
+    ).all()
+
+    grouped = {aquarium_id: [] for aquarium_id in aquarium_ids}
+    for aquarium_id, *values in rows:
+        grouped[aquarium_id].append(values)
+
+    windows = {}
+    for aquarium_id, values in grouped.items():
+        if not values:
+            windows[aquarium_id] = np.empty((0, len(parameters) + 1))
+            continue
+        window = np.array(values, dtype=np.float64)
+        windows[aquarium_id] = window[np.argsort(-window[:, 0], kind="stable")][:n_points]
+    return windows
+
+
+def theil_sen(x: np.ndarray, y: np.ndarray) -> tuple[float, float]:
+    # Median of all pairwise slopes: a single outlier can't drag the line like it does with two-point rates.
+    i, j = np.triu_indices(len(x), k=1)
+    dx = x[j] - x[i]
+    valid = dx != 0
+    slope = float(np.median((y[j] - y[i])[valid] / dx[valid]))
+    intercept = float(np.median(y - slope * x))
+    return slope, intercept
+
+
+def fit_trend(x: np.ndarray, y: np.ndarray) -> Optional[dict]:
+    mask = np.isfinite(y)
+    x, y = x[mask], y[mask]
+    if len(y) < 2:
+        return None
+    if np.ptp(x) == 0:
+        return {"samples": len(y), "slope": None}
+
+    slope, intercept = theil_sen(x, y)
+    residuals = y - (intercept + slope * x)
+    return {
+        "samples": len(y),
+        "slope": slope,
+        "rate_per_hour": slope * 3600,
+        "residual_variance": float(np.var(residuals)),
+        "span_hours": float(np.ptp(x)) / 3600,
+    }
+
+
+def classify_trend(parameter: str, rate_per_hour: float) -> dict:
+    if parameter == "ph":
+        if rate_per_hour < -PH_RATE_THRESHOLD:
+            return {
+                "status": "CRITICAL DROP",
+                "rate_per_hour": round(rate_per_hour, 3),
+                "color": "red",
+                "message": f"УВАГА! pH різко падає! ({round(rate_per_hour, 2)} за годину). Ризик pH-шоку."
+            }
+        elif rate_per_hour > PH_RATE_THRESHOLD:
+            return {
+                "status": "Rapid Rise",
+                "rate_per_hour": round(rate_per_hour, 3),
+                "color": "orange",
+                "message": f"pH різко зростає ({round(rate_per_hour, 2)} за годину). Можливий викид аміаку."
+            }
+
+    elif parameter == "temperature":
+        if abs(rate_per_hour) > TEMPERATURE_RATE_THRESHOLD:
+            return {
+                "status": "Temp Shock",
+                "rate_per_hour": round(rate_per_hour, 2),
+                "color": "red",
+                "message": "Температурний шок! Вода змінює температуру занадто швидко."
+            }
+
+    return {
+        "status": "Stable",
+        "rate_per_hour": round(rate_per_hour, 3),
+        "color": "green",
+        "message": "Параметри стабільні."
+    }
+
+
+def trend_status(parameter: str, fit: Optional[dict]) -> dict:
+    if fit is None:
+        return {
+            "status": "Unknown",
+            "rate_per_hour": 0,
+            "message": "Недостатньо даних для аналізу тренду."
+        }
+    if fit["slope"] is None:
+        return {"status": "Error", "message": "Помилка часу вимірювань."}
+    return classify_trend(parameter, fit["rate_per_hour"])
+
+
+def analyze_trends(
+        db: Session,
+        aquarium_id: int,
+        parameters: tuple[str, ...] = TREND_PARAMETERS,
+        n_points: int = 10,
+        since: Optional[datetime] = None
+) -> dict[str, dict]:
+    window = load_trend_window(db, aquarium_id, parameters, n_points=n_points, since=since)
+    return trends_from_window(window, parameters)
+
+
+def analyze_trends_many(
+        db: Session,
+        aquarium_ids: list[int],
+        parameters: tuple[str, ...] = TREND_PARAMETERS,
+        n_points: int = 10
+) -> dict[int, dict[str, dict]]:
+    windows = load_trend_windows(db, aquarium_ids, parameters, n_points=n_points)
+    return {aquarium_id: trends_from_window(window, parameters) for aquarium_id, window in windows.items()}
+
+
+def trends_from_window(window: np.ndarray, parameters: tuple[str, ...]) -> dict[str, dict]:
+    # Offsets from the newest reading keep the epoch values small enough for float precision.
+    x = window[:, 0] - window[0, 0] if len(window) else window[:, 0]
+
+    results = {}
+    for column, parameter in enumerate(parameters, start=1):
+        fit = fit_trend(x, window[:, column])
+        result = trend_status(parameter, fit)
+        if fit is not None and fit["slope"] is not None:
+            result.update({
+                "samples": fit["samples"],
+                "residual_variance": round(fit["residual_variance"], 6),
+                "span_hours": round(fit["span_hours"], 3),
+            })
+        results[parameter] = result
+    return results
@@ -0,0 +1,238 @@
+import logging
+import threading
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from src.aquariums.models import Aquariums
+from src.core.background import PeriodicTask
+from src.core.config import (
+    NOTIFY_COALESCE_SECONDS, NOTIFY_DISPATCH_INTERVAL_SECONDS, NOTIFY_BATCH_SIZE, NOTIFY_MAX_ATTEMPTS,
+    NOTIFY_RETRY_BASE_SECONDS, NOTIFY_RETRY_MAX_SECONDS
+)
+from src.database import SessionLocal
+from src.monitoring.alerts import alert_engine
+from src.notifications.templates import render_alerts
+from src.notifications.transports import Notification, Transport, build_transport
+from src.users.models import Users, User_Settings
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationDispatcher:
+    def __init__(
+            self,
+            transport: Transport,
+            coalesce_seconds: float,
+            batch_size: int,
+            max_attempts: int,
+            retry_base_seconds: float,
+            retry_max_seconds: float
+    ):
+        self.transport = transport
+        self.coalesce_seconds = coalesce_seconds
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+        # aquarium_id -> {"opened_at", "initial": {metric: state}, "alerts": {metric: transition}}
+        self._windows: dict[int, dict] = {}
+        # (next_attempt_at, attempt, notification, opened_at)
+        self._retries: list[tuple[float, int, Notification, float]] = []
+        self._lock = threading.Lock()
+
+        self.received = 0
+        self.coalesced = 0
+        self.muted = 0
+        self.sent = 0
+        self.failed_attempts = 0
+        self.dropped = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+
+    def enqueue(self, transitions: list[dict]):
+        now = time.monotonic()
+        with self._lock:
+            for transition in transitions:
+                window = self._windows.get(transition["aquarium_id"])
+                if window is None:
+                    window = self._windows[transition["aquarium_id"]] = {
+                        "opened_at": now, "initial": {}, "alerts": {}
+                    }
+                window["initial"].setdefault(transition["metric"], transition["previous_state"])
+                if transition["metric"] in window["alerts"]:
+                    self.coalesced += 1
+                window["alerts"][transition["metric"]] = transition
+            self.received += len(transitions)
+
+    def dispatch(self, db: Session, force: bool = False) -> int:
+        now = time.monotonic()
+        with self._lock:
+            ready = {
+                aquarium_id: window for aquarium_id, window in self._windows.items()
+                if force or now - window["opened_at"] >= self.coalesce_seconds
+            }
+            for aquarium_id in ready:
+                del self._windows[aquarium_id]
+            due = [retry for retry in self._retries if force or retry[0] <= now]
+            self._retries = [retry for retry in self._retries if not (force or retry[0] <= now)]
+
+        try:
+            rendered = self._render(db, ready)
+        except Exception:
+            # Nothing was sent yet, so the windows and retries go back and the next run tries again.
+            self._restore(ready, due)
+            raise
+
+        jobs = [(attempt, notification, opened_at) for _, attempt, notification, opened_at in due]
+        jobs += [(0, notification, opened_at) for notification, opened_at in rendered]
+
+        delivered = 0
+        for start in range(0, len(jobs), self.batch_size):
+            delivered += self._deliver(jobs[start:start + self.batch_size])
+        return delivered
+
+    def _render(self, db: Session, windows: dict[int, dict]) -> list[tuple[Notification, float]]:
+        alerts_by_aquarium = {}
+        flapped = 0
+        for aquarium_id, window in windows.items():
+            # A value that flapped out and back inside one window has nothing to report.
+            alerts = [
+                alert for metric, alert in window["alerts"].items()
+                if alert["state"] != window["initial"][metric]
+            ]
+            flapped += len(window["alerts"]) - len(alerts)
+            if alerts:
+                alerts_by_aquarium[aquarium_id] = sorted(alerts, key=lambda alert: alert["timestamp"])
+        if not alerts_by_aquarium:
+            with self._lock:
+                self.coalesced += flapped
+            return []
+
+        recipients = db.execute(
+            select(
+                Aquariums.id, Aquariums.name, Users.id, Users.email,
+                User_Settings.language, User_Settings.notify_alerts
+            )
+            .join(Users, Users.id == Aquariums.user_id)
+            .outerjoin(User_Settings, User_Settings.user_id == Users.id)
+            .where(Aquariums.id.in_(alerts_by_aquarium), Users.is_active == True)
+        ).all()
+        with self._lock:
+            self.coalesced += flapped
+
+        rendered = []
+        for aquarium_id, aquarium_name, user_id, email, language, notify_alerts in recipients:
+            if notify_alerts is False:
+                with self._lock:
+                    self.muted += 1
+                continue
+            subject, body = render_alerts(
+                language.value if language else None, aquarium_name, alerts_by_aquarium[aquarium_id]
+            )
+            notification = Notification(
+                user_id, aquarium_id, email, language.value if language else None, subject, body
+            )
+            rendered.append((notification, windows[aquarium_id]["opened_at"]))
+        return rendered
+
+    def _restore(self, windows: dict[int, dict], retries: list[tuple[float, int, Notification, float]]):
+        with self._lock:
+            for aquarium_id, window in windows.items():
+                # Transitions that arrived in the meantime opened a new window, they are newer than ours.
+                newer = self._windows.get(aquarium_id)
+                if newer is not None:
+                    for metric, state in newer["initial"].items():
+                        window["initial"].setdefault(metric, state)
+                    for metric, alert in newer["alerts"].items():
+                        if metric in window["alerts"]:
+                            self.coalesced += 1
+                        window["alerts"][metric] = alert
+                self._windows[aquarium_id] = window
+            self._retries.extend(retries)
+
+    def _deliver(self, jobs: list[tuple[int, Notification, float]]) -> int:
+        batch = [notification for _, notification, _ in jobs]
+        try:
+            failed = set(self.transport.send(batch))
+        except Exception:
+            logger.exception("Notification transport %s failed for %d messages", self.transport.name, len(batch))
+            failed = set(batch)
+
+        now = time.monotonic()
+        delivered = 0
+        with self._lock:
+            for attempt, notification, opened_at in jobs:
+                if notification in failed:
+                    self.failed_attempts += 1
+                    attempt += 1
+                    if attempt >= self.max_attempts:
+                        self.dropped += 1
+                        continue
+                    backoff = min(self.retry_base_seconds * 2 ** (attempt - 1), self.retry_max_seconds)
+                    self._retries.append((now + backoff, attempt, notification, opened_at))
+                    continue
+
+                delivered += 1
+                lag = now - opened_at
+                self.last_lag = lag
+                self.max_lag = max(self.max_lag, lag)
+                self.total_lag += lag
+            self.sent += delivered
+        return delivered
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "transport": self.transport.name,
+                "open_windows": len(self._windows),
+                "queued_alerts": sum(len(window["alerts"]) for window in self._windows.values()),
+                "oldest_window_s": round(max((now - w["opened_at"] for w in self._windows.values()), default=0.0), 3),
+                "retry_queue": len(self._retries),
+                "received": self.received,
+                "coalesced": self.coalesced,
+                "muted": self.muted,
+                "sent": self.sent,
+                "failed_attempts": self.failed_attempts,
+                "dropped": self.dropped,
+                "last_lag_s": round(self.last_lag, 3),
+                "avg_lag_s": round(self.total_lag / self.sent, 3) if self.sent else 0.0,
+                "max_lag_s": round(self.max_lag, 3),
+            }
+
+
+notification_dispatcher = NotificationDispatcher(
+    transport=build_transport(),
+    coalesce_seconds=NOTIFY_COALESCE_SECONDS,
+    batch_size=NOTIFY_BATCH_SIZE,
+    max_attempts=NOTIFY_MAX_ATTEMPTS,
+    retry_base_seconds=NOTIFY_RETRY_BASE_SECONDS,
+    retry_max_seconds=NOTIFY_RETRY_MAX_SECONDS,
+)
+alert_engine.add_listener(notification_dispatcher.enqueue)
+
+
+def run_notification_dispatch(force: bool = False):
+    db = SessionLocal()
+    try:
+        delivered = notification_dispatcher.dispatch(db, force=force)
+        if delivered:
+            logger.info("Delivered %d notifications", delivered)
+    finally:
+        db.close()
+
+
+def flush_notifications():
+    run_notification_dispatch(force=True)
+
+
+notification_sender = PeriodicTask(
+    name="notification-dispatcher",
+    interval_seconds=NOTIFY_DISPATCH_INTERVAL_SECONDS,
+    func=run_notification_dispatch,
+    run_on_start=False,
+)
@@ -0,0 +1,78 @@
+from typing import Optional
+
+DEFAULT_LANGUAGE = "uk"
+
+METRIC_LABELS = {
+    "uk": {
+        "temperature": "Температура",
+        "ph": "pH",
+        "tds": "TDS",
+        "gh": "GH",
+        "kh": "KH",
+        "ammonia": "Аміак",
+        "nitrite": "Нітрити",
+        "nitrate": "Нітрати",
+        "phosphate": "Фосфати",
+    },
+    "en": {
+        "temperature": "Temperature",
+        "ph": "pH",
+        "tds": "TDS",
+        "gh": "GH",
+        "kh": "KH",
+        "ammonia": "Ammonia",
+        "nitrite": "Nitrite",
+        "nitrate": "Nitrate",
+        "phosphate": "Phosphate",
+    },
+}
+
+STATE_LABELS = {
+    "uk": {"high": "вище норми", "low": "нижче норми", "ok": "повернулось у норму"},
+    "en": {"high": "above target", "low": "below target", "ok": "back in range"},
+}
+
+SUBJECTS = {
+    "uk": "AquaCore: {aquarium} — параметри води ({count})",
+    "en": "AquaCore: {aquarium} — water parameters ({count})",
+}
+
+HEADERS = {
+    "uk": "Зміни параметрів в акваріумі «{aquarium}»:",
+    "en": "Parameter changes in aquarium \"{aquarium}\":",
+}
+
+TARGET_LABELS = {
+    "uk": "норма",
+    "en": "target",
+}
+
+
+def resolve_language(language: Optional[str]) -> str:
+    # User_Settings keeps both "ua" and "uk" for Ukrainian.
+    if language in ("ua", "uk"):
+        return "uk"
+    return language if language in SUBJECTS else DEFAULT_LANGUAGE
+
+
+def format_range(target_min: Optional[float], target_max: Optional[float]) -> str:
+    if target_min is not None and target_max is not None:
+        return f"{target_min:g}–{target_max:g}"
+    if target_max is not None:
+        return f"≤ {target_max:g}"
+    return f"≥ {target_min:g}"
+
+
+def render_alerts(language: Optional[str], aquarium_name: str, alerts: list[dict]) -> tuple[str, str]:
+    language = resolve_language(language)
+    metrics, states = METRIC_LABELS[language], STATE_LABELS[language]
+
+    lines = [HEADERS[language].format(aquarium=aquarium_name)]
+    for alert in alerts:
+        lines.append(
+            f"- {metrics.get(alert['metric'], alert['metric'])}: {alert['value']:g} — {states[alert['state']]} "
+            f"({TARGET_LABELS[language]} {format_range(alert['target_min'], alert['target_max'])})"
+        )
+
+    subject = SUBJECTS[language].format(aquarium=aquarium_name, count=len(alerts))
+    return subject, "\n".join(lines)
@@ -0,0 +1,78 @@
+import json
+import smtplib
+import threading
+from datetime import datetime
+from email.message import EmailMessage
+from typing import NamedTuple
+
+from src.core.config import NOTIFY_TRANSPORT, NOTIFY_FILE_PATH, NOTIFY_SMTP_HOST, NOTIFY_SMTP_PORT, NOTIFY_SENDER
+
+
+class Notification(NamedTuple):
+    user_id: int
+    aquarium_id: int
+    email: str
+    language: str
+    subject: str
+    body: str
+
+
+class Transport:
+    name = "none"
+
+    def send(self, batch: list[Notification]) -> list[Notification]:
+        # Returns the notifications that were not delivered; raising means none were.
+        return []
+
+
+class FileTransport(Transport):
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, batch: list[Notification]) -> list[Notification]:
+        sent_at = datetime.now().isoformat(timespec="seconds")
+        lines = "".join(
+            json.dumps({"sent_at": sent_at, **notification._asdict()}, ensure_ascii=False) + "\n"
+            for notification in batch
+        )
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+        return []
+
+
+class SmtpTransport(Transport):
+    # Local stand-in: python -m aiosmtpd -n -l localhost:1025
+    name = "smtp"
+
+    def __init__(self, host: str, port: int, sender: str, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.timeout = timeout
+
+    def send(self, batch: list[Notification]) -> list[Notification]:
+        failed = []
+        # One connection for the whole batch.
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            for notification in batch:
+                message = EmailMessage()
+                message["From"] = self.sender
+                message["To"] = notification.email
+                message["Subject"] = notification.subject
+                message.set_content(notification.body)
+                try:
+                    smtp.send_message(message)
+                except smtplib.SMTPException:
+                    failed.append(notification)
+        return failed
+
+
+def build_transport(name: str = NOTIFY_TRANSPORT) -> Transport:
+    if name == "file":
+        return FileTransport(NOTIFY_FILE_PATH)
+    if name == "smtp":
+        return SmtpTransport(NOTIFY_SMTP_HOST, NOTIFY_SMTP_PORT, NOTIFY_SENDER)
+    return Transport()
@@ -6,7 +6,8 @@ from datetime import date, datetime, timedelta
 from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from src.aquariums.models import Aquariums
-from src.monitoring.models import Sensor_Measurements, Devices, Activity_Log
+from src.monitoring.models import Activity_Log
+from src.monitoring.latest import latest_readings, latest_value
 from src.tasks.models import Tasks
 from src.aquariums.service import calculate_stocking_level
 
@@ -20,13 +21,7 @@ def auto_generate_maintenance_tasks(db: Session, aquarium_id: int):
     if not aquarium:
         return
 
-    measurement = (
-        db.query(Sensor_Measurements)
-        .join(Devices)
-        .filter(Devices.aquarium_id == aquarium_id)
-        .order_by(desc(Sensor_Measurements.timestamp))
-        .first()
-    )
+    latest = latest_readings.get_for_aquarium(db, aquarium_id)
 
 
     stocking_data = calculate_stocking_level(db, aquarium)
@@ -95,7 +90,7 @@ def auto_generate_maintenance_tasks(db: Session, aquarium_id: int):
         ):
             created_count += 1
 
-    current_tds = measurement.tds if (measurement and measurement.tds) else 0
+    current_tds = latest_value(latest, "tds") or 0
     target_tds = aquarium.target_tds_max or 500
 
     if current_tds > target_tds:
@@ -83,5 +83,6 @@ class User_Settings(Base, TableNameMixin):
     language: Mapped[Language] = mapped_column(ENUM(Language), default=Language.ua)
     temperature_unit: Mapped[TempUnit] = mapped_column(ENUM(TempUnit), default=TempUnit.C)
     volume_unit: Mapped[VolumeUnit] = mapped_column(ENUM(VolumeUnit), default=VolumeUnit.L)
+    notify_alerts: Mapped[bool] = mapped_column(Boolean, default=True, server_default="true")
 
     user = relationship("Users", back_populates="user_settings", uselist=False)
\ No newline at end of file
@@ -1,43 +1,45 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database import get_db
+from src.database import get_db, get_async_db
 from src.auth.service import get_current_user
-from src.users.service import get_user_by_id, update_user_full, delete_user_by_id
+from src.users.service import get_user_by_id_async, update_user_full_async, delete_user_by_id_async
 from src.users.schemas import UserRead, UserUpdate
 
 router = APIRouter(prefix="/users", tags=["Users 👤"])
 
 db_dependency = Annotated[Session, Depends(get_db)]
+async_db_dependency = Annotated[AsyncSession, Depends(get_async_db)]
 user_dependency = Annotated[dict, Depends(get_current_user)]
 
 
 @router.get("/me/", response_model=UserRead)
-def read_users_me(
+async def read_users_me(
     current_user: user_dependency,
-    db: db_dependency
+    db: async_db_dependency
 ):
-    return get_user_by_id(db=db, user_id=current_user.get("user_id"))
+    return await get_user_by_id_async(db=db, user_id=current_user.get("user_id"))
 
 
 @router.put("/me/", response_model=UserRead)
-def update_user(
-    db:db_dependency,
+async def update_user(
+    db:async_db_dependency,
     current_user: user_dependency,
     update_data: UserUpdate
 ):
-    return update_user_full(
+    return await update_user_full_async(
         db=db, 
         user_id=current_user.get("user_id"), 
         update_data=update_data)
 
 
 @router.delete("/me/")
-def delete_user(
-    db:db_dependency,
+async def delete_user(
+    db:async_db_dependency,
     current_user: user_dependency,
 ):
-    return delete_user_by_id(
+    return await delete_user_by_id_async(
         db=db, 
         user_id=current_user.get("user_id"))
\ No newline at end of file
@@ -19,6 +19,7 @@ class UserSettingsRead(BaseModel):
     language: Language
     temperature_unit: TempUnit
     volume_unit: VolumeUnit
+    notify_alerts: bool = True
 
     class Config:
         from_attributes = True
@@ -47,6 +48,7 @@ class UserSettingsUpdate(BaseModel):
     language: Optional[Language] = None
     temperature_unit: Optional[TempUnit] = None
     volume_unit: Optional[VolumeUnit] = None
+    notify_alerts: Optional[bool] = None
 
 class UserUpdate(BaseModel):
     
@@ -1,9 +1,10 @@
 from typing import Annotated
-from sqlalchemy import func, or_
+from sqlalchemy import func, or_, select, delete
 from fastapi import Depends, HTTPException
 from starlette import status
 from src.database import get_db
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.users.models import Users, User_Profiles
 from src.media.models import Media
 from src.aquariums.models import Aquariums, Aquarium_Inhabitants
@@ -15,6 +16,13 @@ from src.catalog.models import Knowledge_Base_Articles
 from src.admin.service import  check_admin
 from src.social.models import Follows, Likes
 from src.monitoring.models import Devices, Manual_Measurements, Sensor_Measurements
+from src.monitoring.device_cache import device_key_cache
+from src.monitoring.latest import latest_readings
+from src.monitoring.alerts import alert_engine
+from src.monitoring.anomalies import anomaly_detector
+from src.monitoring.heartbeat import heartbeat_tracker
+from src.monitoring.sequence import sequence_tracker
+from src.devices.channel import device_config_channel
 
 
 db_dependency = Annotated[Session, Depends(get_db)]
@@ -27,6 +35,18 @@ def get_user_by_id(db:db_dependency, user_id:int):
     return user
 
 
+async def get_user_by_id_async(db: AsyncSession, user_id: int):
+    # Profile and settings come in the same query, UserRead reads both after the session is gone.
+    user = await db.scalar(
+        select(Users)
+        .options(joinedload(Users.user_profile), joinedload(Users.user_settings))
+        .where(Users.id == user_id)
+    )
+    if user is None:
+        raise  HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Користувача не знайдено')
+    return user
+
+
 def get_user_by_id_for_admin(db:db_dependency, user_id:int, search_user_id):
     user = db.query(Users).filter(Users.id == search_user_id).first()
     check_admin(db=db, admin_id=user_id)
@@ -66,6 +86,35 @@ def update_user_full(db: Session, user_id: int, update_data: UserUpdate):
     return user
 
 
+async def update_user_full_async(db: AsyncSession, user_id: int, update_data: UserUpdate):
+    user = await get_user_by_id_async(db=db, user_id=user_id)
+
+    if update_data.user_profile:
+        profile_data = update_data.user_profile.dict(exclude_unset=True)
+        for key, value in profile_data.items():
+            setattr(user.user_profile, key, value)
+
+    if update_data.user_settings:
+        settings_data = update_data.user_settings.dict(exclude_unset=True)
+        for key, value in settings_data.items():
+            setattr(user.user_settings, key, value)
+
+    existing_nickname = await db.scalar(
+        select(User_Profiles)
+        .where(
+            func.lower(User_Profiles.nickname) == user.user_profile.nickname.lower(),
+            User_Profiles.user_id != user.id
+        )
+        .limit(1)
+    )
+
+    if existing_nickname:
+        raise  HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Нік '{existing_nickname.nickname}' вже зайнятий")
+
+    await db.commit()
+    return user
+
+
 def delete_user_by_id(db:Session, user_id:int):
     user = get_user_by_id(db=db, user_id=user_id)
 
@@ -121,6 +170,62 @@ def delete_user_by_id(db:Session, user_id:int):
     db.delete(user)
     db.commit()
 
+    if aquarium_ids:
+        device_key_cache.invalidate_aquariums(aquarium_ids)
+        latest_readings.forget_aquariums(aquarium_ids)
+        alert_engine.forget_aquariums(aquarium_ids)
+
+    return {"message": "Успішне видалення"}
+
+
+async def delete_user_by_id_async(db: AsyncSession, user_id: int):
+    user = await get_user_by_id_async(db=db, user_id=user_id)
+    no_sync = {"synchronize_session": False}
+
+    await db.execute(
+        delete(Media).where(Media.attachable_type == "user_profile", Media.attachable_id == user_id),
+        execution_options=no_sync
+    )
+
+    aquarium_ids = (await db.scalars(select(Aquariums.id).where(Aquariums.user_id == user_id))).all()
+
+    if aquarium_ids:
+        await db.execute(
+            delete(Media).where(Media.attachable_type == "aquarium", Media.attachable_id.in_(aquarium_ids)),
+            execution_options=no_sync
+        )
+        await db.execute(delete(Activity_Log).where(Activity_Log.aquarium_id.in_(aquarium_ids)), execution_options=no_sync)
+        await db.execute(delete(Aquariums).where(Aquariums.id.in_(aquarium_ids)), execution_options=no_sync)
+
+    post_ids = (await db.scalars(select(Posts.id).where(Posts.user_id == user_id))).all()
+
+    if post_ids:
+        await db.execute(
+            delete(Media).where(Media.attachable_type == "post", Media.attachable_id.in_(post_ids)),
+            execution_options=no_sync
+        )
+
+    task_ids = (await db.scalars(select(Tasks.id).where(Tasks.user_id == user_id))).all()
+
+    if task_ids:
+        await db.execute(delete(Task_Completions).where(Task_Completions.task_id.in_(task_ids)), execution_options=no_sync)
+        await db.execute(delete(Tasks).where(Tasks.id.in_(task_ids)), execution_options=no_sync)
+
+    await db.execute(
+        delete(Knowledge_Base_Articles).where(Knowledge_Base_Articles.author_id == user_id),
+        execution_options=no_sync
+    )
+
+    await db.delete(user.user_profile)
+    await db.delete(user.user_settings)
+    await db.delete(user)
+    await db.commit()
+
+    if aquarium_ids:
+        device_key_cache.invalidate_aquariums(aquarium_ids)
+        latest_readings.forget_aquariums(aquarium_ids)
+        alert_engine.forget_aquariums(aquarium_ids)
+
     return {"message": "Успішне видалення"}
 
 
@@ -130,6 +235,7 @@ def delete_user_by_id_for_admin(db: Session, admin_id: int, user_id: int):
 
     user_aquarium_ids = db.query(Aquariums.id).filter(Aquariums.user_id == user_id).all()
     aquarium_ids = [id for (id,) in user_aquarium_ids]
+    device_ids = []
 
     if aquarium_ids:
         db.query(Manual_Measurements).filter(
@@ -209,6 +315,15 @@ def delete_user_by_id_for_admin(db: Session, admin_id: int, user_id: int):
     db.delete(user)
     db.commit()
 
+    device_key_cache.invalidate_devices(device_ids)
+    latest_readings.forget_devices(device_ids)
+    latest_readings.forget_aquariums(aquarium_ids)
+    alert_engine.forget_aquariums(aquarium_ids)
+    sequence_tracker.forget_devices(device_ids)
+    heartbeat_tracker.forget_devices(device_ids)
+    anomaly_detector.forget_devices(device_ids)
+    device_config_channel.forget_devices(device_ids)
+
     return {"message": f"Користувач {user_id} та всі його дані (акваріуми, пристрої, пости) успішно видалені"}
 
 
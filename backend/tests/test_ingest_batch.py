@@ -0,0 +1,49 @@
+import pytest
+
+import src.models_registry
+from src.monitoring import service
+from src.monitoring.device_cache import CachedDevice
+from src.monitoring.models import DeviceStatus
+from src.monitoring.rate_limit import TokenBucketLimiter
+
+MEASUREMENTS = {
+    "temperature": 25, "ph": 7.1, "tds": 700, "turbidity": 1, "water_level": 1,
+    "room_temperature": 22, "room_humidity": 40
+}
+DEVICE = CachedDevice(device_id=1, aquarium_id=None, status=DeviceStatus.online)
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    limiter = TokenBucketLimiter(max_buckets=100)
+    monkeypatch.setattr(service, "ingest_limiter", limiter)
+    monkeypatch.setattr(
+        service.device_key_cache, "resolve_many",
+        lambda db, api_keys: {api_key: DEVICE if api_key == "key" else None for api_key in api_keys}
+    )
+    monkeypatch.setattr(service, "store_sensor_rows", lambda db, rows: rows)
+    return limiter
+
+
+def batch(size: int, api_key: str = "key") -> list[dict]:
+    return [{"api_key": api_key, "measurements": MEASUREMENTS, "seq": seq} for seq in range(size)]
+
+
+def test_single_device_batch_is_one_request(limiter):
+    result = service.ingest_sensor_batch(db=None, readings=batch(500))
+
+    assert result["accepted"] == 500
+    assert result["rejected"] == 0
+    assert limiter.stats()["allowed"] == 1
+
+
+def test_rate_limited_device_rejects_whole_batch(limiter):
+    for _ in range(10):
+        assert limiter.allow("key:key", service.DEFAULT_LIMIT)
+
+    result = service.ingest_sensor_batch(db=None, readings=batch(5) + batch(2, api_key="unknown"))
+
+    assert result["accepted"] == 0
+    assert [r["detail"] for r in result["results"]] == (
+        ["Перевищено ліміт запитів для пристрою"] * 5 + ["Девайс не знайдено або невірний api key"] * 2
+    )
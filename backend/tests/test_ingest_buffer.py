@@ -0,0 +1,61 @@
+import pytest
+
+from src.monitoring import ingest_buffer as ingest_buffer_module
+from src.monitoring.ingest_buffer import IngestBuffer
+
+
+class FakeSession:
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def fake_session(monkeypatch):
+    monkeypatch.setattr(ingest_buffer_module, "SessionLocal", FakeSession)
+
+
+def make_buffer(writer) -> IngestBuffer:
+    return IngestBuffer(
+        max_size=100, flush_rows=10, flush_interval_ms=10, writer=writer, retries=2, retry_backoff_ms=0
+    )
+
+
+def test_transient_failure_is_retried():
+    written = []
+    failures = iter([True])
+
+    def writer(db, rows):
+        if next(failures, False):
+            raise RuntimeError("connection reset")
+        written.extend(rows)
+
+    buffer = make_buffer(writer)
+    buffer._flush([{"seq": 1}, {"seq": 2}])
+
+    assert written == [{"seq": 1}, {"seq": 2}]
+    stats = buffer.stats()
+    assert stats["retried_flushes"] == 1
+    assert stats["flushed_rows"] == 2
+    assert stats["failed_rows"] == 0
+
+
+def test_bad_row_is_dropped_alone():
+    written = []
+
+    def writer(db, rows):
+        if any(row["seq"] == 2 for row in rows):
+            raise ValueError("bad row")
+        written.extend(rows)
+
+    buffer = make_buffer(writer)
+    buffer._flush([{"seq": 1}, {"seq": 2}, {"seq": 3}])
+
+    assert written == [{"seq": 1}, {"seq": 3}]
+    stats = buffer.stats()
+    assert stats["retried_flushes"] == 2
+    assert stats["row_fallbacks"] == 1
+    assert stats["flushed_rows"] == 2
+    assert stats["failed_rows"] == 1
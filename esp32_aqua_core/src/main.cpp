@@ -12,6 +12,7 @@
 #include <HTTPClient.h>
 #include <ArduinoJson.h>
 #include <time.h>
+#include <Preferences.h>
 
 #define GMT_OFFSET_SEC  2 * 3600 
 #define DAYLIGHT_OFFSET_SEC 0
@@ -64,6 +65,11 @@ unsigned long lastScreenUpdate = 0;
 unsigned long lastTelemetrySend = 0;
 const unsigned long SENSOR_INTERVAL = 1000; 
 const unsigned long SEND_INTERVAL = 60000;
+const int SEND_RETRIES = 2;
+
+Preferences prefs;
+uint32_t bootCount = 0;
+uint32_t telemetryCounter = 0;
 
 int currentScreen = 0;              
 const int MAX_SCREENS = 4; 
@@ -177,6 +183,12 @@ void setup() {
   
   Rtc.Begin();
 
+  // seq = boot counter in the high 32 bits, so it keeps growing across reboots
+  prefs.begin("aquacore", false);
+  bootCount = prefs.getUInt("boot", 0) + 1;
+  prefs.putUInt("boot", bootCount);
+  prefs.end();
+
 bool timeOk = false;
 
 if (WiFi.status() == WL_CONNECTED) {
@@ -210,8 +222,18 @@ void sendTelemetry() {
   http.begin(client, serverUrl);
   http.addHeader("Content-Type", "application/json");
 
-  StaticJsonDocument<300> doc;
+  StaticJsonDocument<384> doc;
   doc["api_key"] = apiKey;
+  doc["seq"] = ((uint64_t)bootCount << 32) | ++telemetryCounter;
+
+  if (Rtc.IsDateTimeValid()) {
+    RtcDateTime now = Rtc.GetDateTime();
+    char deviceTs[32];
+    snprintf(deviceTs, sizeof(deviceTs), "%04u-%02u-%02uT%02u:%02u:%02u%+03d:%02d",
+             now.Year(), now.Month(), now.Day(), now.Hour(), now.Minute(), now.Second(),
+             (GMT_OFFSET_SEC) / 3600, abs((GMT_OFFSET_SEC) % 3600) / 60);
+    doc["device_ts"] = deviceTs;
+  }
 
   JsonObject measurements = doc.createNestedObject("measurements");
   measurements["temperature"] = currentWaterTemp;
@@ -225,7 +247,12 @@ void sendTelemetry() {
   String jsonString;
   serializeJson(doc, jsonString);
 
+  // Retries resend the same seq/device_ts, the server drops the copy if the first POST got through
   int httpCode = http.POST(jsonString);
+  for (int attempt = 0; attempt < SEND_RETRIES && (httpCode <= 0 || httpCode >= 500); attempt++) {
+    delay(1000);
+    httpCode = http.POST(jsonString);
+  }
 
   Serial.print("HTTP POST → ");
   Serial.println(httpCode);